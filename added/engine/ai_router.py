@@ -1,11 +1,18 @@
 import os
-import requests
-import json
 import time
-from typing import Dict, List, Optional, Any
+import asyncio
+import threading
+from typing import Dict, List, Optional, Any, AsyncIterator, Callable
 from dotenv import load_dotenv
 import cohere
 import groq
+from .ai_transport import AsyncTransport
+from .ollama_client import OllamaClient
+from .speech_stream import SentenceSplitter, split_sentences
+from .response_cache import ResponseCache
+from .health_monitor import HealthMonitor
+from .circuit_breaker import BackendScoreboard
+from .single_flight import SingleFlight
 # New import for code analysis feature
 try:
     import openai
@@ -22,150 +29,267 @@ class AIRouter:
         self.ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
         self.ollama_model = os.getenv('OLLAMA_MODEL', 'llama2:7b-chat')
         
-        # Initialize API clients
-        self.groq_client = None
-        self.cohere_client = None
-        # New OpenAI client for code analysis
-        self.openai_client = None
+        # Pooled, non-blocking transport shared by all backends
+        self.transport = AsyncTransport()
+        self.ollama_client = OllamaClient(
+            self.transport.pool('ollama'),
+            base_url=self.ollama_url,
+            model=self.ollama_model
+        )
         
-        self._initialize_clients()
-        self._test_connections()
-    
-    def _initialize_clients(self):
-        """Initialize API clients with error handling"""
-        try:
-            groq_api_key = os.getenv('GroqAPI')
-            if groq_api_key:
-                self.groq_client = groq.Groq(api_key=groq_api_key)
-                print("✅ Groq client initialized")
-        except Exception as e:
-            print(f"⚠️ Groq client initialization failed: {e}")
+        # Sampling options shared by every backend call (part of the cache key)
+        self.generation_options = {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "max_tokens": 2048
+        }
         
-        try:
-            cohere_api_key = os.getenv('CohereAPI')
-            if cohere_api_key:
-                self.cohere_client = cohere.Client(api_key=cohere_api_key)
-                print("✅ Cohere client initialized")
-        except Exception as e:
-            print(f"⚠️ Cohere client initialization failed: {e}")
+        # Response cache in front of process_query (disable with AI_CACHE_ENABLED=false)
+        self.response_cache = None
+        if os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true':
+            self.response_cache = ResponseCache()
+        
+        # Concurrent identical requests (duplicate UI clicks, repeated classifications)
+        self.single_flight = SingleFlight()
+        
+        # Hedged fallback: start the next backend if the current one is this slow (seconds)
+        self.hedging_enabled = os.getenv('AI_HEDGING', 'true').lower() == 'true'
+        self.hedge_delay = float(os.getenv('AI_HEDGE_DELAY', '2.0'))
         
-        # Initialize OpenAI client for code analysis
+        # Circuit breakers and rolling latency per backend decide the order at query time.
+        # Priors (seconds) keep the original Cohere -> Ollama -> Groq order until measured.
+        self.scoreboard = BackendScoreboard(
+            priors={'cohere': 1.0, 'ollama': 2.0, 'groq': 3.0},
+            failure_threshold=int(os.getenv('AI_BREAKER_THRESHOLD', '3')),
+            recovery_timeout=float(os.getenv('AI_BREAKER_RECOVERY', '30'))
+        )
+        
+        # API clients are created lazily on first use
+        self._clients = {}
+        self._client_lock = threading.Lock()
+        
+        # Background health monitor - cheap probes on a timer, never billable completions
+        self.health_monitor = HealthMonitor({
+            'ollama': self._test_ollama,
+            'groq': self._test_groq,
+            'cohere': self._test_cohere,
+            'openai': self._test_openai
+        }, interval=float(os.getenv('AI_HEALTH_INTERVAL', '60')))
+        self.health_monitor.add_listener(self.scoreboard.record_probe)
+        if os.getenv('AI_HEALTH_MONITOR', 'true').lower() == 'true':
+            self.health_monitor.start()
+    
+    @property
+    def groq_client(self):
+        """Groq client (created on first access)"""
+        return self._get_client('groq')
+    
+    @property
+    def cohere_client(self):
+        """Cohere client (created on first access)"""
+        return self._get_client('cohere')
+    
+    @property
+    def openai_client(self):
+        """OpenAI client for code analysis (created on first access)"""
+        return self._get_client('openai')
+    
+    def _get_client(self, name: str):
+        """Return a cached API client, creating it the first time it is needed"""
+        with self._client_lock:
+            if name not in self._clients:
+                self._clients[name] = self._create_client(name)
+            return self._clients[name]
+    
+    def _create_client(self, name: str):
+        """Create an API client with error handling (None when unavailable)"""
         try:
-            if OPENAI_AVAILABLE:
+            if name == 'groq':
+                groq_api_key = os.getenv('GroqAPI')
+                if groq_api_key:
+                    client = groq.Groq(api_key=groq_api_key)
+                    print("✅ Groq client initialized")
+                    return client
+            
+            elif name == 'cohere':
+                cohere_api_key = os.getenv('CohereAPI')
+                if cohere_api_key:
+                    client = cohere.Client(api_key=cohere_api_key)
+                    print("✅ Cohere client initialized")
+                    return client
+            
+            elif name == 'openai' and OPENAI_AVAILABLE:
                 openai_api_key = os.getenv('OpenAI_API_KEY')
                 if openai_api_key:
-                    self.openai_client = openai.OpenAI(api_key=openai_api_key)
+                    client = openai.OpenAI(api_key=openai_api_key)
                     print("✅ OpenAI client initialized")
+                    return client
+                
         except Exception as e:
-            print(f"⚠️ OpenAI client initialization failed: {e}")
+            print(f"⚠️ {name.capitalize()} client initialization failed: {e}")
+        
+        return None
     
     def _test_connections(self):
-        """Test all AI service connections"""
+        """Probe all AI services now and print the result"""
         print("🔍 Testing AI service connections...")
+        status = self.health_monitor.check_now()
         
-        # Test Ollama
-        if self._test_ollama():
+        if status['ollama']:
             print("✅ Ollama connection successful")
         else:
             print("⚠️ Ollama not available - install and run: ollama serve")
         
-        # Test Groq
-        if self._test_groq():
-            print("✅ Groq API connection successful")
-        else:
-            print("⚠️ Groq API not available")
-        
-        # Test Cohere
-        if self._test_cohere():
-            print("✅ Cohere API connection successful")
-        else:
-            print("⚠️ Cohere API not available")
+        for name, label in [('groq', 'Groq'), ('cohere', 'Cohere'), ('openai', 'OpenAI')]:
+            if status[name]:
+                print(f"✅ {label} API connection successful")
+            else:
+                print(f"⚠️ {label} API not available")
         
-        # Test OpenAI
-        if self._test_openai():
-            print("✅ OpenAI API connection successful")
-        else:
-            print("⚠️ OpenAI API not available")
+        return status
     
     def _test_ollama(self) -> bool:
         """Test Ollama connection"""
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self.transport.pool('ollama').session.get(f"{self.ollama_url}/api/tags", timeout=2)
             return response.status_code == 200
         except:
             return False
     
     def _test_groq(self) -> bool:
-        """Test Groq API connection"""
+        """Test Groq API connection (model listing is free)"""
         try:
             if not self.groq_client:
                 return False
-            # Simple test query
-            response = self.groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": "test"}],
-                model="mixtral-8x7b-32768",
-                max_tokens=1
-            )
+            self.groq_client.models.list(timeout=5)
             return True
         except:
             return False
     
     def _test_cohere(self) -> bool:
-        """Test Cohere API connection"""
+        """Test Cohere API connection (key check is free)"""
         try:
             if not self.cohere_client:
                 return False
-            # Simple test query
-            response = self.cohere_client.generate(
-                model='command-r-plus',
-                prompt='test',
-                max_tokens=1
-            )
+            if hasattr(self.cohere_client, 'check_api_key'):
+                result = self.cohere_client.check_api_key()
+                valid = result.get('valid') if isinstance(result, dict) else getattr(result, 'valid', True)
+                return bool(valid)
+            self.cohere_client.models.list()
             return True
         except:
             return False
     
     def _test_openai(self) -> bool:
-        """Test OpenAI API connection"""
+        """Test OpenAI API connection (model listing is free)"""
         try:
             if not self.openai_client or not OPENAI_AVAILABLE:
                 return False
-            # Simple test query
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": "test"}],
-                max_tokens=1
-            )
+            self.openai_client.models.list(timeout=5)
             return True
         except:
             return False
     
-    async def process_query(self, query: str, query_type: str = "general") -> Dict[str, Any]:
-        """Process query with intelligent AI routing"""
+    async def process_query(self, query: str, query_type: str = "general",
+                            on_sentence: Optional[Callable[[str], Any]] = None,
+                            use_cache: bool = True, prefix: Optional[str] = None) -> Dict[str, Any]:
+        """Process query with intelligent AI routing
+        
+        When on_sentence is given, Ollama is streamed and each finished sentence is
+        passed to on_sentence while the rest is still generating. Returning False
+        from on_sentence stops the generation early.
+        
+        prefix is a large static instruction block that goes in front of query.
+        Ollama evaluates it once and reuses it for every later query; the other
+        backends receive prefix and query joined together.
+        """
+        start_time = time.time()
+        
+        request_key = ResponseCache.make_key(
+            f"{prefix}\n\n{query}" if prefix else query,
+            query_type, self.ollama_model, self.generation_options
+        )
+        
+        cache_key = None
+        if use_cache and self.response_cache and self.response_cache.ttl_for(query_type) > 0:
+            cache_key = request_key
+            cached = await self.response_cache.aget(cache_key)
+            if cached:
+                cached['cached'] = True
+                cached['processing_time'] = time.time() - start_time
+                return self._emit_sentences(cached, on_sentence)
+        
+        # Streaming callers need their own sentence callbacks, so they are not coalesced
+        if on_sentence:
+            return await self._route_and_store(query, query_type, on_sentence, cache_key, prefix)
+        
+        # Identical concurrent requests share one backend call
+        result, shared = await self.single_flight.do(
+            request_key,
+            lambda: self._route_and_store(query, query_type, None, cache_key, prefix)
+        )
+        if shared:
+            result['coalesced'] = True
+            result['processing_time'] = time.time() - start_time
+        return result
+    
+    async def _route_and_store(self, query: str, query_type: str,
+                               on_sentence: Optional[Callable[[str], Any]],
+                               cache_key: Optional[str],
+                               prefix: Optional[str] = None) -> Dict[str, Any]:
+        """Route a query and cache the answer"""
+        result = await self._route_query(query, query_type, on_sentence, prefix)
+        
+        # Only complete, successful answers are worth replaying
+        if (cache_key and result.get('success') and not result.get('truncated')
+                and not result.get('partial')):
+            self.response_cache.put(cache_key, query_type, {
+                'response': result['response'],
+                'success': True,
+                'ai_model': result.get('ai_model')
+            })
+        
+        return result
+    
+    async def _route_query(self, query: str, query_type: str,
+                           on_sentence: Optional[Callable[[str], Any]] = None,
+                           prefix: Optional[str] = None) -> Dict[str, Any]:
+        """Send a query to the first backend that answers"""
         start_time = time.time()
         
         try:
-            # Try Cohere first (working API)
-            result = await self._try_cohere(query, query_type)
-            if result:
-                result['processing_time'] = time.time() - start_time
-                result['ai_model'] = "cohere-command-r"
-                return result
+            if prefix:
+                # Prefix prompts are short-answer classification calls, never streamed
+                backends = self._backend_order(query_type, prefix_query=query, prefix=prefix)
+                result = await self._race_backends(backends, f"{prefix}\n\n{query}", query_type)
+                if result:
+                    result['processing_time'] = time.time() - start_time
+                    return self._emit_sentences(result, on_sentence)
+                return {
+                    'response': "I'm sorry, all AI services are currently unavailable. Please check your internet connection and try again.",
+                    'success': False,
+                    'processing_time': time.time() - start_time,
+                    'ai_model': 'offline'
+                }
             
-            # Try Ollama second (local, fast, private)
-            if query_type in ["general", "content", "code"]:
-                result = await self._try_ollama(query, query_type)
+            # Streaming mode: local model first so speech can start on the first sentence
+            if (on_sentence and query_type in ["general", "content", "code"]
+                    and self.scoreboard.breaker('ollama').allow_request()):
+                stream_start = time.time()
+                result = await self._try_ollama_streaming(query, query_type, on_sentence)
+                self.scoreboard.record('ollama', query_type, time.time() - stream_start,
+                                       bool(result) and not result.get('partial'))
                 if result:
                     result['processing_time'] = time.time() - start_time
                     result['ai_model'] = f"ollama-{self.ollama_model}"
                     return result
             
-            # Fallback to Groq (if API key gets fixed)
-            result = await self._try_groq(query, query_type)
+            # Cohere first (working API), then Ollama (local, private), then Groq
+            backends = self._backend_order(query_type, include_ollama=not on_sentence)
+            result = await self._race_backends(backends, query, query_type)
             if result:
                 result['processing_time'] = time.time() - start_time
-                result['ai_model'] = "groq-mixtral"
-                return result
+                return self._emit_sentences(result, on_sentence)
             
             # If all AI services fail, return offline response
             return {
@@ -184,30 +308,215 @@ class AIRouter:
                 'ai_model': 'error'
             }
     
+    def _backend_order(self, query_type: str, include_ollama: bool = True,
+                       prefix_query: Optional[str] = None,
+                       prefix: Optional[str] = None) -> List[tuple]:
+        """Candidate backends as (name, attempt coroutine, model label), best first
+        
+        Backends with an open circuit breaker are left out so a known-down service
+        costs nothing; the rest are ordered by expected latency for this query type.
+        With a prefix, Ollama is always a candidate and reuses the evaluated prefix.
+        """
+        candidates = {'cohere': (self._try_cohere, "cohere-command-r")}
+        if prefix:
+            candidates['ollama'] = (
+                lambda full_query, qtype: self._try_ollama_with_prefix(prefix, prefix_query, qtype),
+                f"ollama-{self.ollama_model}"
+            )
+        elif include_ollama and query_type in ["general", "content", "code"]:
+            candidates['ollama'] = (self._try_ollama, f"ollama-{self.ollama_model}")
+        candidates['groq'] = (self._try_groq, "groq-mixtral")
+        
+        ranked = self.scoreboard.rank(list(candidates), query_type)
+        return [(name, candidates[name][0], candidates[name][1]) for name in ranked]
+    
+    async def _race_backends(self, backends: List[tuple], query: str,
+                             query_type: str) -> Optional[Dict[str, Any]]:
+        """Try backends in order, hedging with the next one when the current is slow
+        
+        A backend that fails starts the next one straight away. A backend that has not
+        answered within hedge_delay seconds gets the next one started in parallel. The
+        first successful answer wins and everything still running is cancelled.
+        """
+        start_time = time.time()
+        waiting = list(backends)
+        running = {}
+        durations = {}
+        launched = []
+        
+        def launch_next() -> bool:
+            """Start the next backend whose breaker still lets the call through"""
+            while waiting:
+                name, attempt, label = waiting.pop(0)
+                if not self.scoreboard.breaker(name).allow_request():
+                    continue
+                task = asyncio.ensure_future(attempt(query, query_type))
+                running[task] = (name, label, time.time())
+                launched.append(name)
+                return True
+            return False
+        
+        if not launch_next():
+            return None
+        
+        try:
+            while running:
+                hedge_timeout = self.hedge_delay if (waiting and self.hedging_enabled) else None
+                done, _ = await asyncio.wait(
+                    list(running), timeout=hedge_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # Current backend is slow - race the next one alongside it
+                    launch_next()
+                    continue
+                
+                failed = False
+                for task in done:
+                    name, label, started_at = running.pop(task)
+                    durations[name] = time.time() - started_at
+                    result = None if task.cancelled() or task.exception() else task.result()
+                    self.scoreboard.record(name, query_type, durations[name], bool(result))
+                    
+                    if result:
+                        result['ai_model'] = label
+                        result['backend'] = name
+                        if len(launched) > 1:
+                            result['hedge'] = self._hedge_report(
+                                name, backends, launched, running, durations, start_time
+                            )
+                        return result
+                    failed = True
+                
+                if failed and waiting:
+                    launch_next()
+        finally:
+            for task in running:
+                task.cancel()
+        
+        return None
+    
+    def _hedge_report(self, winner: str, backends: List[tuple], launched: List[str],
+                      running: Dict, durations: Dict[str, float],
+                      start_time: float) -> Dict[str, Any]:
+        """Describe a hedged race and estimate the latency it saved
+        
+        The sequential estimate is what strict one-after-another fallback would have
+        cost: every backend ahead of the winner runs to completion first. Backends that
+        were cancelled only count the time they had run, so the saving is a lower bound.
+        """
+        now = time.time()
+        elapsed = dict(durations)
+        for name, label, started_at in running.values():
+            elapsed[name] = now - started_at
+        
+        sequential_estimate = 0.0
+        for name, attempt, label in backends:
+            if name not in elapsed:
+                continue
+            sequential_estimate += elapsed[name]
+            if name == winner:
+                break
+        
+        actual = now - start_time
+        return {
+            'winner': winner,
+            'launched': launched,
+            'cancelled': [name for name, label, started_at in running.values()],
+            'latency': actual,
+            'latency_saved': max(0.0, sequential_estimate - actual)
+        }
+    
+    def _emit_sentences(self, result: Dict[str, Any],
+                        on_sentence: Optional[Callable[[str], Any]]) -> Dict[str, Any]:
+        """Feed a non-streamed response to the sentence callback"""
+        if on_sentence:
+            for sentence in split_sentences(result.get('response', '')):
+                if on_sentence(sentence) is False:
+                    result['truncated'] = True
+                    break
+        return result
+    
+    async def stream_query(self, query: str, query_type: str = "general",
+                           model: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield response tokens from Ollama as they are generated"""
+        system_prompt = self._get_system_prompt(query_type)
+        
+        async for chunk in self.ollama_client.stream_generate(
+            f"{system_prompt}\n\nUser: {query}\nAssistant:",
+            model=model,
+            options=self.generation_options,
+            timeout=30
+        ):
+            token = chunk.get('response', '')
+            if token:
+                yield token
+    
+    async def _try_ollama_streaming(self, query: str, query_type: str,
+                                    on_sentence: Callable[[str], Any]) -> Optional[Dict[str, Any]]:
+        """Stream Ollama output and hand off each completed sentence"""
+        splitter = SentenceSplitter()
+        parts = []
+        start_time = time.time()
+        first_sentence_time = None
+        truncated = False
+        partial = False
+        
+        try:
+            tokens = self.stream_query(query, query_type)
+            try:
+                async for token in tokens:
+                    parts.append(token)
+                    for sentence in splitter.feed(token):
+                        if first_sentence_time is None:
+                            first_sentence_time = time.time() - start_time
+                        if on_sentence(sentence) is False:
+                            truncated = True
+                            break
+                    if truncated:
+                        break
+            finally:
+                await tokens.aclose()
+            
+            if not truncated:
+                remainder = splitter.flush()
+                if remainder:
+                    if first_sentence_time is None:
+                        first_sentence_time = time.time() - start_time
+                    on_sentence(remainder)
+            
+        except Exception as e:
+            print(f"Ollama streaming error: {e}")
+            # Nothing spoken yet - let the caller fall back to another backend
+            if not parts:
+                return None
+            # Part of the answer was already spoken - keep it, but it is cut off
+            partial = True
+        
+        if not parts:
+            return None
+        
+        return {
+            'response': ''.join(parts).strip(),
+            'success': True,
+            'streamed': True,
+            'truncated': truncated,
+            'partial': partial,
+            'first_sentence_time': first_sentence_time
+        }
+    
     async def _try_ollama(self, query: str, query_type: str) -> Optional[Dict[str, Any]]:
         """Try processing with Ollama"""
         try:
             system_prompt = self._get_system_prompt(query_type)
             
-            payload = {
-                "model": self.ollama_model,
-                "prompt": f"{system_prompt}\n\nUser: {query}\nAssistant:",
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 2048
-                }
-            }
-            
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=payload,
+            result = await self.ollama_client.generate(
+                f"{system_prompt}\n\nUser: {query}\nAssistant:",
+                options=self.generation_options,
                 timeout=30
             )
             
-            if response.status_code == 200:
-                result = response.json()
+            if result:
                 return {
                     'response': result.get('response', '').strip(),
                     'success': True
@@ -218,6 +527,32 @@ class AIRouter:
         
         return None
     
+    async def _try_ollama_with_prefix(self, prefix: str, query: str,
+                                      query_type: str) -> Optional[Dict[str, Any]]:
+        """Try Ollama with the static prefix evaluated once and reused across calls"""
+        try:
+            system_prompt = self._get_system_prompt(query_type)
+            
+            result = await self.ollama_client.generate_with_prefix(
+                f"{system_prompt}\n\n{prefix}",
+                f"User: {query}\nAssistant:",
+                options=self.generation_options,
+                timeout=30
+            )
+            
+            if result:
+                return {
+                    'response': result.get('response', '').strip(),
+                    'success': True,
+                    'prefix_reused': result.get('prefix_reused', False),
+                    'prompt_eval_saved_ms': result.get('prompt_eval_saved_ms', 0.0)
+                }
+            
+        except Exception as e:
+            print(f"Ollama prefix error: {e}")
+        
+        return None
+    
     async def _try_groq(self, query: str, query_type: str) -> Optional[Dict[str, Any]]:
         """Try processing with Groq"""
         try:
@@ -226,7 +561,8 @@ class AIRouter:
             
             system_prompt = self._get_system_prompt(query_type)
             
-            response = self.groq_client.chat.completions.create(
+            response = await self.transport.pool('groq').run(
+                self.groq_client.chat.completions.create,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": query}
@@ -255,7 +591,8 @@ class AIRouter:
             system_prompt = self._get_system_prompt(query_type)
             full_prompt = f"{system_prompt}\n\nUser: {query}\nAssistant:"
             
-            response = self.cohere_client.generate(
+            response = await self.transport.pool('cohere').run(
+                self.cohere_client.generate,
                 model='command-r-plus',
                 prompt=full_prompt,
                 max_tokens=2048,
@@ -319,8 +656,9 @@ class AIRouter:
         
         try:
             result = await self.process_query(
-                f"{classification_prompt}\n\nClassify this: {query}",
-                "classification"
+                f"Classify this: {query}",
+                "classification",
+                prefix=classification_prompt
             )
             
             if result['success']:
@@ -384,7 +722,8 @@ Line 3: [Third mistake explanation]
 
 Keep each line concise and specific about the actual errors in the code."""
 
-            response = self.openai_client.chat.completions.create(
+            response = await self.transport.pool('openai').run(
+                self.openai_client.chat.completions.create,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a code reviewer. Analyze code and explain mistakes in exactly 3 lines."},
@@ -425,14 +764,42 @@ Keep each line concise and specific about the actual errors in the code."""
                 ]
             }
     
-    def get_service_status(self) -> Dict[str, bool]:
-        """Get status of all AI services"""
-        return {
-            'ollama': self._test_ollama(),
-            'groq': self._test_groq(),
-            'cohere': self._test_cohere(),
-            'openai': self._test_openai()
-        }
+    def get_service_status(self, refresh: bool = False) -> Dict[str, bool]:
+        """Get status of all AI services (latest cached health check unless refresh=True)"""
+        if refresh:
+            return self.health_monitor.check_now()
+        return self.health_monitor.get_status()
+    
+    def get_transport_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-backend connection pool usage"""
+        return self.transport.get_stats()
+    
+    def get_backend_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker states and latency/error estimates per backend"""
+        return self.scoreboard.get_stats()
+    
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get how many concurrent identical requests were collapsed into one call"""
+        return self.single_flight.get_stats()
+    
+    def get_prefix_stats(self) -> Dict[str, Any]:
+        """Get Ollama prompt-prefix reuse counters and prompt-eval time saved"""
+        return self.ollama_client.get_prefix_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get response cache hit/miss counters"""
+        if not self.response_cache:
+            return {'enabled': False}
+        stats = self.response_cache.get_stats()
+        stats['enabled'] = True
+        return stats
+    
+    def close(self):
+        """Stop health checks and release pooled connections, workers and the cache"""
+        self.health_monitor.stop()
+        self.transport.close()
+        if self.response_cache:
+            self.response_cache.close()
 
 # Test the AI Router
 if __name__ == "__main__":
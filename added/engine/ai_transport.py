@@ -0,0 +1,135 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Default number of simultaneous in-flight calls per backend.
+# Override with AI_CONCURRENCY_<BACKEND>, e.g. AI_CONCURRENCY_OLLAMA=1
+DEFAULT_CONCURRENCY = {
+    'ollama': 2,
+    'groq': 4,
+    'cohere': 4,
+    'openai': 4
+}
+
+class BackendPool:
+    """Keep-alive HTTP session and bounded worker pool for a single AI backend"""
+    
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        
+        # One long-lived session so TCP/TLS connections are reused between queries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_concurrency,
+            max_retries=0
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Worker count doubles as the concurrency limit and works with any event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=f"ai-{name}"
+        )
+        
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.total_calls = 0
+        self.failed_calls = 0
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on this backend's workers without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._tracked_call, func, *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+    
+    def _tracked_call(self, func: Callable, *args, **kwargs) -> Any:
+        """Execute a call and keep in-flight counters up to date"""
+        with self._lock:
+            self.in_flight += 1
+            self.total_calls += 1
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed_calls += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+    
+    async def get(self, url: str, timeout: float = 5, **kwargs) -> requests.Response:
+        """Awaitable GET over the pooled session"""
+        return await self.run(self.session.get, url, timeout=timeout, **kwargs)
+    
+    async def post_json(self, url: str, payload: Dict[str, Any], timeout: float = 30,
+                        **kwargs) -> requests.Response:
+        """Awaitable JSON POST over the pooled session"""
+        return await self.run(self.session.post, url, json=payload, timeout=timeout, **kwargs)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool usage counters"""
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'total_calls': self.total_calls,
+                'failed_calls': self.failed_calls
+            }
+    
+    def close(self):
+        """Release pooled connections and worker threads"""
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+class AsyncTransport:
+    """Registry of per-backend connection pools used by AIRouter"""
+    
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = dict(DEFAULT_CONCURRENCY)
+        if limits:
+            self.limits.update(limits)
+        
+        self._pools: Dict[str, BackendPool] = {}
+        self._lock = threading.Lock()
+    
+    def _get_limit(self, name: str) -> int:
+        """Resolve the concurrency limit for a backend (env overrides defaults)"""
+        env_value = os.getenv(f"AI_CONCURRENCY_{name.upper()}")
+        if env_value:
+            try:
+                return int(env_value)
+            except ValueError:
+                print(f"⚠️ Invalid AI_CONCURRENCY_{name.upper()}={env_value}, using default")
+        return self.limits.get(name, 2)
+    
+    def pool(self, name: str) -> BackendPool:
+        """Get (or lazily create) the pool for a backend"""
+        with self._lock:
+            if name not in self._pools:
+                self._pools[name] = BackendPool(name, self._get_limit(name))
+            return self._pools[name]
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get usage counters for every backend pool"""
+        with self._lock:
+            pools = dict(self._pools)
+        return {name: pool.get_stats() for name, pool in pools.items()}
+    
+    def close(self):
+        """Close all backend pools"""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
@@ -208,22 +208,14 @@ class AndroidController:
         try:
             print(f"📱 WhatsApp {action_type} to {contact_name}")
             
-            # Get real contact from database
+            # Get real contact from the contact index (exact, prefix and sound-alike matches)
             if self.db_manager:
                 contact = self.db_manager.get_contact(contact_name)
                 if not contact:
-                    # Try fuzzy search
-                    all_contacts = self.db_manager.get_all_contacts()
-                    for c in all_contacts:
-                        if contact_name.lower() in c['name'].lower() or c['name'].lower() in contact_name.lower():
-                            contact = c
-                            break
-                    
-                    if not contact:
-                        return {
-                            'success': False,
-                            'message': f"Contact '{contact_name}' not found in your phone contacts. Please sync your contacts first."
-                        }
+                    return {
+                        'success': False,
+                        'message': f"Contact '{contact_name}' not found in your phone contacts. Please sync your contacts first."
+                    }
                 
                 mobile_no = contact['mobile_no']
                 actual_name = contact['name']
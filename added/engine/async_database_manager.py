@@ -0,0 +1,93 @@
+import os
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from .database_manager import DatabaseManager
+
+class AsyncDatabaseManager:
+    """Awaitable facade over DatabaseManager
+    
+    Exposes the same methods as DatabaseManager, but every call is a coroutine
+    that runs on a small dedicated thread pool, so a slow MongoDB or a locked
+    SQLite file never blocks the event loop. Each pool thread gets its own
+    SQLite connection from the DatabaseManager's per-thread pool. At most
+    max_pending calls per event loop are in flight; later callers wait their
+    turn instead of piling work onto the executor queue.
+    
+    Plain attributes (e.g. contact_index, mongo_db) are passed through as-is.
+    The DatabaseManager must be passed in: the facade never builds its own,
+    since that would open a second set of databases and a persister thread.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager,
+                 max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        if db_manager is None:
+            raise ValueError("AsyncDatabaseManager needs an existing DatabaseManager")
+        self.db_manager = db_manager
+        self.max_workers = max_workers or int(os.getenv('DB_EXECUTOR_WORKERS', '4'))
+        self.max_pending = max_pending or int(os.getenv('DB_EXECUTOR_MAX_PENDING', '64'))
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='jarvis-db')
+        # asyncio primitives belong to one loop, and callers run several (one per Eel call)
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._methods: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'waited': 0, 'errors': 0}
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        """In-flight limit for the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_pending)
+                self._semaphores[loop] = semaphore
+        return semaphore
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking storage call on the database executor"""
+        semaphore = self._semaphore()
+        if semaphore.locked():
+            self.stats['waited'] += 1
+        
+        async with semaphore:
+            self.stats['calls'] += 1
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(func, *args, **kwargs)
+                )
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names not defined on the facade itself
+        if name == 'db_manager':
+            raise AttributeError(name)
+        attribute = getattr(self.db_manager, name)
+        if not callable(attribute) or name.startswith('__'):
+            return attribute
+        
+        method = self._methods.get(name)
+        if method is None:
+            @functools.wraps(attribute)
+            async def method(*args, **kwargs):
+                return await self.run(getattr(self.db_manager, name), *args, **kwargs)
+            self._methods[name] = method
+        return method
+    
+    async def close_connections(self):
+        """Close the database connections, then stop the executor"""
+        try:
+            await self.run(self.db_manager.close_connections)
+        finally:
+            self._executor.shutdown(wait=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Executor call counters"""
+        return {**self.stats, 'max_workers': self.max_workers, 'max_pending': self.max_pending}
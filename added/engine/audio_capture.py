@@ -0,0 +1,216 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+import numpy as np
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+class AudioRingBuffer:
+    """Fixed-size int16 ring with one writer and any number of readers
+    
+    Readers never take a lock. Before copying a block in, the writer moves
+    `write_end` to where the block will end; only after the copy does it
+    advance `written` (plain ints, so each update is atomic). Slots below
+    write_end - capacity are being or have been overwritten, so a reader that
+    lands there - before or while copying - skips ahead instead of returning
+    torn samples. The condition variable is used only to sleep until data arrives.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self.written = 0  # total samples ever written
+        self.write_end = 0  # end of the block being written (== written when idle)
+        self.overruns = 0
+        self._data_ready = threading.Condition()
+    
+    def write(self, samples: np.ndarray):
+        """Append samples (writer thread only)"""
+        samples = samples[-self.capacity:]
+        count = len(samples)
+        start = self.written % self.capacity
+        # Reserve the slots first so readers treat them as overwritten from now on
+        self.write_end = self.written + count
+        first = min(count, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[:count - first] = samples[first:]
+        self.written += count
+        
+        with self._data_ready:
+            self._data_ready.notify_all()
+    
+    def wait_for(self, position: int, timeout: Optional[float]) -> bool:
+        """Block until `position` samples have been written"""
+        if self.written >= position:
+            return True
+        with self._data_ready:
+            return self._data_ready.wait_for(lambda: self.written >= position, timeout)
+    
+    def read(self, position: int, count: int) -> tuple:
+        """Copy up to count samples from position; returns (samples, new_position)"""
+        oldest = self.write_end - self.capacity
+        if position < oldest:
+            # Reader fell more than a buffer behind - resume at the oldest sample still held
+            self.overruns += 1
+            position = oldest
+        count = max(0, min(count, self.written - position))
+        
+        start = position % self.capacity
+        first = min(count, self.capacity - start)
+        samples = np.concatenate((self._buffer[start:start + first], self._buffer[:count - first]))
+        
+        if position < self.write_end - self.capacity:
+            # Overwritten while copying - drop the torn samples and retry from the new oldest
+            self.overruns += 1
+            return self.read(self.write_end - self.capacity, count)
+        return samples, position + count
+
+class CaptureConsumer:
+    """Independent read cursor into the capture ring (one per wake word, VAD, meter...)"""
+    
+    def __init__(self, service: "AudioCaptureService", position: int):
+        self.service = service
+        self.position = position
+    
+    def read(self, samples: int, timeout: Optional[float] = 1.0) -> Optional[np.ndarray]:
+        """Next `samples` samples as int16, or None if they did not arrive in time"""
+        ring = self.service.ring
+        if not ring.wait_for(self.position + samples, timeout):
+            return None
+        data, self.position = ring.read(self.position, samples)
+        return data
+    
+    def read_bytes(self, samples: int, timeout: Optional[float] = 1.0) -> Optional[bytes]:
+        """Same as read(), as raw 16-bit PCM"""
+        data = self.read(samples, timeout)
+        return data.tobytes() if data is not None else None
+    
+    @property
+    def available(self) -> int:
+        return self.service.ring.written - self.position
+    
+    def skip_to_latest(self):
+        """Drop everything buffered so far"""
+        self.position = self.service.ring.written
+
+class AudioCaptureService:
+    """One long-lived microphone stream shared by every audio consumer
+    
+    PortAudio's callback writes into an AudioRingBuffer holding the last
+    buffer_seconds of audio. Wake word detection, command capture, VAD and
+    level meters each read through their own CaptureConsumer, so nothing
+    opens or closes a stream per command, and a capture can start up to
+    pre_roll_ms in the past (or at an exact earlier position, e.g. the end
+    of the wake word) instead of losing the first words.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, frames_per_buffer: int = 512,
+                 buffer_seconds: Optional[float] = None, pre_roll_ms: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.frames_per_buffer = frames_per_buffer
+        self.buffer_seconds = buffer_seconds or float(os.getenv('AUDIO_BUFFER_SECONDS', '10'))
+        self.pre_roll_ms = pre_roll_ms if pre_roll_ms is not None else int(os.getenv('AUDIO_PRE_ROLL_MS', '300'))
+        self.ring = AudioRingBuffer(int(self.sample_rate * self.buffer_seconds))
+        
+        self.pyaudio_instance = None
+        self.stream = None
+        self.users = 0
+        self.stats = {'stream_opens': 0, 'callback_errors': 0}
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> "AudioCaptureService":
+        """Register a user; the stream opens with the first one"""
+        with self._lock:
+            if self.stream is None:
+                self._open_stream()
+            self.users += 1
+        return self
+    
+    def release(self):
+        """Unregister a user; the stream closes with the last one"""
+        with self._lock:
+            self.users = max(0, self.users - 1)
+            if self.users == 0:
+                self._close_stream()
+    
+    def _open_stream(self):
+        if pyaudio is None:
+            raise RuntimeError("PyAudio is not installed")
+        self.pyaudio_instance = pyaudio.PyAudio()
+        self.stream = self.pyaudio_instance.open(
+            rate=self.sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._on_audio
+        )
+        self.stream.start_stream()
+        self.stats['stream_opens'] += 1
+        print("🎙️ Audio capture stream started")
+    
+    def _close_stream(self):
+        if self.stream is not None:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                print(f"Audio capture close error: {e}")
+            self.stream = None
+        if self.pyaudio_instance is not None:
+            self.pyaudio_instance.terminate()
+            self.pyaudio_instance = None
+    
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback - runs on the audio thread, so it only copies"""
+        try:
+            self.ring.write(np.frombuffer(in_data, dtype=np.int16))
+        except Exception:
+            self.stats['callback_errors'] += 1
+        return (None, pyaudio.paContinue)
+    
+    @property
+    def position(self) -> int:
+        """Total samples captured so far (a cursor for consumer(start_at=...))"""
+        return self.ring.written
+    
+    def consumer(self, pre_roll_ms: Optional[int] = None, start_at: Optional[int] = None) -> CaptureConsumer:
+        """New reader starting at start_at, or pre_roll_ms before now (default AUDIO_PRE_ROLL_MS)"""
+        if start_at is None:
+            pre_roll_ms = self.pre_roll_ms if pre_roll_ms is None else pre_roll_ms
+            start_at = self.ring.written - self.sample_rate * pre_roll_ms // 1000
+        return CaptureConsumer(self, max(0, self.ring.write_end - self.ring.capacity, start_at))
+    
+    def level(self, window_ms: int = 50) -> float:
+        """RMS level (0..1) of the most recent audio, for level meters"""
+        count = min(self.ring.written, self.sample_rate * window_ms // 1000)
+        if count == 0:
+            return 0.0
+        samples, _ = self.ring.read(self.ring.written - count, count)
+        samples = samples.astype(np.float32) / 32768.0
+        return float(np.sqrt(np.mean(samples * samples)))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Stream and buffer counters"""
+        return {
+            **self.stats,
+            'running': self.stream is not None,
+            'users': self.users,
+            'captured_seconds': round(self.ring.written / self.sample_rate, 1),
+            'overruns': self.ring.overruns,
+            'buffer_seconds': self.buffer_seconds,
+            'pre_roll_ms': self.pre_roll_ms
+        }
+
+_shared_capture = None
+_shared_lock = threading.Lock()
+
+def get_capture_service() -> AudioCaptureService:
+    """Process-wide capture service (the stream opens on the first acquire())"""
+    global _shared_capture
+    with _shared_lock:
+        if _shared_capture is None:
+            _shared_capture = AudioCaptureService()
+        return _shared_capture
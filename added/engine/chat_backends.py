@@ -0,0 +1,303 @@
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from .chat_store import ChatStore
+from .sqlite_pool import SQLitePool
+from .mongo_standin import MemoryMongoClient
+
+class ChatBackend(ABC):
+    """Storage interface for chat history
+    
+    Records passed to append() are chat turns ({'timestamp', 'user_input',
+    'response', 'intent', 'processing_time', 'ai_model_used'}). append()
+    raises on failure so the write-behind persister can retry or spill.
+    
+    Every backend counts the same way: history() returns the last limit
+    turns and page() the last limit messages, rounded up to whole turns.
+    Cursors are '<backend name>:<key>'; one from another backend (or a bare
+    key this backend cannot use) reads from the newest entry instead.
+    """
+    
+    name = 'base'
+    
+    @abstractmethod
+    def append(self, records: List[Dict[str, Any]]):
+        """Store a batch of chat turns (raises on failure)"""
+    
+    @abstractmethod
+    def history(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Stored entries of the last limit turns older than the before cursor, in the backend's own format"""
+    
+    @abstractmethod
+    def page(self, limit: int = 20, before: Optional[str] = None) -> Dict[str, Any]:
+        """{'messages' (oldest first), 'next_before', 'has_more'}"""
+    
+    @abstractmethod
+    def _valid_key(self, key: str) -> bool:
+        """Whether key can be a position in this backend"""
+    
+    def close(self):
+        pass
+    
+    def parse_cursor(self, before: Optional[str]) -> Optional[str]:
+        """The key in a before cursor, or None to start from the newest entry"""
+        if not before:
+            return None
+        name, separator, key = str(before).rpartition(':')
+        if separator and name != self.name:
+            return None
+        return key if self._valid_key(key) else None
+    
+    def _cursor(self, key: Any) -> str:
+        return f"{self.name}:{key}"
+    
+    @staticmethod
+    def _page_turns(limit: int) -> int:
+        """Whole turns needed for a page of limit messages"""
+        return max(1, (limit + 1) // 2)
+    
+    def with_unwritten(self, method: str, result: Any, records: List[Dict[str, Any]]) -> Any:
+        """Add turns still queued for writing (oldest first) to a newest history() or page() result"""
+        if method == 'page':
+            messages = [message for turn in records for message in self._turn_messages(turn, '')]
+            return {**result, 'messages': result['messages'] + messages}
+        return list(reversed(records)) + result
+    
+    @staticmethod
+    def _turn_messages(turn: Dict[str, Any], turn_id: str) -> List[Dict[str, Any]]:
+        """The user and assistant page messages of one turn"""
+        timestamp = str(turn.get('timestamp', ''))
+        return [
+            {
+                'id': turn_id,
+                'sender': 'user',
+                'message': turn.get('user_input', ''),
+                'timestamp': timestamp
+            },
+            {
+                'id': turn_id,
+                'sender': 'assistant',
+                'message': turn.get('response', ''),
+                'timestamp': timestamp,
+                'metadata': {
+                    'intent': turn.get('intent'),
+                    'processing_time': turn.get('processing_time'),
+                    'ai_model': turn.get('ai_model_used')
+                }
+            }
+        ]
+    
+    def _turns_to_page(self, turns: List[Dict[str, Any]], wanted: int, id_field: str) -> Dict[str, Any]:
+        """Expand newest-first turns into user/assistant messages with the next cursor"""
+        messages = []
+        for turn in reversed(turns):
+            messages.extend(self._turn_messages(turn, str(turn[id_field])))
+        next_before = self._cursor(turns[-1][id_field]) if turns and len(turns) == wanted else None
+        return {'messages': messages, 'next_before': next_before, 'has_more': next_before is not None}
+
+class MongoChatBackend(ChatBackend):
+    """One document per turn in <db>.chat_history, paged by _id
+    
+    The client connects lazily: nothing is probed at startup, and an
+    unreachable server only shows up as a failed (and retried) write.
+    """
+    
+    name = 'mongo'
+    
+    def __init__(self, client: Any, db_name: Optional[str] = None):
+        self.client = client
+        self.db = client[db_name or os.getenv('DB_NAME', 'jarvis_unified')]
+        self.collection = self.db['chat_history']
+    
+    def append(self, records: List[Dict[str, Any]]):
+        try:
+            self.collection.insert_many(records, ordered=True)
+        except BulkWriteError as e:
+            # Ordered insert stops at the first failure; only retry what did not land
+            del records[:e.details.get('nInserted', 0)]
+            raise
+    
+    def history(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        key = self.parse_cursor(before)
+        query = {'_id': {'$lt': ObjectId(key)}} if key else {}
+        return list(self.collection.find(query).sort('_id', -1).limit(limit))
+    
+    def page(self, limit: int = 20, before: Optional[str] = None) -> Dict[str, Any]:
+        # Each document holds one exchange (user message + assistant response)
+        turns = self._page_turns(limit)
+        return self._turns_to_page(self.history(turns, before), turns, '_id')
+    
+    def _valid_key(self, key: str) -> bool:
+        return ObjectId.is_valid(key)
+    
+    def close(self):
+        self.client.close()
+
+class SQLiteChatBackend(ChatBackend):
+    """One row per turn in a chat_turns table, paged by rowid"""
+    
+    name = 'sqlite'
+    
+    def __init__(self, pool: SQLitePool):
+        self.pool = pool
+        conn = self.pool.connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS chat_turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT,
+                user_input TEXT,
+                response TEXT,
+                intent VARCHAR(100),
+                processing_time REAL,
+                ai_model_used VARCHAR(100)
+            )
+        ''')
+        conn.commit()
+    
+    def append(self, records: List[Dict[str, Any]]):
+        rows = []
+        for record in records:
+            timestamp = record.get('timestamp')
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.isoformat()
+            rows.append((timestamp, record.get('user_input'), record.get('response'), record.get('intent'),
+                         record.get('processing_time'), record.get('ai_model_used')))
+        
+        conn = self.pool.connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO chat_turns (timestamp, user_input, response, intent, processing_time, ai_model_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+    
+    def history(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT id, timestamp, user_input, response, intent, processing_time, ai_model_used FROM chat_turns"
+        params: List[Any] = []
+        key = self.parse_cursor(before)
+        if key:
+            sql += " WHERE id < ?"
+            params.append(int(key))
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        
+        columns = ('id', 'timestamp', 'user_input', 'response', 'intent', 'processing_time', 'ai_model_used')
+        return [dict(zip(columns, row)) for row in self.pool.connection().execute(sql, params)]
+    
+    def page(self, limit: int = 20, before: Optional[str] = None) -> Dict[str, Any]:
+        turns = self._page_turns(limit)
+        return self._turns_to_page(self.history(turns, before), turns, 'id')
+    
+    def _valid_key(self, key: str) -> bool:
+        return key.isdigit()
+
+class JSONLChatBackend(ChatBackend):
+    """Append-only JSON Lines chat store (one line per message)"""
+    
+    name = 'jsonl'
+    
+    def __init__(self, chat_store: ChatStore):
+        self.chat_store = chat_store
+    
+    def append(self, records: List[Dict[str, Any]]):
+        # Constant-cost append, no matter how long the history is
+        self.chat_store.append(self._to_messages(records))
+    
+    @staticmethod
+    def _to_messages(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stored user/assistant messages of chat turns"""
+        messages = []
+        for chat_data in records:
+            # Convert datetime to string for JSON serialization
+            timestamp = chat_data['timestamp']
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.isoformat()
+            
+            messages.append({
+                'role': 'user',
+                'content': chat_data['user_input'],
+                'timestamp': timestamp
+            })
+            messages.append({
+                'role': 'assistant',
+                'content': chat_data['response'],
+                'timestamp': timestamp,
+                'metadata': {
+                    'intent': chat_data['intent'],
+                    'processing_time': chat_data['processing_time'],
+                    'ai_model': chat_data['ai_model_used']
+                }
+            })
+        return messages
+    
+    def history(self, limit: int = 50, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        # Two stored messages per turn
+        return self._read_messages(limit * 2, before)
+    
+    def _read_messages(self, count: int, before: Optional[str]) -> List[Dict[str, Any]]:
+        key = self.parse_cursor(before)
+        return self.chat_store.read_page(int(key) if key else None, count)
+    
+    def with_unwritten(self, method: str, result: Any, records: List[Dict[str, Any]]) -> Any:
+        if method == 'page':
+            return super().with_unwritten(method, result, records)
+        # History here is stored messages, oldest first
+        return result + self._to_messages(records)
+    
+    def page(self, limit: int = 20, before: Optional[str] = None) -> Dict[str, Any]:
+        messages = []
+        for record in self._read_messages(self._page_turns(limit) * 2, before):
+            message = {
+                'id': str(record.get('id', '')),
+                'sender': record.get('role', ''),
+                'message': record.get('content', ''),
+                'timestamp': record.get('timestamp', '')
+            }
+            if record.get('metadata'):
+                message['metadata'] = record['metadata']
+            messages.append(message)
+        
+        next_before = self._cursor(messages[0]['id']) if messages and int(messages[0]['id'] or 0) > 1 else None
+        return {'messages': messages, 'next_before': next_before, 'has_more': next_before is not None}
+    
+    def _valid_key(self, key: str) -> bool:
+        return key.isdigit()
+    
+    def close(self):
+        self.chat_store.close()
+
+CHAT_BACKENDS = ('mongo', 'memory', 'sqlite', 'jsonl')
+
+def create_chat_backend(kind: Optional[str] = None, sqlite_pool: Optional[SQLitePool] = None,
+                        chat_store: Optional[ChatStore] = None) -> ChatBackend:
+    """Build the chat backend named by CHAT_BACKEND (auto/mongo/memory/sqlite/jsonl)
+    
+    auto uses MongoDB at MONGO_URL (default mongodb://localhost:27017/, as
+    before), connecting lazily - DatabaseManager falls back to the local JSONL
+    store when it is unreachable. MONGO_URL=memory:// (or CHAT_BACKEND=memory)
+    selects the in-process Mongo stand-in.
+    """
+    kind = (kind or os.getenv('CHAT_BACKEND', 'auto')).lower()
+    mongo_url = os.getenv('MONGO_URL', 'mongodb://localhost:27017/')
+    
+    if kind == 'auto':
+        kind = 'mongo'
+    if kind == 'mongo' and mongo_url.startswith('memory://'):
+        kind = 'memory'
+    
+    if kind == 'mongo':
+        timeout_ms = int(os.getenv('MONGO_TIMEOUT_MS', '2000'))
+        client = MongoClient(mongo_url, connect=False,
+                             serverSelectionTimeoutMS=timeout_ms, connectTimeoutMS=timeout_ms)
+        return MongoChatBackend(client)
+    if kind == 'memory':
+        return MongoChatBackend(MemoryMongoClient(mongo_url))
+    if kind == 'sqlite':
+        return SQLiteChatBackend(sqlite_pool or SQLitePool())
+    if kind == 'jsonl':
+        return JSONLChatBackend(chat_store or ChatStore())
+    
+    raise ValueError(f"Unknown CHAT_BACKEND '{kind}' (expected auto, {', '.join(CHAT_BACKENDS)})")
@@ -0,0 +1,200 @@
+import os
+import time
+import queue
+import atexit
+import threading
+from typing import Callable, Dict, List, Optional, Any
+
+class ChatPersister:
+    """Write-behind queue that persists chat records off the request path
+    
+    save() only puts the record on a bounded queue and returns. A background
+    thread drains the queue and hands records to write_batch in groups of up
+    to batch_size, or whatever has arrived within flush_interval seconds
+    (one insert_many / one append instead of one round trip per message).
+    Failed batches are retried with exponential backoff; after max_retries
+    the batch goes to the spill writer so nothing is silently lost. Pending
+    records are flushed on close() and at interpreter exit; readers that
+    must see them before then can merge unwritten() into their results.
+    """
+    
+    def __init__(self, write_batch: Callable[[List[Dict[str, Any]]], None],
+                 spill: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 max_queue: Optional[int] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, max_retries: Optional[int] = None,
+                 backoff: float = 0.5, max_backoff: float = 30.0):
+        self.write_batch = write_batch
+        self.spill = spill
+        self.max_queue = max_queue or int(os.getenv('CHAT_PERSIST_QUEUE_SIZE', '1000'))
+        self.batch_size = batch_size or int(os.getenv('CHAT_PERSIST_BATCH_SIZE', '50'))
+        self.flush_interval = flush_interval if flush_interval is not None else \
+            float(os.getenv('CHAT_PERSIST_FLUSH_INTERVAL', '1.0'))
+        self.max_retries = max_retries if max_retries is not None else \
+            int(os.getenv('CHAT_PERSIST_MAX_RETRIES', '3'))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._pending = 0
+        # Queued and in-flight records, oldest first (the writer handles them in order)
+        self._unwritten: List[Dict[str, Any]] = []
+        self._pending_lock = threading.Lock()
+        self._idle = threading.Condition(self._pending_lock)
+        self._closed = False
+        
+        self.stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'retries': 0,
+            'spilled': 0,
+            'inline_writes': 0,
+            'dropped': 0
+        }
+        
+        self._thread = threading.Thread(target=self._run, name='chat-persister', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def save(self, record: Dict[str, Any]) -> bool:
+        """Queue a record for persistence; never waits on the database"""
+        if self._closed:
+            return self._write_inline(record)
+        
+        with self._pending_lock:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                record_queued = False
+            else:
+                record_queued = True
+                self._pending += 1
+                self._unwritten.append(record)
+                self.stats['queued'] += 1
+        if record_queued:
+            return True
+        
+        # Back-pressure: the writer is far behind, so keep the record
+        # locally right away instead of blocking or dropping it
+        return self._write_inline(record)
+    
+    def _write_inline(self, record: Dict[str, Any]) -> bool:
+        """Last-resort synchronous write through the spill writer"""
+        writer = self.spill or self.write_batch
+        try:
+            writer([record])
+            self.stats['inline_writes'] += 1
+            return True
+        except Exception as e:
+            print(f"❌ Chat persist error: {e}")
+            self.stats['dropped'] += 1
+            return False
+    
+    def _done(self, count: int):
+        """Mark records as handled and wake up flush() waiters"""
+        with self._pending_lock:
+            self._pending -= count
+            del self._unwritten[:count]
+            if self._pending <= 0:
+                self._idle.notify_all()
+    
+    def _run(self):
+        """Background loop: collect a batch, write it, repeat"""
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            
+            # write_batch may trim a partly written batch in place before retrying
+            count = len(batch)
+            self._write(batch)
+            self._done(count)
+            if stop:
+                break
+        
+        # Drain anything queued after the stop marker
+        leftover = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                leftover.append(record)
+        if leftover:
+            count = len(leftover)
+            self._write(leftover)
+            self._done(count)
+    
+    def _write(self, batch: List[Dict[str, Any]]):
+        """Write one batch, retrying with exponential backoff, then spill"""
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.write_batch(batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"⚠️ Chat batch write failed after {attempt + 1} attempts: {e}")
+                    break
+                self.stats['retries'] += 1
+                # Shutdown should not sit through the whole backoff schedule
+                time.sleep(0 if self._closed else delay)
+                delay = min(delay * 2, self.max_backoff)
+        
+        if self.spill:
+            try:
+                self.spill(batch)
+                self.stats['spilled'] += len(batch)
+                return
+            except Exception as e:
+                print(f"❌ Chat spill error: {e}")
+        self.stats['dropped'] += len(batch)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued record has been written (True if it got there)"""
+        with self._pending_lock:
+            return self._idle.wait_for(lambda: self._pending <= 0, timeout)
+    
+    def pending(self) -> int:
+        """Records queued but not yet written"""
+        return max(self._pending, 0)
+    
+    def unwritten(self) -> List[Dict[str, Any]]:
+        """Copies of the records queued or being written, oldest first (never waits on the writer)"""
+        with self._pending_lock:
+            return [dict(record) for record in self._unwritten]
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush pending records and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and write counters"""
+        return {**self.stats, 'pending': self.pending(), 'batch_size': self.batch_size}
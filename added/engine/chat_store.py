@@ -0,0 +1,556 @@
+import os
+import re
+import json
+import gzip
+import time
+import bisect
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+class ChatStore:
+    """Append-only JSON Lines chat log with batched fsync and segment rotation
+    
+    Messages are appended to <directory>/chat.jsonl, one JSON object per line,
+    so saving a message costs the same however long the history is and a crash
+    can at most lose or truncate the last line. The active file is rotated into
+    a numbered segment once it passes max_bytes or the day changes; rotated
+    segments are gzip-compressed in the background.
+    
+    Reads never scan the whole history: a sidecar (chat.jsonl.idx) keeps the
+    byte offset of every index_stride-th message in the active file, and
+    segments.json records the id range of each rotated segment, so a page of
+    messages costs the same at 100 messages or 1,000,000.
+    """
+    
+    ACTIVE_NAME = 'chat.jsonl'
+    MANIFEST_NAME = 'segments.json'
+    SEGMENT_PATTERN = re.compile(r'^chat-(\d{8})-(\d{6})\.jsonl(\.gz)?$')
+    
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 rotate_daily: Optional[bool] = None, compress: Optional[bool] = None,
+                 fsync_every: Optional[int] = None, fsync_interval: Optional[float] = None,
+                 index_stride: int = 64):
+        self.directory = directory or os.getenv('CHAT_STORE_DIR', 'chat_history')
+        self.max_bytes = max_bytes or int(os.getenv('CHAT_STORE_MAX_BYTES', str(5 * 1024 * 1024)))
+        self.rotate_daily = rotate_daily if rotate_daily is not None else \
+            os.getenv('CHAT_STORE_ROTATE_DAILY', 'true').lower() == 'true'
+        self.compress = compress if compress is not None else \
+            os.getenv('CHAT_STORE_COMPRESS', 'true').lower() == 'true'
+        # fsync after this many appends or this many seconds, whichever comes first
+        self.fsync_every = fsync_every or int(os.getenv('CHAT_STORE_FSYNC_EVERY', '10'))
+        self.fsync_interval = fsync_interval if fsync_interval is not None else \
+            float(os.getenv('CHAT_STORE_FSYNC_INTERVAL', '2.0'))
+        self.index_stride = index_stride
+        
+        self.active_path = os.path.join(self.directory, self.ACTIVE_NAME)
+        self.index_path = self.active_path + '.idx'
+        self.manifest_path = os.path.join(self.directory, self.MANIFEST_NAME)
+        
+        self._lock = threading.Lock()
+        self._file = None
+        self._index_file = None
+        self._opened_day = None
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        
+        # Sparse (id, byte offset) index of the active file and rotated segment ranges
+        self._offsets: List[Tuple[int, int]] = []
+        self._manifest: List[Dict[str, Any]] = []
+        self._next_id = 1
+        
+        self.stats = {'appends': 0, 'messages': 0, 'fsyncs': 0, 'rotations': 0, 'page_reads': 0}
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_manifest()
+        self._load_offsets()
+        self._next_id = self._recover_next_id()
+    
+    # Writing
+    def append(self, messages: List[Dict[str, Any]]) -> List[int]:
+        """Append messages (assigning ascending ids) and return their ids"""
+        with self._lock:
+            self._rotate_if_needed()
+            if self._file is None:
+                self._open_active()
+            
+            ids = []
+            offset = self._file.tell()
+            chunks = []
+            index_lines = []
+            for message in messages:
+                record = dict(message)
+                record['id'] = self._next_id
+                line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+                
+                if not self._offsets or self._next_id - self._offsets[-1][0] >= self.index_stride:
+                    self._offsets.append((self._next_id, offset))
+                    index_lines.append(f"{self._next_id} {offset}\n")
+                
+                ids.append(self._next_id)
+                self._next_id += 1
+                offset += len(line)
+                chunks.append(line)
+            
+            self._file.write(b''.join(chunks))
+            self._file.flush()
+            if index_lines:
+                self._index_file.write(''.join(index_lines))
+                self._index_file.flush()
+            
+            self._unsynced += 1
+            self.stats['appends'] += 1
+            self.stats['messages'] += len(messages)
+            if (self._unsynced >= self.fsync_every
+                    or time.time() - self._last_fsync >= self.fsync_interval):
+                self._fsync()
+            
+            return ids
+    
+    def _open_active(self):
+        """Open the active segment and its offset sidecar for appending (lock held)"""
+        needs_newline = False
+        try:
+            with open(self.active_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+        except OSError:
+            pass
+        
+        self._file = open(self.active_path, 'ab')
+        if needs_newline:
+            # Terminate a line torn by a crash so it cannot swallow the next record
+            self._file.write(b'\n')
+        self._index_file = open(self.index_path, 'a', encoding='utf-8')
+        self._opened_day = self._file_day(self.active_path)
+    
+    def _close_active(self):
+        """Close the active segment and sidecar (lock held)"""
+        if self._file is not None:
+            if self._unsynced:
+                self._fsync()
+            self._file.close()
+            self._file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+    
+    def _fsync(self):
+        """Force buffered lines to disk (lock held)"""
+        if self._file is None:
+            return
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            print(f"Chat store fsync error: {e}")
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        self.stats['fsyncs'] += 1
+    
+    def flush(self):
+        """fsync anything not yet on disk"""
+        with self._lock:
+            if self._unsynced:
+                self._fsync()
+    
+    def close(self):
+        """Flush and close the active segment"""
+        with self._lock:
+            self._close_active()
+    
+    # Rotation
+    @staticmethod
+    def _file_day(path: str) -> Optional[str]:
+        """Day (YYYYMMDD) the file was last written, None if missing"""
+        try:
+            return datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y%m%d')
+        except OSError:
+            return None
+    
+    def _rotate_if_needed(self):
+        """Rotate the active file when it is too big or from an earlier day (lock held)"""
+        try:
+            size = os.path.getsize(self.active_path)
+        except OSError:
+            return
+        if size == 0 or not self._offsets:
+            return
+        
+        today = datetime.now().strftime('%Y%m%d')
+        day = self._opened_day or self._file_day(self.active_path)
+        if size < self.max_bytes and not (self.rotate_daily and day and day != today):
+            return
+        
+        self._close_active()
+        
+        segment_path = self._new_segment_path()
+        os.replace(self.active_path, segment_path)
+        self._manifest.append({
+            'name': os.path.basename(segment_path),
+            'first_id': self._offsets[0][0],
+            'last_id': self._next_id - 1
+        })
+        self._save_manifest()
+        
+        self._offsets = []
+        try:
+            os.remove(self.index_path)
+        except OSError:
+            pass
+        self.stats['rotations'] += 1
+        
+        if self.compress:
+            threading.Thread(target=self._compress_segment, args=(segment_path,),
+                             name="chat-store-compress", daemon=True).start()
+    
+    def _new_segment_path(self) -> str:
+        """Unique, time-ordered name for a rotated segment"""
+        stamp = datetime.now()
+        while True:
+            name = f"chat-{stamp.strftime('%Y%m%d-%H%M%S')}.jsonl"
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path) and not os.path.exists(path + '.gz'):
+                return path
+            stamp = datetime.fromtimestamp(stamp.timestamp() + 1)
+    
+    @staticmethod
+    def _compress_segment(path: str):
+        """gzip a rotated segment and remove the plain copy"""
+        try:
+            with open(path, 'rb') as source, gzip.open(path + '.gz.tmp', 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.replace(path + '.gz.tmp', path + '.gz')
+            os.remove(path)
+        except Exception as e:
+            print(f"Chat store compression error: {e}")
+    
+    def segments(self) -> List[str]:
+        """Rotated segment paths on disk, oldest first"""
+        found = {}
+        for name in os.listdir(self.directory):
+            match = self.SEGMENT_PATTERN.match(name)
+            if match:
+                key = match.group(1) + match.group(2)
+                # Prefer the plain file while a compression is still in progress
+                if key not in found or not match.group(3):
+                    found[key] = os.path.join(self.directory, name)
+        return [found[key] for key in sorted(found)]
+    
+    def _segment_path(self, name: str) -> Optional[str]:
+        """Current path of a rotated segment (plain or compressed)"""
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path):
+            return path
+        if os.path.exists(path + '.gz'):
+            return path + '.gz'
+        return None
+    
+    # Sidecar index and manifest
+    def _load_manifest(self):
+        """Load segment id ranges, indexing any segment the manifest does not know yet"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+        except (OSError, ValueError):
+            self._manifest = []
+        
+        known = {entry['name'] for entry in self._manifest}
+        changed = False
+        for path in self.segments():
+            name = os.path.basename(path)
+            if name.endswith('.gz'):
+                name = name[:-3]
+            if name in known:
+                continue
+            ids = [record.get('id', 0) for record in self._read_segment(path)]
+            if ids:
+                self._manifest.append({'name': name, 'first_id': min(ids), 'last_id': max(ids)})
+                changed = True
+        
+        if changed:
+            self._manifest.sort(key=lambda entry: entry['first_id'])
+            self._save_manifest()
+    
+    def _save_manifest(self):
+        """Atomically write the segment manifest"""
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f)
+        os.replace(temp_path, self.manifest_path)
+    
+    def _load_offsets(self):
+        """Load the active file's offset sidecar, rebuilding it if missing or stale"""
+        self._offsets = []
+        try:
+            size = os.path.getsize(self.active_path)
+        except OSError:
+            size = 0
+        if size == 0:
+            return
+        
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2:
+                        self._offsets.append((int(parts[0]), int(parts[1])))
+        except (OSError, ValueError):
+            self._offsets = []
+        
+        if not self._offsets or self._offsets[-1][1] >= size or self._offsets[0][1] != 0:
+            self._rebuild_offsets()
+    
+    def _rebuild_offsets(self):
+        """One-time scan of the active file to recreate its sidecar"""
+        self._offsets = []
+        offset = 0
+        try:
+            with open(self.active_path, 'rb') as f:
+                for line in f:
+                    record_id = self._parse_id(line)
+                    if record_id is not None and (
+                            not self._offsets or record_id - self._offsets[-1][0] >= self.index_stride):
+                        self._offsets.append((record_id, offset))
+                    offset += len(line)
+        except OSError:
+            pass
+        
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{record_id} {offset}\n" for record_id, offset in self._offsets)
+    
+    @staticmethod
+    def _parse_id(line: bytes) -> Optional[int]:
+        """Message id of one JSONL line (None if torn or unreadable)"""
+        try:
+            return json.loads(line).get('id')
+        except (ValueError, AttributeError):
+            return None
+    
+    def _recover_next_id(self) -> int:
+        """Continue numbering after the newest stored message (reads only the file tail)"""
+        try:
+            with open(self.active_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - 65536))
+                for line in reversed(f.read().splitlines()):
+                    record_id = self._parse_id(line)
+                    if record_id is not None:
+                        return record_id + 1
+        except OSError:
+            pass
+        
+        if self._manifest:
+            return max(entry['last_id'] for entry in self._manifest) + 1
+        return 1
+    
+    # Reading
+    @staticmethod
+    def _decode_lines(lines: List[bytes]) -> List[Dict[str, Any]]:
+        """Decode JSONL lines, skipping blank and torn ones"""
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+    
+    def _read_segment(self, path: str, first_id: int = 1, start_id: int = 1,
+                      end_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Records start_id <= id < end_id of one segment
+        
+        Segment ids are contiguous, so the wanted lines are sliced out by
+        position and only those are decoded; if a torn line shifted the
+        numbering, the whole segment is decoded and filtered instead.
+        """
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rb') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        
+        if end_id is None:
+            return self._decode_lines(lines)
+        
+        window = self._decode_lines(lines[max(0, start_id - first_id):max(0, end_id - first_id)])
+        expected = list(range(max(start_id, first_id), min(end_id, first_id + len(lines))))
+        if [record.get('id') for record in window] == expected:
+            return window
+        
+        return [
+            record for record in self._decode_lines(lines)
+            if start_id <= record.get('id', 0) < end_id
+        ]
+    
+    def _read_active_range(self, offsets: List[Tuple[int, int]], start_id: int,
+                           end_id: int) -> List[Dict[str, Any]]:
+        """Records start_id <= id < end_id from the active file, seeking via the sidecar"""
+        position = bisect.bisect_right(offsets, (start_id, float('inf'))) - 1
+        offset = offsets[max(position, 0)][1]
+        
+        records = []
+        with open(self.active_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                record_id = record.get('id', 0)
+                if record_id >= end_id:
+                    break
+                if record_id >= start_id:
+                    records.append(record)
+        return records
+    
+    def read_page(self, before: Optional[int] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Up to limit messages with id < before (newest page if before is None), oldest first"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            offsets = list(self._offsets)
+            manifest = list(self._manifest)
+            end_id = self._next_id if before is None else min(int(before), self._next_id)
+            self.stats['page_reads'] += 1
+        
+        start_id = max(1, end_id - limit)
+        if end_id <= start_id:
+            return []
+        
+        records = []
+        active_first = offsets[0][0] if offsets else end_id
+        
+        # Older part of the page comes from rotated segments (each bounded by max_bytes)
+        if start_id < active_first:
+            for entry in reversed(manifest):
+                if entry['last_id'] < start_id:
+                    break
+                if entry['first_id'] >= min(end_id, active_first):
+                    continue
+                path = self._segment_path(entry['name'])
+                if path:
+                    records = self._read_segment(
+                        path, entry['first_id'], start_id, min(end_id, active_first)
+                    ) + records
+        
+        if offsets and end_id > active_first:
+            try:
+                records.extend(self._read_active_range(offsets, max(start_id, active_first), end_id))
+            except OSError:
+                pass
+        
+        return records
+    
+    def read_recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """The last limit messages, oldest first"""
+        return self.read_page(None, limit)
+    
+    def _read_all(self) -> List[Dict[str, Any]]:
+        """Every stored record, oldest first (full scan - migration only)"""
+        records = []
+        for path in self.segments():
+            records.extend(self._read_segment(path))
+        records.extend(self._read_segment(self.active_path))
+        return records
+    
+    # Migration
+    def migrate_legacy_json(self, legacy_path: str = 'ChatLog.json') -> int:
+        """One-time import of the old ChatLog.json array; the original is kept as *.migrated
+        
+        Replacing the active file is the commit point. A migrated store starts
+        with exactly the legacy messages, so if the process dies before the old
+        file is renamed, the next start sees that, finishes the cleanup and does
+        not import the messages a second time.
+        """
+        if not os.path.exists(legacy_path):
+            return 0
+        
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                messages = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not migrate {legacy_path}: {e}")
+            return 0
+        
+        if not isinstance(messages, list):
+            print(f"⚠️ {legacy_path} is not a message list, skipping migration")
+            return 0
+        if not messages:
+            os.replace(legacy_path, legacy_path + '.migrated')
+            return 0
+        
+        # Older history goes in front of anything already in the store
+        with self._lock:
+            self._close_active()
+            if self._starts_with(messages):
+                print(f"♻️ {legacy_path} was already migrated, finishing the interrupted migration")
+                migrated = 0
+            else:
+                existing = self._read_all()
+                
+                self._next_id = 1
+                temp_path = self.active_path + '.migrating'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    for message in messages + [
+                        {key: value for key, value in record.items() if key != 'id'}
+                        for record in existing
+                    ]:
+                        record = dict(message)
+                        record['id'] = self._next_id
+                        self._next_id += 1
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                
+                os.replace(temp_path, self.active_path)
+                migrated = len(messages)
+            
+            # Everything below is safe to repeat: the new active file holds all history
+            self._manifest = []
+            self._save_manifest()
+            for segment in self.segments():
+                os.remove(segment)
+            self._rebuild_offsets()
+            self._next_id = self._recover_next_id()
+        
+        os.replace(legacy_path, legacy_path + '.migrated')
+        if migrated:
+            print(f"✅ Migrated {migrated} messages from {legacy_path} to {self.directory}")
+        return migrated
+    
+    def _starts_with(self, messages: List[Dict[str, Any]]) -> bool:
+        """Whether the active file begins with exactly these messages, numbered from 1 as migration writes them"""
+        def comparable(record: Dict[str, Any]) -> Dict[str, Any]:
+            record = json.loads(json.dumps(record, ensure_ascii=False, default=str))
+            record.pop('id', None)
+            return record
+        
+        head = []
+        try:
+            with open(self.active_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if len(head) == len(messages):
+                        break
+                    head.append(json.loads(line))
+        except (OSError, ValueError):
+            return False
+        return len(head) == len(messages) and all(
+            record.get('id') == number and comparable(record) == comparable(message)
+            for number, (record, message) in enumerate(zip(head, messages), 1)
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Write/read counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['next_id'] = self._next_id
+            stats['segments'] = len(self._manifest)
+            stats['indexed_offsets'] = len(self._offsets)
+        return stats
@@ -0,0 +1,204 @@
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Any
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker that stops calls to a backend known to be down"""
+    
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 30.0,
+                 max_recovery_timeout: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.recovery_timeout = recovery_timeout
+        self.opened_at = None
+        self.trial_started_at = None
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """True if a call may go through (one trial call is let through when half-open)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            
+            if self.state == OPEN:
+                if time.time() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self.trial_started_at = None
+            
+            # Half-open: allow a single trial call (another one if it never reported back)
+            now = time.time()
+            if self.trial_started_at and now - self.trial_started_at < self.recovery_timeout:
+                return False
+            self.trial_started_at = now
+            return True
+    
+    def can_request(self) -> bool:
+        """Whether allow_request() would let a call through, without claiming the trial slot"""
+        with self._lock:
+            now = time.time()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return now - self.opened_at >= self.recovery_timeout
+            return not (self.trial_started_at and now - self.trial_started_at < self.recovery_timeout)
+    
+    def record_success(self):
+        """A call succeeded - close the breaker"""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.recovery_timeout = self.base_recovery_timeout
+            self.trial_started_at = None
+    
+    def record_failure(self):
+        """A call failed - open the breaker after enough consecutive failures"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                # Trial failed - back off longer before the next one
+                self.recovery_timeout = min(self.recovery_timeout * 2, self.max_recovery_timeout)
+                self._open()
+            elif self.consecutive_failures >= self.failure_threshold:
+                self._open()
+    
+    def trip(self):
+        """Open the breaker immediately (e.g. a health probe failed)"""
+        with self._lock:
+            if self.state != OPEN:
+                self._open()
+    
+    def _open(self):
+        """Switch to open (lock held)"""
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.trial_started_at = None
+    
+    def get_state(self) -> str:
+        """Current state, moving open -> half-open once the recovery timeout has passed"""
+        with self._lock:
+            if self.state == OPEN and time.time() - self.opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self.state
+
+class LatencyTracker:
+    """Rolling latency (EWMA and p95) and error-rate estimate for one backend/query type"""
+    
+    def __init__(self, alpha: float = 0.3, window: int = 50):
+        self.alpha = alpha
+        self.samples = deque(maxlen=window)
+        self.ewma = None
+        self.error_rate = 0.0
+        self.count = 0
+    
+    def record(self, latency: Optional[float], success: bool):
+        """Add one observation (latency is ignored for failures)"""
+        self.count += 1
+        self.error_rate = (1 - self.alpha) * self.error_rate + self.alpha * (0.0 if success else 1.0)
+        if success and latency is not None:
+            self.samples.append(latency)
+            self.ewma = latency if self.ewma is None else (1 - self.alpha) * self.ewma + self.alpha * latency
+    
+    def p95(self) -> Optional[float]:
+        """95th percentile of recent successful latencies"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+        return ordered[index]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of the estimate"""
+        return {
+            'ewma': self.ewma,
+            'p95': self.p95(),
+            'error_rate': self.error_rate,
+            'count': self.count
+        }
+
+class BackendScoreboard:
+    """Per-backend circuit breakers plus latency estimates per (backend, query type)"""
+    
+    def __init__(self, priors: Dict[str, float], failure_threshold: int = 3,
+                 recovery_timeout: float = 30.0, error_penalty: float = 10.0):
+        # Prior latency (seconds) used until a backend has been measured; also the static order
+        self.priors = priors
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.error_penalty = error_penalty
+        
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.trackers: Dict[tuple, LatencyTracker] = {}
+        self._lock = threading.Lock()
+    
+    def breaker(self, backend: str) -> CircuitBreaker:
+        """Get (or create) the breaker for a backend"""
+        with self._lock:
+            if backend not in self.breakers:
+                self.breakers[backend] = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+            return self.breakers[backend]
+    
+    def tracker(self, backend: str, query_type: str) -> LatencyTracker:
+        """Get (or create) the latency tracker for a backend and query type"""
+        with self._lock:
+            key = (backend, query_type)
+            if key not in self.trackers:
+                self.trackers[key] = LatencyTracker()
+            return self.trackers[key]
+    
+    def record(self, backend: str, query_type: str, latency: Optional[float], success: bool):
+        """Record a call outcome"""
+        self.tracker(backend, query_type).record(latency, success)
+        if success:
+            self.breaker(backend).record_success()
+        else:
+            self.breaker(backend).record_failure()
+    
+    def record_probe(self, backend: str, available: bool, latency: Optional[float] = None):
+        """Feed a health probe result into the breaker"""
+        if not available:
+            self.breaker(backend).trip()
+        elif self.breaker(backend).get_state() != CLOSED:
+            self.breaker(backend).record_success()
+    
+    def expected_cost(self, backend: str, query_type: str) -> float:
+        """Expected seconds to a usable answer: latency inflated by recent error rate"""
+        tracker = self.tracker(backend, query_type)
+        latency = tracker.ewma if tracker.ewma is not None else self.priors.get(backend, 5.0)
+        return latency * (1 + self.error_penalty * tracker.error_rate)
+    
+    def rank(self, backends: List[str], query_type: str) -> List[str]:
+        """Order backends cheapest first, dropping those whose breaker rejects the call
+        
+        Read-only: callers claim a half-open trial with allow_request() only when
+        they actually send the request.
+        """
+        allowed = [name for name in backends if self.breaker(name).can_request()]
+        return sorted(allowed, key=lambda name: self.expected_cost(name, query_type))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker states and latency estimates"""
+        with self._lock:
+            breakers = dict(self.breakers)
+            trackers = dict(self.trackers)
+        
+        stats = {}
+        for name, breaker in breakers.items():
+            stats[name] = {
+                'state': breaker.get_state(),
+                'consecutive_failures': breaker.consecutive_failures,
+                'query_types': {}
+            }
+        for (name, query_type), tracker in trackers.items():
+            stats.setdefault(name, {'state': CLOSED, 'consecutive_failures': 0, 'query_types': {}})
+            stats[name]['query_types'][query_type] = tracker.get_stats()
+        return stats
@@ -1,9 +1,11 @@
 import os
-import re
 import asyncio
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, Any
 from .ai_router import AIRouter
 from .database_manager import DatabaseManager
+from .async_database_manager import AsyncDatabaseManager
+from .intent_classifier import IntentClassifier, COMMAND_CORPUS, load_corpus
+from .pattern_matcher import PatternMatcher
 
 class CommandProcessor:
     """Processes user commands and routes them to appropriate handlers"""
@@ -11,9 +13,17 @@ class CommandProcessor:
     def __init__(self, ai_router: AIRouter, db_manager: DatabaseManager):
         self.ai_router = ai_router
         self.db_manager = db_manager
+        # Handlers await storage through this so the event loop never blocks on it
+        # (none without a database, e.g. when only classification is exercised)
+        self.async_db = AsyncDatabaseManager(db_manager) if db_manager is not None else None
         self.handlers = {}
         self._register_handlers()
         
+        # Local statistical classifier for commands the patterns miss
+        self.intent_classifier = IntentClassifier(
+            load_corpus(COMMAND_CORPUS, os.getenv('COMMAND_CORPUS_PATH'))
+        )
+        
         # Command patterns for quick classification
         self.patterns = {
             'open_app': [
@@ -73,6 +83,9 @@ class CommandProcessor:
                 r'(?:good\s+morning|good\s+afternoon|good\s+evening)',
             ]
         }
+        
+        # All patterns compiled into one prioritized single-pass matcher
+        self.pattern_matcher = PatternMatcher(self.patterns)
     
     def _register_handlers(self):
         """Register command handlers"""
@@ -109,7 +122,14 @@ class CommandProcessor:
             # First try pattern matching for quick classification
             intent, extracted_data = self._classify_with_patterns(command)
             
-            # If pattern matching fails, use AI classification
+            # If pattern matching fails, try the local classifier
+            if intent == 'unknown':
+                prediction = self.intent_classifier.predict(command)
+                if prediction['confident']:
+                    intent = prediction['label']
+                    extracted_data = {'query': command, 'confidence': prediction['confidence']}
+            
+            # Only fall back to AI classification when the local one is unsure
             if intent == 'unknown':
                 ai_result = await self.ai_router.classify_intent(command)
                 if ai_result['success']:
@@ -146,36 +166,34 @@ class CommandProcessor:
     
     def _classify_with_patterns(self, command: str) -> tuple[str, Dict[str, Any]]:
         """Classify command using regex patterns"""
-        for intent, patterns in self.patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, command, re.IGNORECASE)
-                if match:
-                    groups = match.groups()
-                    extracted_data = {
-                        'query': command,
-                        'match': match.group(0),
-                        'groups': groups
-                    }
-                    
-                    # Extract specific data based on intent
-                    if intent in ['open_app', 'close_app'] and groups:
-                        extracted_data['app_name'] = groups[0].strip()
-                    elif intent == 'play_media' and groups:
-                        extracted_data['media_name'] = groups[0].strip()
-                        if len(groups) > 1:
-                            extracted_data['platform'] = groups[1].strip()
-                    elif intent in ['phone_call', 'send_message', 'whatsapp'] and groups:
-                        extracted_data['contact_name'] = groups[0].strip()
-                    elif intent == 'web_search' and groups:
-                        extracted_data['search_query'] = groups[0].strip()
-                        if len(groups) > 1:
-                            extracted_data['search_engine'] = groups[1].strip()
-                    elif intent == 'content_generation' and groups:
-                        extracted_data['content_topic'] = groups[0].strip()
-                    
-                    return intent, extracted_data
-        
-        return 'unknown', {'query': command}
+        result = self.pattern_matcher.match(command)
+        if not result:
+            return 'unknown', {'query': command}
+        
+        intent, matched_text, groups = result
+        extracted_data = {
+            'query': command,
+            'match': matched_text,
+            'groups': groups
+        }
+        
+        # Extract specific data based on intent
+        if intent in ['open_app', 'close_app'] and groups:
+            extracted_data['app_name'] = groups[0].strip()
+        elif intent == 'play_media' and groups:
+            extracted_data['media_name'] = groups[0].strip()
+            if len(groups) > 1:
+                extracted_data['platform'] = groups[1].strip()
+        elif intent in ['phone_call', 'send_message', 'whatsapp'] and groups:
+            extracted_data['contact_name'] = groups[0].strip()
+        elif intent == 'web_search' and groups:
+            extracted_data['search_query'] = groups[0].strip()
+            if len(groups) > 1:
+                extracted_data['search_engine'] = groups[1].strip()
+        elif intent == 'content_generation' and groups:
+            extracted_data['content_topic'] = groups[0].strip()
+        
+        return intent, extracted_data
     
     def _parse_ai_classification(self, ai_classification: str) -> str:
         """Parse AI classification result into intent"""
@@ -223,7 +241,7 @@ class CommandProcessor:
             }
         
         # Check system commands first
-        app_path = self.db_manager.get_system_command(app_name)
+        app_path = await self.async_db.get_system_command(app_name)
         if app_path:
             return {
                 'response': f"Opening {app_name}",
@@ -235,7 +253,7 @@ class CommandProcessor:
             }
         
         # Check web commands
-        url = self.db_manager.get_web_command(app_name)
+        url = await self.async_db.get_web_command(app_name)
         if url:
             return {
                 'response': f"Opening {app_name}",
@@ -294,7 +312,7 @@ class CommandProcessor:
             }
         
         # Look up contact
-        contact = self.db_manager.get_contact(contact_name)
+        contact = await self.async_db.get_contact(contact_name)
         if contact:
             return {
                 'response': f"Calling {contact['name']}",
@@ -324,7 +342,7 @@ class CommandProcessor:
                 'action': 'clarification_needed'
             }
         
-        contact = self.db_manager.get_contact(contact_name)
+        contact = await self.async_db.get_contact(contact_name)
         if contact:
             return {
                 'response': f"What message would you like to send to {contact['name']}?",
@@ -382,7 +400,7 @@ class CommandProcessor:
                 'action': 'clarification_needed'
             }
         
-        contact = self.db_manager.get_contact(contact_name)
+        contact = await self.async_db.get_contact(contact_name)
         if contact:
             return {
                 'response': f"Sending WhatsApp {action_type.replace('_', ' ')} to {contact['name']}" + (f": {message}" if message else ""),
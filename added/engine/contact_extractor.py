@@ -3,8 +3,10 @@ import json
 import csv
 import os
 import re
-from typing import List, Dict, Optional
+import quopri
+from typing import List, Dict, Optional, Iterable, Iterator
 from .database_manager import DatabaseManager
+from .contact_index import normalize_phone
 
 class ContactExtractor:
     """Extract real contacts from Android phone via ADB"""
@@ -31,7 +33,7 @@ class ContactExtractor:
             # Method 3: Manual CSV import (user exports manually)
             print("⚠️ Automatic extraction failed. Please export contacts manually.")
             return self._import_manual_csv()
-            
+        
         except Exception as e:
             print(f"❌ Contact extraction error: {e}")
             return []
@@ -39,46 +41,49 @@ class ContactExtractor:
     def _extract_via_content_provider(self) -> List[Dict]:
         """Extract contacts using Android content provider"""
         try:
-            # Query contacts content provider
-            cmd = [
-                self.adb_path, 'shell', 
-                'content', 'query', 
-                '--uri', 'content://com.android.contacts/contacts',
-                '--projection', 'display_name'
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode != 0:
-                print("❌ Content provider query failed")
-                return []
-            
-            # Parse the output
-            contacts = []
-            lines = result.stdout.strip().split('\n')
-            
-            for line in lines:
-                if 'display_name=' in line:
-                    name_match = re.search(r'display_name=([^,]+)', line)
-                    if name_match:
-                        name = name_match.group(1).strip()
-                        if name and name != 'null':
-                            # Get phone number for this contact
-                            phone = self._get_phone_for_contact(name)
-                            if phone:
-                                contacts.append({
-                                    'name': name,
-                                    'phone': phone,
-                                    'email': ''
-                                })
-            
+            contacts = list(self._iter_content_provider_rows())
             print(f"✅ Extracted {len(contacts)} contacts via content provider")
             return contacts
-            
+        
         except Exception as e:
             print(f"❌ Content provider extraction failed: {e}")
             return []
     
+    def _iter_content_provider_rows(self) -> Iterator[Dict]:
+        """Stream (name, number) rows from a single content provider query
+        
+        The phones view already joins display names to numbers, so one ADB
+        call returns every contact instead of one extra call per contact.
+        """
+        cmd = [
+            self.adb_path, 'shell',
+            'content', 'query',
+            '--uri', 'content://com.android.contacts/data/phones',
+            '--projection', 'display_name:data1'
+        ]
+        
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   text=True, encoding='utf-8', errors='replace')
+        try:
+            for line in process.stdout:
+                name_match = re.search(r'display_name=(.*?), data1=', line)
+                phone_match = re.search(r'data1=([^,]+)', line)
+                if not name_match or not phone_match:
+                    continue
+                
+                name = name_match.group(1).strip()
+                phone = phone_match.group(1).strip()
+                if name and name != 'NULL' and name != 'null' and phone and phone.lower() != 'null':
+                    yield {
+                        'name': name,
+                        'phone': self._clean_phone_number(phone),
+                        'email': ''
+                    }
+        finally:
+            process.stdout.close()
+            if process.wait(timeout=30) != 0:
+                print("❌ Content provider query failed")
+    
     def _get_phone_for_contact(self, contact_name: str) -> Optional[str]:
         """Get phone number for a specific contact"""
         try:
@@ -104,7 +109,7 @@ class ContactExtractor:
                                 return self._clean_phone_number(phone)
             
             return None
-            
+        
         except Exception as e:
             print(f"❌ Phone extraction failed for {contact_name}: {e}")
             return None
@@ -140,7 +145,7 @@ class ContactExtractor:
                     return contacts
             
             return []
-            
+        
         except Exception as e:
             print(f"❌ CSV export failed: {e}")
             return []
@@ -168,58 +173,59 @@ class ContactExtractor:
     def _parse_csv_file(self, csv_path: str) -> List[Dict]:
         """Parse CSV file and extract contacts"""
         try:
-            contacts = []
-            
-            with open(csv_path, 'r', encoding='utf-8') as file:
-                # Try to detect CSV format
-                sample = file.read(1024)
-                file.seek(0)
-                
-                # Common CSV formats from different phones
-                if 'Name,Phone' in sample or 'Display Name' in sample:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        name = row.get('Name') or row.get('Display Name') or row.get('Given Name', '').strip()
-                        phone = row.get('Phone') or row.get('Phone 1 - Value') or row.get('Mobile', '').strip()
-                        email = row.get('Email') or row.get('E-mail 1 - Value', '').strip()
-                        
-                        if name and phone:
-                            contacts.append({
-                                'name': name,
-                                'phone': self._clean_phone_number(phone),
-                                'email': email
-                            })
-                else:
-                    # Try generic CSV parsing
-                    reader = csv.reader(file)
-                    headers = next(reader, [])
-                    
-                    # Find name and phone columns
-                    name_col = self._find_column_index(headers, ['name', 'display', 'given'])
-                    phone_col = self._find_column_index(headers, ['phone', 'mobile', 'number'])
-                    email_col = self._find_column_index(headers, ['email', 'mail'])
-                    
-                    if name_col is not None and phone_col is not None:
-                        for row in reader:
-                            if len(row) > max(name_col, phone_col):
-                                name = row[name_col].strip()
-                                phone = row[phone_col].strip()
-                                email = row[email_col].strip() if email_col is not None and len(row) > email_col else ''
-                                
-                                if name and phone:
-                                    contacts.append({
-                                        'name': name,
-                                        'phone': self._clean_phone_number(phone),
-                                        'email': email
-                                    })
-            
+            contacts = list(self._iter_csv_file(csv_path))
             print(f"✅ Parsed {len(contacts)} contacts from CSV")
             return contacts
-            
+        
         except Exception as e:
             print(f"❌ CSV parsing error: {e}")
             return []
     
+    def _iter_csv_file(self, csv_path: str) -> Iterator[Dict]:
+        """Stream contacts from a CSV export, one row at a time"""
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as file:
+            # Try to detect CSV format
+            sample = file.read(1024)
+            file.seek(0)
+            
+            # Common CSV formats from different phones
+            if 'Name,Phone' in sample or 'Display Name' in sample:
+                reader = csv.DictReader(file)
+                for row in reader:
+                    name = row.get('Name') or row.get('Display Name') or row.get('Given Name', '').strip()
+                    phone = row.get('Phone') or row.get('Phone 1 - Value') or row.get('Mobile', '').strip()
+                    email = row.get('Email') or row.get('E-mail 1 - Value', '').strip()
+                    
+                    if name and phone:
+                        yield {
+                            'name': name,
+                            'phone': self._clean_phone_number(phone),
+                            'email': email
+                        }
+            else:
+                # Try generic CSV parsing
+                reader = csv.reader(file)
+                headers = next(reader, [])
+                
+                # Find name and phone columns
+                name_col = self._find_column_index(headers, ['name', 'display', 'given'])
+                phone_col = self._find_column_index(headers, ['phone', 'mobile', 'number'])
+                email_col = self._find_column_index(headers, ['email', 'mail'])
+                
+                if name_col is not None and phone_col is not None:
+                    for row in reader:
+                        if len(row) > max(name_col, phone_col):
+                            name = row[name_col].strip()
+                            phone = row[phone_col].strip()
+                            email = row[email_col].strip() if email_col is not None and len(row) > email_col else ''
+                            
+                            if name and phone:
+                                yield {
+                                    'name': name,
+                                    'phone': self._clean_phone_number(phone),
+                                    'email': email
+                                }
+    
     def _find_column_index(self, headers: List[str], keywords: List[str]) -> Optional[int]:
         """Find column index by keywords"""
         for i, header in enumerate(headers):
@@ -228,19 +234,78 @@ class ContactExtractor:
                     return i
         return None
     
-    def _clean_phone_number(self, phone: str) -> str:
-        """Clean and format phone number"""
-        # Remove all non-digit characters except +
-        phone = re.sub(r'[^\d+]', '', phone)
+    def _iter_vcard_file(self, vcf_path: str) -> Iterator[Dict]:
+        """Stream contacts from a vCard (.vcf) export, one row per phone number"""
+        with open(vcf_path, 'r', encoding='utf-8-sig', errors='replace') as file:
+            card = None
+            previous = None
+            
+            for raw_line in file:
+                line = raw_line.rstrip('\r\n')
+                
+                # Folded lines continue the previous property (RFC 6350 3.2)
+                if line[:1] in (' ', '\t') and previous is not None:
+                    previous[1] += line[1:]
+                    continue
+                # Quoted-printable soft line breaks end with '='
+                if previous is not None and previous[1].endswith('=') and 'QUOTED-PRINTABLE' in previous[0].upper():
+                    previous[1] = previous[1][:-1] + line
+                    continue
+                
+                if ':' not in line:
+                    continue
+                key, value = line.split(':', 1)
+                upper_key = key.upper()
+                
+                if upper_key == 'BEGIN' and value.upper() == 'VCARD':
+                    card = []
+                    previous = None
+                elif upper_key == 'END' and value.upper() == 'VCARD':
+                    if card is not None:
+                        yield from self._vcard_contacts(card)
+                    card = None
+                    previous = None
+                elif card is not None:
+                    previous = [key, value]
+                    card.append(previous)
+    
+    def _vcard_contacts(self, properties: List[List[str]]) -> Iterator[Dict]:
+        """Contacts (one per TEL) of a single parsed vCard"""
+        name = ''
+        structured_name = ''
+        email = ''
+        phones = []
         
-        # Add country code if missing (assuming India +91)
-        if phone and not phone.startswith('+'):
-            if len(phone) == 10:
-                phone = '+91' + phone
-            elif len(phone) == 11 and phone.startswith('0'):
-                phone = '+91' + phone[1:]
+        for key, value in properties:
+            params = key.upper().split(';')
+            prop = params[0].split('.')[-1]  # drop item1. style groups
+            if 'ENCODING=QUOTED-PRINTABLE' in params:
+                value = quopri.decodestring(value.encode('latin-1', 'replace')).decode('utf-8', 'replace')
+            
+            if prop == 'FN':
+                name = value.strip()
+            elif prop == 'N':
+                parts = [part.strip() for part in value.split(';')]
+                structured_name = ' '.join(part for part in parts[1:2] + parts[:1] if part)
+            elif prop == 'TEL':
+                phones.append(value.strip())
+            elif prop == 'EMAIL' and not email:
+                email = value.strip()
         
-        return phone
+        name = name or structured_name
+        if not name:
+            return
+        for phone in phones:
+            if phone:
+                yield {
+                    'name': name,
+                    'phone': self._clean_phone_number(phone),
+                    'email': email
+                }
+    
+    def _clean_phone_number(self, phone: str) -> str:
+        """Clean and format phone number (E.164, same rules as the database)"""
+        return normalize_phone(phone)
     
     def _parse_exported_contacts(self, file_path: str) -> List[Dict]:
         """Parse exported contacts file"""
@@ -262,31 +327,35 @@ class ContactExtractor:
                                 })
             
             return contacts
-            
+        
         except Exception as e:
             print(f"❌ Export parsing error: {e}")
             return []
     
-    def import_contacts_to_database(self, contacts: List[Dict]) -> bool:
-        """Import extracted contacts to database"""
-        try:
-            print(f"💾 Importing {len(contacts)} contacts to database...")
-            
-            success_count = 0
-            for contact in contacts:
-                if self.db_manager.add_contact(
-                    contact['name'], 
-                    contact['phone'], 
-                    contact.get('email', '')
-                ):
-                    success_count += 1
-            
-            print(f"✅ Successfully imported {success_count}/{len(contacts)} contacts")
-            return success_count > 0
-            
-        except Exception as e:
-            print(f"❌ Database import error: {e}")
-            return False
+    def import_contacts_to_database(self, contacts: Iterable[Dict]) -> bool:
+        """Import extracted contacts to database (upserting on phone number)"""
+        result = self.bulk_import(contacts)
+        return 'error' not in result and (result['inserted'] + result['updated'] + result['skipped']) > 0
+    
+    def bulk_import(self, contacts: Iterable[Dict]) -> Dict[str, int]:
+        """Upsert a stream of contacts in one transaction and report the counts"""
+        print("💾 Importing contacts to database...")
+        result = self.db_manager.upsert_contacts(contacts)
+        
+        if 'error' in result:
+            print(f"❌ Database import error: {result['error']}")
+        else:
+            print(f"✅ Contacts imported: {result['inserted']} new, "
+                  f"{result['updated']} updated, {result['skipped']} skipped")
+        return result
+    
+    def import_file(self, path: str) -> Dict[str, int]:
+        """Stream a CSV or vCard export straight into the database"""
+        if path.lower().endswith(('.vcf', '.vcard')):
+            rows = self._iter_vcard_file(path)
+        else:
+            rows = self._iter_csv_file(path)
+        return self.bulk_import(rows)
     
     def sync_contacts(self) -> bool:
         """Main method to sync contacts from phone to database"""
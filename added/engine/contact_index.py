@@ -0,0 +1,419 @@
+import os
+import re
+import csv
+import time
+import threading
+from typing import Dict, List, Optional, Any, Callable
+
+DEFAULT_COUNTRY_CODE = os.getenv('DEFAULT_COUNTRY_CODE', '+91')
+
+def normalize_phone(phone: str, country_code: str = DEFAULT_COUNTRY_CODE) -> str:
+    """Normalize a phone number to E.164 (+<country><number>)"""
+    phone = re.sub(r'[^\d+]', '', phone or '')
+    if phone.startswith('00'):
+        phone = '+' + phone[2:]
+    
+    # Add country code if missing (10-digit national numbers, optionally with a trunk 0)
+    if phone and not phone.startswith('+'):
+        if len(phone) == 10:
+            phone = country_code + phone
+        elif len(phone) == 11 and phone.startswith('0'):
+            phone = country_code + phone[1:]
+    
+    return phone
+
+def normalize_name(name: str) -> str:
+    """Lower-case a name and reduce it to letters, digits and single spaces"""
+    name = re.sub(r'[^\w\s]', ' ', (name or '').lower())
+    return re.sub(r'\s+', ' ', name).strip()
+
+def soundex(word: str) -> str:
+    """American Soundex code (e.g. tom/tome -> T500)"""
+    word = re.sub(r'[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    
+    codes = {}
+    for letters, digit in (('bfpv', '1'), ('cgjkqsxz', '2'), ('dt', '3'),
+                           ('l', '4'), ('mn', '5'), ('r', '6')):
+        for letter in letters:
+            codes[letter] = digit
+    
+    result = word[0].upper()
+    previous = codes.get(word[0], '')
+    for letter in word[1:]:
+        digit = codes.get(letter, '')
+        if digit and digit != previous:
+            result += digit
+        if letter not in 'hw':
+            previous = digit
+    return (result + '000')[:4]
+
+def metaphone(word: str) -> str:
+    """Simplified Metaphone key - groups names that sound alike (e.g. jon/john, steven/stephen)"""
+    word = re.sub(r'[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    
+    # Initial letter exceptions
+    for prefix, replacement in (('kn', 'n'), ('gn', 'n'), ('pn', 'n'), ('ae', 'e'),
+                                ('wr', 'r'), ('wh', 'w'), ('x', 's')):
+        if word.startswith(prefix):
+            word = replacement + word[len(prefix):]
+            break
+    
+    vowels = 'aeiou'
+    key = ''
+    i = 0
+    while i < len(word):
+        c = word[i]
+        prev = word[i - 1] if i > 0 else ''
+        nxt = word[i + 1] if i + 1 < len(word) else ''
+        after = word[i + 2] if i + 2 < len(word) else ''
+        
+        if c == prev and c != 'c':
+            i += 1
+            continue
+        
+        if c in vowels:
+            if i == 0:
+                key += c.upper()
+        elif c == 'b':
+            if not (prev == 'm' and i == len(word) - 1):
+                key += 'B'
+        elif c == 'c':
+            if nxt == 'i' and after == 'a' or nxt == 'h':
+                key += 'X'
+                i += 1 if nxt == 'h' else 0
+            elif nxt in 'iey':
+                key += 'S'
+            else:
+                key += 'K'
+        elif c == 'd':
+            key += 'J' if nxt == 'g' and after in 'iey' else 'T'
+        elif c == 'g':
+            if nxt == 'h' and after and after not in vowels:
+                pass
+            elif nxt == 'n':
+                pass
+            elif nxt in 'iey':
+                key += 'J'
+            else:
+                key += 'K'
+        elif c == 'h':
+            if nxt in vowels and prev not in 'csptg':
+                key += 'H'
+        elif c == 'k':
+            if prev != 'c':
+                key += 'K'
+        elif c == 'p':
+            if nxt == 'h':
+                key += 'F'
+                i += 1
+            else:
+                key += 'P'
+        elif c == 'q':
+            key += 'K'
+        elif c == 's':
+            if nxt == 'h' or (nxt == 'i' and after in 'oa'):
+                key += 'X'
+                i += 1 if nxt == 'h' else 0
+            else:
+                key += 'S'
+        elif c == 't':
+            if nxt == 'i' and after in 'oa':
+                key += 'X'
+            elif nxt == 'h':
+                key += '0'
+                i += 1
+            else:
+                key += 'T'
+        elif c == 'v':
+            key += 'F'
+        elif c in 'wy':
+            if nxt in vowels:
+                key += c.upper()
+        elif c == 'x':
+            key += 'KS'
+        elif c == 'z':
+            key += 'S'
+        else:
+            key += c.upper()
+        i += 1
+    
+    return key
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def sounds_alike(query: str, name: str) -> bool:
+    """Same Soundex and Metaphone codes, and spelled closely enough (jon/john yes, tim/tom no)"""
+    if soundex(query) != soundex(name) or metaphone(query) != metaphone(name):
+        return False
+    # Fewer than one edit per three letters of the longer spelling
+    return 3 * edit_distance(query, name) < max(len(query), len(name))
+
+class ContactIndex:
+    """In-memory contact index over contacts.csv and the SQLite contacts table
+    
+    Built once and rebuilt only when a CSV file's mtime/size or the contacts
+    table version changes, so lookups never read files. Holds exact, per-word,
+    prefix (trie) and phonetic (Soundex/Metaphone) keys plus E.164 numbers.
+    """
+    
+    def __init__(self, connection_getter: Callable[[], Any],
+                 csv_files: Optional[List[str]] = None,
+                 check_interval: Optional[float] = None):
+        self.connection_getter = connection_getter
+        self.csv_files = csv_files or ['contacts.csv', '../contacts.csv']
+        # How often (seconds) to stat the sources for changes
+        self.check_interval = check_interval if check_interval is not None else float(
+            os.getenv('CONTACT_INDEX_CHECK_INTERVAL', '1.0')
+        )
+        
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        
+        self.contacts: List[Dict[str, Any]] = []
+        self._exact: Dict[str, int] = {}
+        self._words: Dict[str, List[int]] = {}  # word -> every contact using it
+        self._phonetic: Dict[str, List[tuple]] = {}  # soundex|metaphone -> [(position, word)]
+        self._numbers: Dict[str, int] = {}
+        self._trie: Dict[str, Any] = {}
+        
+        self.stats = {'builds': 0, 'lookups': 0, 'exact': 0, 'word': 0,
+                      'prefix': 0, 'phonetic': 0, 'misses': 0}
+    
+    # Change detection
+    def _current_signature(self) -> tuple:
+        """(CSV mtimes/sizes, contacts table version)"""
+        files = []
+        for csv_file in self.csv_files:
+            try:
+                stat = os.stat(csv_file)
+                files.append((csv_file, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                files.append((csv_file, None, None))
+        
+        table_version = None
+        try:
+            row = self.connection_getter().execute(
+                "SELECT version FROM contacts_version WHERE id = 1"
+            ).fetchone()
+            table_version = row[0] if row else None
+        except Exception:
+            pass
+        
+        return tuple(files), table_version
+    
+    def invalidate(self):
+        """Force a rebuild on the next lookup"""
+        with self._lock:
+            self._signature = None
+            self._checked_at = 0.0
+    
+    def _ensure_fresh(self):
+        """Rebuild if the sources changed (checked at most every check_interval seconds)"""
+        now = time.time()
+        if self._signature is not None and now - self._checked_at < self.check_interval:
+            return
+        
+        with self._lock:
+            if self._signature is not None and now - self._checked_at < self.check_interval:
+                return
+            signature = self._current_signature()
+            if signature != self._signature:
+                self._build()
+                self._signature = signature
+            self._checked_at = now
+    
+    # Building
+    def _load_csv_contacts(self) -> List[Dict[str, Any]]:
+        """Read contacts from every CSV file that exists"""
+        contacts = []
+        for csv_file in self.csv_files:
+            if not os.path.exists(csv_file):
+                continue
+            try:
+                with open(csv_file, 'r', encoding='utf-8') as file:
+                    reader = csv.DictReader(file)
+                    for row in reader:
+                        csv_name = (row.get('Name') or row.get('name') or '').strip()
+                        csv_phone = (row.get('Phone Number') or row.get('Phone') or row.get('phone') or '').strip()
+                        
+                        if csv_name and csv_phone:
+                            contacts.append({
+                                'id': len(contacts) + 1,
+                                'name': csv_name,
+                                'mobile_no': normalize_phone(csv_phone),
+                                'email': ''
+                            })
+            except Exception as e:
+                print(f"Error reading CSV {csv_file}: {e}")
+        return contacts
+    
+    def _load_db_contacts(self) -> List[Dict[str, Any]]:
+        """Read contacts from the SQLite table"""
+        try:
+            rows = self.connection_getter().execute(
+                "SELECT id, name, mobile_no, email FROM contacts ORDER BY id"
+            ).fetchall()
+        except Exception as e:
+            print(f"Error reading database contacts: {e}")
+            return []
+        
+        return [
+            {'id': row[0], 'name': row[1] or '', 'mobile_no': normalize_phone(row[2] or ''), 'email': row[3] or ''}
+            for row in rows if row[1]
+        ]
+    
+    def _build(self):
+        """Rebuild every key from the CSV (first, wins ties) and the database (lock held)"""
+        start_time = time.time()
+        
+        contacts = []
+        seen_names = set()
+        seen_numbers = set()
+        for source in (self._load_csv_contacts(), self._load_db_contacts()):
+            for contact in source:
+                name_key = contact['name'].lower()
+                number = contact['mobile_no']
+                if name_key in seen_names or (number and number in seen_numbers):
+                    continue
+                seen_names.add(name_key)
+                if number:
+                    seen_numbers.add(number)
+                contacts.append(contact)
+        
+        exact, words, phonetic, numbers, trie = {}, {}, {}, {}, {}
+        for position, contact in enumerate(contacts):
+            name = normalize_name(contact['name'])
+            if not name:
+                continue
+            
+            exact.setdefault(name, position)
+            exact.setdefault(name.replace(' ', ''), position)
+            
+            for word in set(name.split()):
+                words.setdefault(word, []).append(position)
+            for word in {*name.split(), name.replace(' ', '')}:
+                phonetic.setdefault(f"{soundex(word)}|{metaphone(word)}", []).append((position, word))
+            
+            number = contact['mobile_no']
+            if number:
+                numbers.setdefault(number, position)
+            
+            # Trie node: children plus every contact under it, highest priority first
+            node = trie
+            for char in name:
+                node = node.setdefault(char, {})
+                node.setdefault('', []).append(position)
+        
+        self.contacts = contacts
+        self._exact, self._words, self._phonetic = exact, words, phonetic
+        self._numbers, self._trie = numbers, trie
+        self.stats['builds'] += 1
+        print(f"📇 Contact index built: {len(contacts)} contacts in {(time.time() - start_time) * 1000:.1f} ms")
+    
+    # Lookups
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Best contact for a spoken name: exact, word, prefix, then phonetic match
+        
+        Past an exact match every branch must settle on exactly one contact
+        that matches every word of the query - a wrong guess calls or
+        messages the wrong person, so an ambiguous name is a miss.
+        """
+        self._ensure_fresh()
+        self.stats['lookups'] += 1
+        
+        query = normalize_name(name)
+        if not query:
+            return None
+        
+        position = self._exact.get(query, self._exact.get(query.replace(' ', '')))
+        if position is not None:
+            return self._found('exact', position)
+        
+        query_words = query.split()
+        matches = self._every_word(query_words, lambda word: self._words.get(word, ()))
+        if len(matches) == 1:
+            return self._found('word', matches.pop())
+        
+        if len(query) >= 2:
+            node = self._trie
+            for char in query:
+                node = node.get(char)
+                if node is None:
+                    break
+            if node is not None and len(node['']) == 1:
+                return self._found('prefix', node[''][0])
+        
+        # Phonetic: only when both codes agree and the spelling is close, for
+        # the name run together or for every word of it
+        matches = self._sounds_like(query.replace(' ', ''))
+        if len(query_words) > 1:
+            matches |= self._every_word(query_words, self._sounds_like)
+        if len(matches) == 1:
+            return self._found('phonetic', matches.pop())
+        
+        self.stats['misses'] += 1
+        return None
+    
+    @staticmethod
+    def _every_word(query_words: List[str], positions_for: Callable[[str], Any]) -> set:
+        """Contacts matched by every query word"""
+        matches = None
+        for word in query_words:
+            positions = set(positions_for(word))
+            matches = positions if matches is None else matches & positions
+            if not matches:
+                return set()
+        return matches or set()
+    
+    def _sounds_like(self, term: str) -> set:
+        """Contacts with a name word (or run-together name) that sounds like term"""
+        return {position for position, word in self._phonetic.get(f"{soundex(term)}|{metaphone(term)}", ())
+                if sounds_alike(term, word)}
+    
+    def _found(self, kind: str, position: int) -> Dict[str, Any]:
+        """Count a hit and return a copy of the contact"""
+        self.stats[kind] += 1
+        return dict(self.contacts[position])
+    
+    def lookup_number(self, phone: str) -> Optional[Dict[str, Any]]:
+        """Contact owning a phone number (any format)"""
+        self._ensure_fresh()
+        position = self._numbers.get(normalize_phone(phone))
+        return dict(self.contacts[position]) if position is not None else None
+    
+    def search(self, prefix: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Contacts whose name starts with prefix (autocomplete)"""
+        self._ensure_fresh()
+        node = self._trie
+        for char in normalize_name(prefix):
+            node = node.get(char)
+            if node is None:
+                return []
+        
+        if node is self._trie:
+            return [dict(contact) for contact in self.contacts[:limit]]
+        return [dict(self.contacts[position]) for position in node[''][:limit]]
+    
+    def all(self) -> List[Dict[str, Any]]:
+        """Every indexed contact (CSV first, then database entries not already present)"""
+        self._ensure_fresh()
+        return [dict(contact) for contact in self.contacts]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Build and lookup counters"""
+        stats = dict(self.stats)
+        stats['contacts'] = len(self.contacts)
+        return stats
@@ -1,46 +1,98 @@
 import sqlite3
 import json
-import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable
 from pymongo import MongoClient
+from .contact_index import ContactIndex, normalize_phone
+from .chat_store import ChatStore
+from .chat_persister import ChatPersister
+from .chat_backends import JSONLChatBackend, MongoChatBackend, create_chat_backend
+from .circuit_breaker import CircuitBreaker
+from .sqlite_pool import SQLitePool
+from .lookup_cache import LookupCache
+from .search_index import get_search_index
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Cached marker for "no such preference" (None is a valid stored value)
+_MISSING = object()
+
 class DatabaseManager:
     """Manages both SQLite and MongoDB connections for the unified JARVIS system"""
     
     def __init__(self):
-        self.sqlite_conn = None
+        self.sqlite_pool = None
         self.mongo_client = None
         self.mongo_db = None
+        self.chat_store = None
+        self.chat_backend = None
+        self.chat_fallback = None
+        # Stops sending reads and writes to a chat backend that keeps failing
+        self.chat_breaker = CircuitBreaker()
+        self.chat_persister = None
+        self.search_index = None
         self.initialize_databases()
+        
+        # In-memory contact lookups, rebuilt only when contacts.csv or the table changes
+        self.contact_index = ContactIndex(lambda: self.sqlite_conn)
+        
+        # Read-through cache for commands and preferences, invalidated on write
+        self.lookup_cache = LookupCache(
+            lambda: self.sqlite_conn, ('sys_command', 'web_command', 'user_preferences')
+        )
+    
+    @property
+    def sqlite_conn(self) -> Optional[sqlite3.Connection]:
+        """SQLite connection of the calling thread (each thread gets its own)"""
+        if self.sqlite_pool is None:
+            return None
+        return self.sqlite_pool.connection()
     
     def initialize_databases(self):
-        """Initialize both SQLite and MongoDB connections"""
+        """Initialize SQLite, the chat history backend and the search index"""
         try:
-            # Initialize SQLite
-            self.sqlite_conn = sqlite3.connect("jarvis.db", check_same_thread=False)
+            # Initialize SQLite (WAL, per-thread connections, cached statements)
+            self.sqlite_pool = SQLitePool("jarvis.db")
             self.create_sqlite_tables()
             print("✅ SQLite database initialized")
             
-            # Initialize MongoDB
-            mongo_url = os.getenv('MONGO_URL', 'mongodb://localhost:27017/')
-            db_name = os.getenv('DB_NAME', 'jarvis_unified')
+            # Local append-only chat log (primary store or fallback for the configured backend)
+            self.chat_store = ChatStore()
+            self.chat_store.migrate_legacy_json("ChatLog.json")
+            self.chat_fallback = JSONLChatBackend(self.chat_store)
             
+            # Chat backend from CHAT_BACKEND / MONGO_URL; MongoDB connects lazily, no startup probe
             try:
-                self.mongo_client = MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
-                # Test connection
-                self.mongo_client.server_info()
-                self.mongo_db = self.mongo_client[db_name]
-                print("✅ MongoDB database initialized")
+                self.chat_backend = create_chat_backend(
+                    sqlite_pool=self.sqlite_pool, chat_store=self.chat_store
+                )
             except Exception as e:
-                print(f"⚠️ MongoDB not available: {e}")
+                print(f"⚠️ Chat backend unavailable: {e}")
                 print("📝 Chat history will be stored in JSON files as fallback")
-                self.mongo_client = None
-                self.mongo_db = None
-                
+                self.chat_backend = self.chat_fallback
+            if isinstance(self.chat_backend, JSONLChatBackend):
+                self.chat_backend = self.chat_fallback
+            if isinstance(self.chat_backend, MongoChatBackend):
+                self.mongo_client = self.chat_backend.client
+                self.mongo_db = self.chat_backend.db
+                if isinstance(self.mongo_client, MongoClient):
+                    threading.Thread(target=self._probe_mongo, daemon=True).start()
+            print(f"✅ Chat history backend: {self.chat_backend.name}")
+            
+            # Full-text index over chat turns and assistant artifacts
+            try:
+                self.search_index = get_search_index()
+            except Exception as e:
+                print(f"⚠️ Search index unavailable: {e}")
+            
+            # Chat saves are queued and written in batches by a background thread
+            self.chat_persister = ChatPersister(
+                self._write_chat_batch,
+                spill=self._save_batch_to_json_fallback
+            )
+        
         except Exception as e:
             print(f"❌ Database initialization error: {e}")
     
@@ -58,6 +110,24 @@ class DatabaseManager:
             )
         ''')
         
+        # Version counter bumped by triggers on any contacts change (from any connection),
+        # so the in-memory contact index knows when to rebuild
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contacts_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO contacts_version (id, version) VALUES (1, 0)")
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS contacts_version_{event.lower()}
+                AFTER {event} ON contacts
+                BEGIN
+                    UPDATE contacts_version SET version = version + 1 WHERE id = 1;
+                END
+            ''')
+        
         # System commands table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS sys_command (
@@ -76,6 +146,12 @@ class DatabaseManager:
             )
         ''')
         
+        # Lookup indexes (names are stored lowercased for commands)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_contacts_name_lower ON contacts (LOWER(name))")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_contacts_mobile_no ON contacts (mobile_no)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sys_command_name ON sys_command (name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_web_command_name ON web_command (name)")
+        
         # User preferences table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS user_preferences (
@@ -85,6 +161,24 @@ class DatabaseManager:
             )
         ''')
         
+        # Per-table version counters so cached lookups notice writes from other connections
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name VARCHAR(100) PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        ''')
+        for table in ('sys_command', 'web_command', 'user_preferences'):
+            cursor.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)", (table,))
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                    END
+                ''')
+        
         self.sqlite_conn.commit()
         print("✅ SQLite tables created/verified")
     
@@ -98,162 +192,114 @@ class DatabaseManager:
                 (name, mobile_no, email)
             )
             self.sqlite_conn.commit()
+            self.contact_index.invalidate()
             return True
         except Exception as e:
             print(f"Error adding contact: {e}")
             return False
     
-    def get_contact(self, name: str) -> Optional[Dict]:
-        """Search for a contact by name (fuzzy matching) - checks CSV file first"""
+    def upsert_contacts(self, contacts: Iterable[Dict], batch_size: int = 1000) -> Dict[str, int]:
+        """Bulk insert/update contacts keyed on the normalized phone number
+        
+        contacts is any iterable of {'name', 'phone' (or 'mobile_no'), 'email'}
+        dicts, consumed in chunks of batch_size so a large export is streamed
+        rather than loaded whole. Everything is written with executemany in a
+        single transaction: all rows land or none do. Returns the number of
+        contacts inserted, updated and skipped (unchanged, duplicate or invalid).
+        """
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        conn = self.sqlite_conn
+        
         try:
-            # First check CSV file
-            csv_contact = self._get_contact_from_csv(name)
-            if csv_contact:
-                return csv_contact
+            # Existing contacts by normalized number: {phone: [id, name, mobile_no, email]}
+            existing = {}
+            for row_id, name, mobile_no, email in conn.execute(
+                "SELECT id, name, mobile_no, email FROM contacts ORDER BY id"
+            ):
+                phone = self._clean_phone_number(mobile_no or '')
+                if phone and phone not in existing:
+                    existing[phone] = [row_id, name, mobile_no, email]
             
-            # Fallback to database
-            cursor = self.sqlite_conn.cursor()
-            name = name.strip().lower()
-            cursor.execute(
-                "SELECT * FROM contacts WHERE LOWER(name) LIKE ? OR LOWER(name) LIKE ?",
-                (f'%{name}%', f'{name}%')
-            )
-            result = cursor.fetchone()
-            if result:
-                return {
-                    'id': result[0],
-                    'name': result[1],
-                    'mobile_no': result[2],
-                    'email': result[3]
-                }
-            return None
+            seen = set()
+            inserts = []
+            updates = []
+            
+            def write_pending():
+                if inserts:
+                    conn.executemany(
+                        "INSERT INTO contacts (name, mobile_no, email) VALUES (?, ?, ?)", inserts
+                    )
+                    counts['inserted'] += len(inserts)
+                    inserts.clear()
+                if updates:
+                    conn.executemany(
+                        "UPDATE contacts SET name = ?, mobile_no = ?, email = ? WHERE id = ?", updates
+                    )
+                    counts['updated'] += len(updates)
+                    updates.clear()
+            
+            with conn:  # one transaction, rolled back on any error
+                for contact in contacts:
+                    name = (contact.get('name') or '').strip()
+                    phone = self._clean_phone_number(contact.get('phone') or contact.get('mobile_no') or '')
+                    email = (contact.get('email') or '').strip()
+                    
+                    if not name or len(phone.lstrip('+')) < 5 or phone in seen:
+                        counts['skipped'] += 1
+                        continue
+                    seen.add(phone)
+                    
+                    current = existing.get(phone)
+                    if current is None:
+                        inserts.append((name, phone, email))
+                    else:
+                        row_id, old_name, old_mobile, old_email = current
+                        email = email or old_email or ''
+                        if (name, phone, email) == (old_name, old_mobile, old_email or ''):
+                            counts['skipped'] += 1
+                        else:
+                            updates.append((name, phone, email, row_id))
+                    
+                    if len(inserts) + len(updates) >= batch_size:
+                        write_pending()
+                
+                write_pending()
+            
+            self.contact_index.invalidate()
+        except Exception as e:
+            print(f"Error importing contacts: {e}")
+            # The transaction was rolled back, so nothing was written
+            counts.update(inserted=0, updated=0, error=str(e))
+        
+        return counts
+    
+    def get_contact(self, name: str) -> Optional[Dict]:
+        """Search for a contact by name (exact, word, prefix or sound-alike match)"""
+        try:
+            return self.contact_index.lookup(name)
         except Exception as e:
             print(f"Error getting contact: {e}")
             return None
     
-    def _get_contact_from_csv(self, name: str) -> Optional[Dict]:
-        """Get contact from CSV file"""
-        import csv
-        import os
-        
-        csv_files = ['contacts.csv', '../contacts.csv']
-        
-        for csv_file in csv_files:
-            if os.path.exists(csv_file):
-                try:
-                    with open(csv_file, 'r', encoding='utf-8') as file:
-                        reader = csv.DictReader(file)
-                        for row in reader:
-                            csv_name = (row.get('Name') or row.get('name') or '').strip()
-                            csv_phone = (row.get('Phone Number') or row.get('Phone') or row.get('phone') or '').strip()
-                            
-                            if csv_name and csv_phone:
-                                # Check if names match (fuzzy matching)
-                                if (name.lower() in csv_name.lower() or 
-                                    csv_name.lower() in name.lower() or
-                                    name.lower() == csv_name.lower()):
-                                    
-                                    # Clean phone number
-                                    clean_phone = self._clean_phone_number(csv_phone)
-                                    
-                                    return {
-                                        'id': 0,
-                                        'name': csv_name,
-                                        'mobile_no': clean_phone,
-                                        'email': ''
-                                    }
-                except Exception as e:
-                    print(f"Error reading CSV {csv_file}: {e}")
-                    continue
-        
-        return None
+    def get_contact_by_number(self, phone: str) -> Optional[Dict]:
+        """Find the contact owning a phone number"""
+        try:
+            return self.contact_index.lookup_number(phone)
+        except Exception as e:
+            print(f"Error getting contact by number: {e}")
+            return None
     
     def _clean_phone_number(self, phone: str) -> str:
-        """Clean and format phone number"""
-        import re
-        
-        # Remove all non-digit characters except +
-        phone = re.sub(r'[^\d+]', '', phone)
-        
-        # Add country code if missing (assuming India +91)
-        if phone and not phone.startswith('+'):
-            if len(phone) == 10:
-                phone = '+91' + phone
-            elif len(phone) == 11 and phone.startswith('0'):
-                phone = '+91' + phone[1:]
-        
-        return phone
+        """Clean and format phone number (E.164, India +91 by default)"""
+        return normalize_phone(phone)
     
     def get_all_contacts(self) -> List[Dict]:
         """Get all contacts from CSV file and database"""
-        contacts = []
-        
-        # First get contacts from CSV
-        csv_contacts = self._get_all_contacts_from_csv()
-        contacts.extend(csv_contacts)
-        
-        # Then get from database (avoid duplicates)
         try:
-            cursor = self.sqlite_conn.cursor()
-            cursor.execute("SELECT * FROM contacts")
-            results = cursor.fetchall()
-            
-            for result in results:
-                db_contact = {
-                    'id': result[0],
-                    'name': result[1],
-                    'mobile_no': result[2],
-                    'email': result[3]
-                }
-                
-                # Check if contact already exists from CSV
-                duplicate = False
-                for csv_contact in csv_contacts:
-                    if (csv_contact['name'].lower() == db_contact['name'].lower() or
-                        csv_contact['mobile_no'] == db_contact['mobile_no']):
-                        duplicate = True
-                        break
-                
-                if not duplicate:
-                    contacts.append(db_contact)
-                    
+            return self.contact_index.all()
         except Exception as e:
-            print(f"Error getting database contacts: {e}")
-        
-        return contacts
-    
-    def _get_all_contacts_from_csv(self) -> List[Dict]:
-        """Get all contacts from CSV file"""
-        import csv
-        import os
-        
-        contacts = []
-        csv_files = ['contacts.csv', '../contacts.csv']
-        
-        for csv_file in csv_files:
-            if os.path.exists(csv_file):
-                try:
-                    with open(csv_file, 'r', encoding='utf-8') as file:
-                        reader = csv.DictReader(file)
-                        for row in reader:
-                            csv_name = (row.get('Name') or row.get('name') or '').strip()
-                            csv_phone = (row.get('Phone Number') or row.get('Phone') or row.get('phone') or '').strip()
-                            
-                            if csv_name and csv_phone:
-                                clean_phone = self._clean_phone_number(csv_phone)
-                                
-                                contacts.append({
-                                    'id': len(contacts) + 1,
-                                    'name': csv_name,
-                                    'mobile_no': clean_phone,
-                                    'email': ''
-                                })
-                except Exception as e:
-                    print(f"Error reading CSV {csv_file}: {e}")
-                    continue
-                break  # Only read from first found CSV file
-        
-        return contacts
+            print(f"Error getting contacts: {e}")
+            return []
     
     # System Commands Management
     def add_system_command(self, name: str, path: str) -> bool:
@@ -265,25 +311,28 @@ class DatabaseManager:
                 (name.lower(), path)
             )
             self.sqlite_conn.commit()
+            self.lookup_cache.invalidate('sys_command', name.lower())
             return True
         except Exception as e:
             print(f"Error adding system command: {e}")
             return False
     
     def get_system_command(self, name: str) -> Optional[str]:
-        """Get system command path by name"""
+        """Get system command path by name (served from memory after the first lookup)"""
         try:
-            cursor = self.sqlite_conn.cursor()
-            cursor.execute(
-                "SELECT path FROM sys_command WHERE name = ?",
-                (name.lower(),)
-            )
-            result = cursor.fetchone()
-            return result[0] if result else None
+            return self.lookup_cache.get('sys_command', name.lower(),
+                                         lambda: self._query_system_command(name.lower()))
         except Exception as e:
             print(f"Error getting system command: {e}")
             return None
     
+    def _query_system_command(self, name: str) -> Optional[str]:
+        """Read a system command path from SQLite"""
+        cursor = self.sqlite_conn.cursor()
+        cursor.execute("SELECT path FROM sys_command WHERE name = ?", (name,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+    
     # Web Commands Management
     def add_web_command(self, name: str, url: str) -> bool:
         """Add a web command/URL"""
@@ -294,29 +343,32 @@ class DatabaseManager:
                 (name.lower(), url)
             )
             self.sqlite_conn.commit()
+            self.lookup_cache.invalidate('web_command', name.lower())
             return True
         except Exception as e:
             print(f"Error adding web command: {e}")
             return False
     
     def get_web_command(self, name: str) -> Optional[str]:
-        """Get web command URL by name"""
+        """Get web command URL by name (served from memory after the first lookup)"""
         try:
-            cursor = self.sqlite_conn.cursor()
-            cursor.execute(
-                "SELECT url FROM web_command WHERE name = ?",
-                (name.lower(),)
-            )
-            result = cursor.fetchone()
-            return result[0] if result else None
+            return self.lookup_cache.get('web_command', name.lower(),
+                                         lambda: self._query_web_command(name.lower()))
         except Exception as e:
             print(f"Error getting web command: {e}")
             return None
     
+    def _query_web_command(self, name: str) -> Optional[str]:
+        """Read a web command URL from SQLite"""
+        cursor = self.sqlite_conn.cursor()
+        cursor.execute("SELECT url FROM web_command WHERE name = ?", (name,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+    
     # Chat History Management
     def save_chat_message(self, user_input: str, response: str, intent: str = None, 
                          processing_time: float = None, ai_model: str = None) -> bool:
-        """Save chat message to MongoDB or JSON fallback"""
+        """Queue a chat message for MongoDB or the JSON fallback (returns immediately)"""
         chat_data = {
             'timestamp': datetime.utcnow(),
             'user_input': user_input,
@@ -326,80 +378,132 @@ class DatabaseManager:
             'ai_model_used': ai_model
         }
         
-        if self.mongo_db is not None:
-            try:
-                self.mongo_db.chat_history.insert_one(chat_data)
-                return True
-            except Exception as e:
-                print(f"MongoDB save error: {e}")
+        if self.chat_persister is not None:
+            return self.chat_persister.save(chat_data)
+        
+        try:
+            self._write_chat_batch([chat_data])
+            return True
+        except Exception as e:
+            print(f"MongoDB save error: {e}")
+            return self._save_to_json_fallback(chat_data)
+    
+    def _probe_mongo(self):
+        """Background reachability check, so startup never waits on MongoDB
         
-        # Fallback to JSON file
-        return self._save_to_json_fallback(chat_data)
+        An unreachable server trips the chat breaker straight away: chat goes to
+        the local store without every call first waiting out server selection.
+        """
+        try:
+            self.mongo_client.admin.command('ping')
+            self.chat_breaker.record_success()
+            print("✅ MongoDB chat history reachable")
+        except Exception as e:
+            self.chat_breaker.trip()
+            print(f"⚠️ MongoDB not available: {e}")
+            print("📝 Chat history will be stored in JSON files as fallback")
+    
+    def _write_chat_batch(self, records: List[Dict]):
+        """Persist a batch of chat records in one round trip (raises so the persister can retry)"""
+        if self.chat_backend is self.chat_fallback or not self.chat_breaker.allow_request():
+            self._save_batch_to_json_fallback(records)
+            return
+        
+        try:
+            self.chat_backend.append(records)
+        except Exception:
+            self.chat_breaker.record_failure()
+            raise
+        self.chat_breaker.record_success()
+        self._index_chat_batch(records)
+    
+    def _index_chat_batch(self, records: List[Dict]):
+        """Add persisted chat turns to the search index"""
+        if self.search_index is None:
+            return
+        try:
+            self.search_index.add_chat_turns(records)
+        except Exception as e:
+            print(f"Search index error: {e}")
+    
+    def _save_batch_to_json_fallback(self, records: List[Dict]):
+        """Append a batch of chat records to the local JSON Lines chat store"""
+        self.chat_fallback.append(records)
+        self._index_chat_batch(records)
     
     def _save_to_json_fallback(self, chat_data: Dict) -> bool:
-        """Save chat data to JSON file as fallback"""
+        """Append chat data to the local JSON Lines chat store"""
         try:
-            # Convert datetime to string for JSON serialization
-            chat_data['timestamp'] = chat_data['timestamp'].isoformat()
-            
-            # Load existing data
-            chat_file = "ChatLog.json"
-            if os.path.exists(chat_file):
-                with open(chat_file, 'r') as f:
-                    messages = json.load(f)
-            else:
-                messages = []
-            
-            # Add new message
-            messages.append({
-                'role': 'user',
-                'content': chat_data['user_input'],
-                'timestamp': chat_data['timestamp']
-            })
-            messages.append({
-                'role': 'assistant',
-                'content': chat_data['response'],
-                'timestamp': chat_data['timestamp'],
-                'metadata': {
-                    'intent': chat_data['intent'],
-                    'processing_time': chat_data['processing_time'],
-                    'ai_model': chat_data['ai_model_used']
-                }
-            })
-            
-            # Save to file
-            with open(chat_file, 'w') as f:
-                json.dump(messages, f, indent=4)
-            
+            self._save_batch_to_json_fallback([chat_data])
             return True
         except Exception as e:
             print(f"JSON fallback save error: {e}")
             return False
     
-    def get_chat_history(self, limit: int = 50) -> List[Dict]:
-        """Get recent chat history"""
-        if self.mongo_db is not None:
+    def flush_chat_writes(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait for queued chat messages to be written"""
+        if self.chat_persister is None or not self.chat_persister.pending():
+            return True
+        return self.chat_persister.flush(timeout)
+    
+    def get_chat_history(self, limit: int = 50, before: Optional[str] = None) -> List[Dict]:
+        """Get recent chat history (entries older than the before cursor, if given)"""
+        return self._read_chat('history', limit, before)
+    
+    def _read_chat(self, method: str, limit: int, before: Optional[str]) -> Any:
+        """Read from the chat backend, falling back to the local chat store"""
+        if self.chat_backend is not self.chat_fallback and self.chat_breaker.allow_request():
             try:
-                cursor = self.mongo_db.chat_history.find().sort("timestamp", -1).limit(limit)
-                return list(cursor)
+                return self._read_chat_from(self.chat_backend, method, limit, before)
             except Exception as e:
-                print(f"MongoDB read error: {e}")
+                self.chat_breaker.record_failure()
+                print(f"Chat backend ({self.chat_backend.name}) read error: {e}")
         
-        # Fallback to JSON file
-        return self._load_from_json_fallback(limit)
-    
-    def _load_from_json_fallback(self, limit: int) -> List[Dict]:
-        """Load chat history from JSON file"""
         try:
-            chat_file = "ChatLog.json"
-            if os.path.exists(chat_file):
-                with open(chat_file, 'r') as f:
-                    messages = json.load(f)
-                return messages[-limit:] if len(messages) > limit else messages
-            return []
+            return self._read_chat_from(self.chat_fallback, method, limit, before)
         except Exception as e:
             print(f"JSON fallback load error: {e}")
+            return {'messages': [], 'next_before': None, 'has_more': False} if method == 'page' else []
+    
+    def _read_chat_from(self, backend, method: str, limit: int, before: Optional[str]) -> Any:
+        """One read from a chat backend, plus the turns still in the write-behind queue on the newest page
+        
+        A cursor the backend cannot use (e.g. a MongoDB one after falling back
+        to the local store) restarts from the newest page rather than failing.
+        """
+        if before and backend.parse_cursor(before) is None:
+            print(f"Chat cursor {before!r} does not belong to {backend.name}; reading from the newest page")
+            before = None
+        result = getattr(backend, method)(limit, before)
+        if backend is self.chat_backend:
+            self.chat_breaker.record_success()
+        
+        # Read your own writes without waiting for them
+        if before or self.chat_persister is None:
+            return result
+        records = self.chat_persister.unwritten()
+        return backend.with_unwritten(method, result, records) if records else result
+    
+    def search_history(self, query: str, limit: int = 5, kinds: Optional[List[str]] = None) -> List[Dict]:
+        """Ranked snippets from chat history, transcripts, summaries and emails"""
+        if self.search_index is None:
             return []
+        try:
+            # Turns still in the write-behind queue are indexed once written;
+            # searching never waits for them
+            return self.search_index.search(query, limit, kinds)
+        except Exception as e:
+            print(f"Search error: {e}")
+            return []
+    
+    def get_chat_page(self, limit: int = 20, before: Optional[str] = None) -> Dict[str, Any]:
+        """One page of chat messages (oldest first) plus the cursor for the page before it
+        
+        Works the same for every chat backend: pass the returned next_before
+        back as before to load older messages. Only the requested page is
+        read, however long the history is.
+        """
+        return self._read_chat('page', limit, before)
     
     # User Preferences Management
     def set_preference(self, key: str, value: Any) -> bool:
@@ -411,31 +515,41 @@ class DatabaseManager:
                 (key, json.dumps(value))
             )
             self.sqlite_conn.commit()
+            self.lookup_cache.invalidate('user_preferences', key)
             return True
         except Exception as e:
             print(f"Error setting preference: {e}")
             return False
     
     def get_preference(self, key: str, default: Any = None) -> Any:
-        """Get a user preference"""
+        """Get a user preference (decoded once, then served from memory)"""
         try:
-            cursor = self.sqlite_conn.cursor()
-            cursor.execute("SELECT value FROM user_preferences WHERE key = ?", (key,))
-            result = cursor.fetchone()
-            if result:
-                return json.loads(result[0])
-            return default
+            value = self.lookup_cache.get('user_preferences', key, lambda: self._query_preference(key))
+            return default if value is _MISSING else value
         except Exception as e:
             print(f"Error getting preference: {e}")
             return default
     
+    def _query_preference(self, key: str) -> Any:
+        """Read and decode a preference from SQLite (_MISSING if unset)"""
+        cursor = self.sqlite_conn.cursor()
+        cursor.execute("SELECT value FROM user_preferences WHERE key = ?", (key,))
+        result = cursor.fetchone()
+        return json.loads(result[0]) if result else _MISSING
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit ratios of the in-memory lookup caches"""
+        stats = self.lookup_cache.get_stats()
+        stats['contacts'] = self.contact_index.get_stats()
+        return stats
+    
     # Database Maintenance
     def backup_database(self) -> bool:
         """Create a backup of the SQLite database"""
         try:
-            import shutil
             backup_path = f"jarvis_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            shutil.copy2("jarvis.db", backup_path)
+            # Online backup API: copying the file alone would miss pages still in the WAL
+            self.sqlite_pool.backup(backup_path)
             print(f"✅ Database backed up to {backup_path}")
             return True
         except Exception as e:
@@ -444,10 +558,18 @@ class DatabaseManager:
     
     def close_connections(self):
         """Close all database connections"""
-        if self.sqlite_conn:
-            self.sqlite_conn.close()
-        if self.mongo_client:
-            self.mongo_client.close()
+        if self.chat_persister:
+            # Write out queued chat messages before the stores go away
+            self.chat_persister.close()
+        if self.chat_backend and self.chat_backend is not self.chat_fallback:
+            try:
+                self.chat_backend.close()
+            except Exception as e:
+                print(f"Chat backend close error: {e}")
+        if self.chat_store:
+            self.chat_store.close()
+        if self.sqlite_pool:
+            self.sqlite_pool.close_all()
         print("🔒 Database connections closed")
 
 # Initialize default data
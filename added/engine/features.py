@@ -6,10 +6,6 @@ import subprocess
 import time
 import webbrowser
 import eel
-try:
-    import pyaudio
-except ImportError:
-    pyaudio = None
 try:
     import pyautogui
 except ImportError:
@@ -42,6 +38,7 @@ except ImportError:
         return query.strip()
 from .database_manager import DatabaseManager
 from .ai_router import AIRouter
+from .audio_capture import get_capture_service
 import asyncio
 
 # Initialize database connection
@@ -99,23 +96,19 @@ def PlayYoutube(query):
 def hotword():
     """Wake word detection - exactly like jarvis-main"""
     porcupine = None
-    paud = None
-    audio_stream = None
+    capture = None
     try:
         # Pre-trained keywords - same as jarvis-main
         porcupine = pvporcupine.create(keywords=["jarvis", "alexa"]) 
-        paud = pyaudio.PyAudio()
-        audio_stream = paud.open(
-            rate=porcupine.sample_rate,
-            channels=1,
-            format=pyaudio.paInt16,
-            input=True,
-            frames_per_buffer=porcupine.frame_length
-        )
+        # Read from the shared microphone stream instead of opening another one
+        capture = get_capture_service().acquire()
+        consumer = capture.consumer(pre_roll_ms=0)
         
         # Loop for streaming - same as jarvis-main
         while True:
-            keyword = audio_stream.read(porcupine.frame_length)
+            keyword = consumer.read_bytes(porcupine.frame_length)
+            if keyword is None:
+                continue
             keyword = struct.unpack_from("h" * porcupine.frame_length, keyword)
 
             # Processing keyword from mic - same as jarvis-main
@@ -131,16 +124,16 @@ def hotword():
                 autogui.press("j")
                 time.sleep(2)
                 autogui.keyUp("win")
+                # Resume on live audio rather than the two seconds that queued up meanwhile
+                consumer.skip_to_latest()
                 
     except Exception as e:
         print(f"❌ Hotword detection error: {e}")
     finally:
         if porcupine is not None:
             porcupine.delete()
-        if audio_stream is not None:
-            audio_stream.close()
-        if paud is not None:
-            paud.terminate()
+        if capture is not None:
+            capture.release()
 
 def findContact(query):
     """Find contacts - exactly like jarvis-main"""
@@ -0,0 +1,93 @@
+import time
+import threading
+from typing import Dict, Callable, Optional, Any
+
+class HealthMonitor:
+    """Probes backends on a background timer and caches the latest status"""
+    
+    def __init__(self, probes: Dict[str, Callable[[], bool]], interval: float = 60.0):
+        self.probes = probes
+        self.interval = interval
+        
+        self._lock = threading.Lock()
+        self._status = {name: False for name in probes}
+        self._details: Dict[str, Dict[str, Any]] = {
+            name: {'available': False, 'last_checked': None, 'latency': None, 'error': None}
+            for name in probes
+        }
+        self._listeners = []
+        
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start the background probe loop (first round runs immediately)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._monitor_loop, name="ai-health-monitor", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the probe loop"""
+        self._stop_event.set()
+        self._wake_event.set()
+    
+    def add_listener(self, callback: Callable[[str, bool, Optional[float]], None]):
+        """Register callback(name, available, latency) invoked after every probe"""
+        self._listeners.append(callback)
+    
+    def request_check(self):
+        """Ask the background thread to probe again as soon as possible"""
+        self._wake_event.set()
+    
+    def _monitor_loop(self):
+        """Probe every backend, then sleep until the next interval or a wake-up"""
+        while not self._stop_event.is_set():
+            self.check_now()
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+    
+    def check_now(self, name: Optional[str] = None) -> Dict[str, bool]:
+        """Run probes synchronously (all of them, or just one)"""
+        names = [name] if name else list(self.probes)
+        for probe_name in names:
+            self._run_probe(probe_name)
+        return self.get_status()
+    
+    def _run_probe(self, name: str):
+        """Run a single probe and record the outcome"""
+        start_time = time.time()
+        error = None
+        try:
+            available = bool(self.probes[name]())
+        except Exception as e:
+            available = False
+            error = str(e)
+        latency = time.time() - start_time
+        
+        with self._lock:
+            self._status[name] = available
+            self._details[name] = {
+                'available': available,
+                'last_checked': time.time(),
+                'latency': latency,
+                'error': error
+            }
+        
+        for listener in self._listeners:
+            try:
+                listener(name, available, latency if available else None)
+            except Exception as e:
+                print(f"Health listener error: {e}")
+    
+    def get_status(self) -> Dict[str, bool]:
+        """Latest cached availability per backend (never blocks on the network)"""
+        with self._lock:
+            return dict(self._status)
+    
+    def get_details(self) -> Dict[str, Dict[str, Any]]:
+        """Latest probe details per backend"""
+        with self._lock:
+            return {name: dict(details) for name, details in self._details.items()}
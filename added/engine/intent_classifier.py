@@ -0,0 +1,332 @@
+import os
+import re
+import json
+import time
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Any, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Labeled utterances for the FinalJarvis TASK labels, seeded from the task list
+# and the examples in the analysis prompt
+TASK_CORPUS = {
+    'OPEN_YOUTUBE': ["open youtube", "launch youtube", "go to youtube", "start youtube", "jarvis open youtube for me", "can you open youtube"],
+    'SEARCH_YOUTUBE': ["search cats on youtube", "search for cooking videos on youtube", "find lofi music on youtube", "look up python tutorial on youtube", "youtube search for funny videos", "search youtube for news"],
+    'PLAY_YOUTUBE': ["play despacito on youtube", "play a song on youtube", "play music on youtube", "play shape of you", "play some relaxing music", "play believer by imagine dragons"],
+    'CLOSE_YOUTUBE': ["close youtube", "exit youtube", "shut youtube", "stop youtube", "jarvis close youtube"],
+    'OPEN_GOOGLE': ["open google", "launch google", "go to google", "start google chrome", "open the browser"],
+    'SEARCH_GOOGLE': ["search weather in delhi on google", "google the latest news", "search for best laptops", "look up python documentation", "search google for restaurants near me", "find flights to mumbai", "who is the president of india", "what is the capital of france", "how far is the moon"],
+    'CLOSE_GOOGLE': ["close google", "close the browser", "close chrome", "exit the browser", "shut down chrome"],
+    'OPEN_NOTEPAD': ["open notepad", "launch notepad", "start notepad", "open a text editor"],
+    'WRITE_LEAVE_APPLICATION': ["write a leave application", "write leave application in notepad", "draft a leave letter", "write an application for leave", "prepare a sick leave application"],
+    'CLOSE_NOTEPAD': ["close notepad", "exit notepad", "shut notepad"],
+    'CALL_TOM': ["call tom", "phone tom", "dial tom", "give tom a call", "make a call to tom", "jarvis call tom for me"],
+    'SMS_TOM': ["send sms to tom", "text tom", "send a message to tom", "sms tom saying i am late", "send tom a text message", "message tom that i will be there soon"],
+    'END_CALL': ["end the call", "hang up", "cut the call", "disconnect the call", "end call"],
+    'WHATSAPP_TOM': ["whatsapp tom", "send whatsapp message to tom", "whatsapp tom saying hello", "send tom a whatsapp", "message tom on whatsapp"],
+    'VOLUME_UP': ["volume up", "increase the volume", "turn up the volume", "make it louder", "raise the volume"],
+    'VOLUME_DOWN': ["volume down", "decrease the volume", "turn down the volume", "make it quieter", "lower the volume"],
+    'BRIGHTNESS_UP': ["brightness up", "increase the brightness", "make the screen brighter", "turn up the brightness"],
+    'BRIGHTNESS_DOWN': ["brightness down", "decrease the brightness", "dim the screen", "turn down the brightness"],
+    'TURN_ON_FLASHLIGHT': ["turn on the flashlight", "turn on phone flashlight", "switch on the torch", "flashlight on"],
+    'TURN_OFF_FLASHLIGHT': ["turn off the flashlight", "turn off phone flashlight", "switch off the torch", "flashlight off"],
+    'TAKE_PHOTO': ["take a photo", "take my picture", "click a photo with the camera", "take a selfie", "capture a photo with laptop camera"],
+    'TAKE_SCREENSHOT': ["take a screenshot", "capture the screen", "screenshot my screen", "grab a screenshot"],
+    'OPEN_CHATGPT': ["open chatgpt", "ask chatgpt about black holes", "open chatgpt and search for recipes", "go to chatgpt"],
+    'OPEN_RECYCLE_BIN': ["open recycle bin", "show the recycle bin", "open the trash"],
+    'DELETE_RECYCLE_BIN': ["empty the recycle bin", "delete all items from recycle bin", "clear the recycle bin", "empty trash"],
+    'CLOSE_RECYCLE_BIN': ["close recycle bin", "close the trash", "exit recycle bin"],
+    'SET_ALARM': ["set an alarm for 7 am", "set alarm on phone", "wake me up at 6", "set an alarm for tomorrow morning"],
+    'ADD_CALENDAR_EVENT': ["add event to google calendar", "add a meeting to my calendar", "schedule an event tomorrow at 5", "put a dentist appointment on my calendar"],
+    'PLAY_YOUTUBE_VIDEO': ["play the video how to cook pasta", "play specific youtube video", "play the latest mrbeast video"],
+    'WRITE_CUSTOM': ["write a poem in notepad", "write an invitation letter", "write a letter to my friend", "write a birthday message in notepad", "write a story about dragons"],
+    'RECIPE_REQUEST': ["tell me recipe to make burger", "how to make pasta", "recipe for chocolate cake", "how do i cook biryani", "give me a recipe for pancakes"],
+    'RECIPE_NEXT': ["next", "next step", "what is the next step", "continue the recipe", "go to the next step"],
+    'READ_PDF': ["open the pdf named amazon", "read the pdf file report", "read my pdf", "open pdf called resume", "read the document named notes"],
+    'DESCRIBE_SCREEN': ["describe what's on my screen", "what do you see on my screen", "what is on my screen", "describe my screen", "look at my screen"],
+    'READ_EMAILS': ["jarvis read my emails for me", "check my emails", "read my unread emails", "do i have any new email", "summarize my inbox"],
+    'ATTEND_MEETING': ["jarvis attend the meeting for me", "attend the meeting", "record this meeting", "join the meeting and take notes", "start recording the meeting"],
+    'LEAVE_MEETING': ["jarvis you can leave the meeting", "leave the meeting", "stop recording the meeting", "stop meeting jarvis"],
+    'MEETING_STATUS': ["meeting status", "are you still recording the meeting", "what is the meeting status", "is the meeting being recorded"],
+    'HELP_WITH_CODE': ["jarvis help me with my code", "check my code", "help me debug my code", "find the error in my code", "what is wrong with my code"],
+    'CODE_SUCCESS': ["thank you jarvis my code is running successfully now", "my code works now", "the code is running fine now", "thanks the bug is fixed"],
+    'SEARCH_HISTORY': ["what did we decide about the deadline last week", "what did we talk about yesterday", "find what we said about the budget", "search my history for the project plan", "what was discussed in the meeting about hiring", "did i mention the launch date", "remind me what we decided about the design", "what did the email say about the invoice"],
+    'CONVERSATION': ["how are you", "i am feeling sad today", "tell me a joke", "what do you think about life", "i had a bad day", "who are you", "thank you", "good morning jarvis", "can we talk for a while", "i feel stressed", "what is love", "tell me something interesting"],
+    # Negative examples: near misses of tasks with side effects (messages, calls,
+    # device state) that no task covers - classified here, they go to the LLM
+    'UNKNOWN': ["launch whatsapp", "open whatsapp web", "open spotify", "open settings", "open the camera app", "switch off the lights", "turn on the fan", "turn off the television", "switch on the ac", "dim the lights in the bedroom", "message mom", "text my boss", "send an email to sarah", "call the office", "call an ambulance", "phone my brother", "whatsapp my sister", "send mom a whatsapp", "delete my files", "empty the downloads folder", "shut down the computer", "end the meeting for everyone", "set a timer for ten minutes", "lock the front door"]
+}
+
+# Labeled utterances for the CommandProcessor intents, seeded from its regexes
+# and the categories in AIRouter.classify_intent
+COMMAND_CORPUS = {
+    'open_app': ["open chrome", "launch spotify", "start notepad", "run calculator", "open vs code", "open whatsapp web"],
+    'close_app': ["close chrome", "quit spotify", "exit notepad", "kill the calculator", "terminate vlc"],
+    'play_media': ["play despacito on youtube", "play some music", "stream lofi beats", "play shape of you on spotify", "put on a song"],
+    'phone_call': ["call john", "phone mom", "dial dad", "make a call to tom", "ring my brother", "give alice a call"],
+    'send_message': ["send a message to john", "text mom", "message tom i am late", "sms dad good night", "send an sms to alice"],
+    'whatsapp': ["whatsapp john", "send a whatsapp message to tom", "whatsapp video call mom", "make a whatsapp call to dad"],
+    'system_command': ["mute", "unmute the sound", "volume up", "volume down", "shutdown the computer", "restart the pc", "put the computer to sleep", "minimize all windows", "brightness up"],
+    'web_search': ["search for pizza near me on google", "look up the news", "google python tutorials", "find cheap flights", "search for laptops on bing"],
+    'file_operations': ["open recycle bin", "empty recycle bin", "delete old files", "show the recycle bin"],
+    'content_generation': ["write a letter about my leave", "create an essay about climate change", "generate code for a calculator", "compose a poem", "draft an email to my boss", "write an article about ai"],
+    'weather': ["what's the weather", "weather in london", "temperature in delhi", "is it going to rain today", "how's the weather outside"],
+    'time_date': ["what time is it", "current time", "what is the date today", "which day is today", "tell me the date"],
+    'greeting': ["hello jarvis", "hi", "hey assistant", "good morning", "good evening jarvis"],
+    'general': ["what is the meaning of life", "how are you", "tell me a joke", "who invented the telephone", "explain quantum physics", "why is the sky blue", "i am bored"]
+}
+
+# Tasks whose QUERY slot is the search/subject phrase of the command
+QUERY_TASKS = {'SEARCH_YOUTUBE', 'PLAY_YOUTUBE', 'PLAY_YOUTUBE_VIDEO', 'SEARCH_GOOGLE',
+               'OPEN_CHATGPT', 'RECIPE_REQUEST', 'READ_PDF', 'WRITE_CUSTOM'}
+
+# Tasks whose MESSAGE slot is the text to send
+MESSAGE_TASKS = {'SMS_TOM', 'WHATSAPP_TOM'}
+
+QUERY_STOPWORDS = {'jarvis', 'please', 'can', 'you', 'could', 'for', 'me', 'search', 'play', 'find',
+                   'look', 'up', 'on', 'youtube', 'google', 'open', 'the', 'a', 'and', 'ask', 'chatgpt',
+                   'named', 'called', 'file', 'pdf', 'read', 'tell', 'recipe', 'to', 'in', 'notepad', 'write'}
+
+# Label the task classifier abstains with (see the UNKNOWN examples above)
+UNKNOWN_TASK = 'UNKNOWN'
+
+# Explicit markers for the text to send ("... tom saying/that says/that <text>");
+# otherwise the text follows the last message/text/sms keyword
+MESSAGE_MARKER = re.compile(r'\b(?:saying|that says|that)\s+(.+)$', re.IGNORECASE)
+MESSAGE_KEYWORD = re.compile(r'\b(?:message|text|sms)\b', re.IGNORECASE)
+MESSAGE_CHANNEL = re.compile(r'^(?:on|via|over|through|by)\s+(?:whatsapp|sms|text)$', re.IGNORECASE)
+
+def extract_message(command: str, contact: str = 'tom') -> str:
+    """Text to send from a messaging command ('' = let the caller use its default)
+    
+    "text tom that i will be late" -> "i will be late"; "send a message to tom" -> ""
+    """
+    contact_match = re.search(rf'\b{re.escape(contact)}\b', command, re.IGNORECASE)
+    match = MESSAGE_MARKER.search(command, contact_match.end() if contact_match else 0)
+    if match:
+        return match.group(1).strip()
+    
+    keywords = list(MESSAGE_KEYWORD.finditer(command))
+    if not keywords:
+        return ''
+    message = command[keywords[-1].end():].strip()
+    # "... message to tom" / "text tom ..." - the contact is not part of the text
+    message = re.sub(rf'^(?:to\s+)?{re.escape(contact)}\b\s*', '', message, flags=re.IGNORECASE)
+    if MESSAGE_CHANNEL.match(message):
+        return ''
+    return message
+
+class IntentClassifier:
+    """Character n-gram TF-IDF + softmax regression intent classifier (NumPy only)
+    
+    Trains in well under a second from a few hundred labeled utterances and
+    classifies a command in a fraction of a millisecond, so the LLM is only
+    needed for commands it is unsure about.
+    """
+    
+    def __init__(self, corpus: Dict[str, List[str]], ngram_range: Tuple[int, int] = (2, 4),
+                 threshold: Optional[float] = None, epochs: int = 200,
+                 learning_rate: float = 20.0, l2: float = 1e-4,
+                 min_margin: Optional[float] = None, min_coverage: Optional[float] = None,
+                 abstain_label: Optional[str] = None):
+        self.ngram_range = ngram_range
+        self.threshold = threshold if threshold is not None else float(os.getenv('INTENT_CONFIDENCE_THRESHOLD', '0.6'))
+        # Lead over the runner-up, and share of the command's n-grams seen in training,
+        # both required before a prediction counts as confident
+        self.min_margin = min_margin if min_margin is not None else float(os.getenv('INTENT_MIN_MARGIN', '0.3'))
+        self.min_coverage = min_coverage if min_coverage is not None else float(os.getenv('INTENT_MIN_COVERAGE', '0.8'))
+        # Label that is never confident (negative examples)
+        self.abstain_label = abstain_label
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        
+        self.labels: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = None
+        self.weights = None
+        self.bias = None
+        self.training_time = 0.0
+        
+        self.stats = {'predictions': 0, 'confident': 0}
+        
+        self.fit(corpus)
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lower-case, drop punctuation and collapse whitespace"""
+        text = re.sub(r"[^a-z0-9' ]+", ' ', text.lower())
+        return re.sub(r'\s+', ' ', text).strip()
+    
+    def _ngrams(self, text: str) -> Counter:
+        """Character n-gram counts of the padded, normalized text"""
+        padded = f" {self.normalize(text)} "
+        counts = Counter()
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+        return counts
+    
+    def _vectorize(self, text: str, counts: Optional[Counter] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse TF-IDF vector as (feature indices, L2-normalized values)"""
+        counts = counts if counts is not None else self._ngrams(text)
+        indices = []
+        values = []
+        for gram, count in counts.items():
+            index = self.vocabulary.get(gram)
+            if index is not None:
+                indices.append(index)
+                values.append(1.0 + np.log(count))
+        
+        if not indices:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        indices = np.array(indices, dtype=np.int64)
+        values = np.array(values, dtype=np.float32) * self.idf[indices]
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values /= norm
+        return indices, values
+    
+    def fit(self, corpus: Dict[str, List[str]]):
+        """Build the vocabulary and IDF, then train the softmax weights"""
+        start_time = time.time()
+        
+        self.labels = sorted(corpus)
+        texts = []
+        targets = []
+        for label_index, label in enumerate(self.labels):
+            for text in corpus[label]:
+                texts.append(text)
+                targets.append(label_index)
+        
+        # Vocabulary and document frequencies
+        document_grams = [self._ngrams(text) for text in texts]
+        document_frequency = Counter()
+        for grams in document_grams:
+            document_frequency.update(grams.keys())
+        self.vocabulary = {gram: index for index, gram in enumerate(sorted(document_frequency))}
+        
+        n_docs = len(texts)
+        self.idf = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for gram, frequency in document_frequency.items():
+            self.idf[self.vocabulary[gram]] = np.log((1 + n_docs) / (1 + frequency)) + 1.0
+        
+        # Dense design matrix (small: a few hundred rows)
+        features = np.zeros((n_docs, len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, values = self._vectorize(text)
+            features[row, indices] = values
+        
+        onehot = np.zeros((n_docs, len(self.labels)), dtype=np.float32)
+        onehot[np.arange(n_docs), targets] = 1.0
+        
+        # Full-batch gradient descent on the cross-entropy loss
+        self.weights = np.zeros((len(self.vocabulary), len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(self.epochs):
+            probabilities = self._softmax(features @ self.weights + self.bias)
+            error = (probabilities - onehot) / n_docs
+            self.weights -= self.learning_rate * (features.T @ error + self.l2 * self.weights)
+            self.bias -= self.learning_rate * error.sum(axis=0)
+        
+        self.training_time = time.time() - start_time
+    
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        """Row-wise softmax"""
+        shifted = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(shifted)
+        return exp / exp.sum(axis=-1, keepdims=True)
+    
+    def predict(self, text: str, top_k: int = 3) -> Dict[str, Any]:
+        """Classify a command
+        
+        confident is True only when the best label is not the abstain label, its
+        probability reaches the threshold, it leads the runner-up by min_margin and
+        at least min_coverage of the command's n-grams were seen in training.
+        """
+        counts = self._ngrams(text)
+        indices, values = self._vectorize(text, counts)
+        total = sum(counts.values())
+        coverage = sum(count for gram, count in counts.items() if gram in self.vocabulary) / total if total else 0.0
+        if len(indices):
+            logits = values @ self.weights[indices] + self.bias
+        else:
+            logits = self.bias.copy()
+        probabilities = self._softmax(logits)
+        
+        order = np.argsort(probabilities)[::-1]
+        best = int(order[0])
+        confidence = float(probabilities[best])
+        margin = confidence - float(probabilities[int(order[1])]) if len(order) > 1 else confidence
+        confident = (len(indices) > 0 and self.labels[best] != self.abstain_label
+                     and confidence >= self.threshold and margin >= self.min_margin
+                     and coverage >= self.min_coverage)
+        
+        self.stats['predictions'] += 1
+        if confident:
+            self.stats['confident'] += 1
+        
+        return {
+            'label': self.labels[best],
+            'confidence': confidence,
+            'confident': confident,
+            'margin': margin,
+            'coverage': coverage,
+            'alternatives': [(self.labels[int(i)], float(probabilities[int(i)])) for i in order[:top_k]]
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Prediction counters and model size"""
+        stats = dict(self.stats)
+        stats['labels'] = len(self.labels)
+        stats['features'] = len(self.vocabulary)
+        stats['training_time'] = self.training_time
+        stats['local_ratio'] = stats['confident'] / stats['predictions'] if stats['predictions'] else 0.0
+        return stats
+
+class TaskClassifier(IntentClassifier):
+    """IntentClassifier over the FinalJarvis TASK labels with QUERY/MESSAGE slot extraction"""
+    
+    def __init__(self, corpus: Optional[Dict[str, List[str]]] = None, **kwargs):
+        kwargs.setdefault('abstain_label', UNKNOWN_TASK)
+        super().__init__(corpus or load_corpus(TASK_CORPUS, os.getenv('INTENT_CORPUS_PATH')), **kwargs)
+    
+    def analyze(self, command: str) -> Dict[str, Any]:
+        """Classify a command into TASK/QUERY/MESSAGE with a confidence score"""
+        prediction = self.predict(command)
+        task = prediction['label']
+        
+        query = ''
+        message = ''
+        if task in QUERY_TASKS:
+            words = [word for word in self.normalize(command).split() if word not in QUERY_STOPWORDS]
+            query = ' '.join(words)
+        if task in MESSAGE_TASKS:
+            message = extract_message(command)
+        
+        prediction.update({
+            'task': task,
+            'query': query,
+            'message': message,
+            'analysis': f"TASK: {task}\nQUERY: {query}\nMESSAGE: {message}"
+        })
+        return prediction
+
+def load_corpus(base: Dict[str, List[str]], path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Copy a seed corpus and merge extra {"text", "label"} JSONL lines from path"""
+    corpus = {label: list(texts) for label, texts in base.items()}
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        item = json.loads(line)
+                        corpus.setdefault(item['label'], []).append(item['text'])
+        except Exception as e:
+            print(f"⚠️ Could not load intent corpus {path}: {e}")
+    return corpus
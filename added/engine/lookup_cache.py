@@ -0,0 +1,91 @@
+import os
+import copy
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+class LookupCache:
+    """Read-through in-memory cache for small, rarely-changing SQLite tables
+    
+    Values (including "not found") are cached per (table, key) on first read,
+    so after warm-up lookups do no disk I/O. Writes made through
+    DatabaseManager invalidate the affected key immediately. Writes from other
+    connections or processes bump a per-table version via triggers; that
+    version is checked at most every check_interval seconds with one query.
+    """
+    
+    def __init__(self, connection_getter: Callable[[], Any], tables: Iterable[str],
+                 check_interval: Optional[float] = None):
+        self.connection_getter = connection_getter
+        self.check_interval = check_interval if check_interval is not None else \
+            float(os.getenv('DB_CACHE_CHECK_INTERVAL', '1.0'))
+        
+        self._entries: Dict[str, Dict[Any, Any]] = {table: {} for table in tables}
+        self._versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {table: {'hits': 0, 'misses': 0, 'invalidations': 0} for table in self._entries}
+    
+    def get(self, table: str, key: Any, loader: Callable[[], Any]) -> Any:
+        """Cached value for key, calling loader() on a miss (loader errors are not cached)"""
+        self._ensure_fresh()
+        entries = self._entries[table]
+        stats = self.stats[table]
+        
+        if key in entries:
+            stats['hits'] += 1
+            value = entries[key]
+        else:
+            stats['misses'] += 1
+            value = loader()
+            entries[key] = value
+        
+        # Callers may mutate lists/dicts (e.g. preferences); keep the cached copy intact
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+    
+    def invalidate(self, table: Optional[str] = None, key: Any = None):
+        """Drop one key, one table, or everything"""
+        tables = [table] if table else list(self._entries)
+        for name in tables:
+            if key is None:
+                self._entries[name].clear()
+            else:
+                self._entries[name].pop(key, None)
+            self.stats[name]['invalidations'] += 1
+    
+    def _ensure_fresh(self):
+        """Drop tables changed by other connections (checked at most every check_interval)"""
+        now = time.time()
+        if now - self._checked_at < self.check_interval:
+            return
+        
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            try:
+                rows = self.connection_getter().execute(
+                    "SELECT name, version FROM table_versions"
+                ).fetchall()
+            except Exception:
+                rows = []
+            
+            for table, version in rows:
+                if table in self._entries and self._versions.get(table) != version:
+                    if table in self._versions:
+                        self.invalidate(table)
+                    self._versions[table] = version
+            self._checked_at = now
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hits, misses and hit ratio per table"""
+        result = {}
+        for table, stats in self.stats.items():
+            lookups = stats['hits'] + stats['misses']
+            result[table] = {
+                **stats,
+                'entries': len(self._entries[table]),
+                'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else 0.0
+            }
+        return result
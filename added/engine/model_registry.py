@@ -0,0 +1,189 @@
+import os
+import gc
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+def _load_whisper(name: str) -> Any:
+    import whisper
+    return whisper.load_model(name)
+
+def _load_vosk(path: str) -> Any:
+    from vosk import Model
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Vosk model not found: {path}")
+    return Model(path)
+
+class _Entry:
+    """One model slot: loaded at most once, shared by every holder"""
+    
+    def __init__(self):
+        self.model = None
+        self.error = None
+        self.refs = 0
+        self.last_used = time.time()
+        self.load_seconds = 0.0
+        self.loads = 0
+        self.lock = threading.Lock()
+
+class ModelRegistry:
+    """Process-wide cache of speech models (Whisper, Vosk)
+    
+    Each (kind, name) is loaded once, on first use or in a background
+    warm_up() thread, and shared by every module that asks for it. Holders
+    that keep a model for their lifetime (VoiceEngine) pair acquire() with
+    release(); short jobs (meeting transcription) use `with using(...)`.
+    A model nobody holds is unloaded after MODEL_IDLE_TIMEOUT seconds, so the
+    big meeting models do not stay resident between meetings.
+    """
+    
+    def __init__(self, idle_timeout: Optional[float] = None, check_interval: float = 30.0):
+        self.idle_timeout = idle_timeout if idle_timeout is not None else float(os.getenv('MODEL_IDLE_TIMEOUT', '600'))
+        self.check_interval = check_interval
+        self.loaders: Dict[str, Callable[[str], Any]] = {'whisper': _load_whisper, 'vosk': _load_vosk}
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self._janitor = None
+        self.stats = {'hits': 0, 'loads': 0, 'evictions': 0, 'load_errors': 0}
+    
+    def register_loader(self, kind: str, loader: Callable[[str], Any]):
+        """Add or replace the loader for a model kind"""
+        self.loaders[kind] = loader
+    
+    def _entry(self, kind: str, name: str) -> _Entry:
+        if kind not in self.loaders:
+            raise ValueError(f"Unknown model kind '{kind}'")
+        with self._lock:
+            entry = self._entries.get((kind, name))
+            if entry is None:
+                entry = self._entries[(kind, name)] = _Entry()
+            return entry
+    
+    def _load(self, kind: str, name: str, entry: _Entry) -> Any:
+        """Load under the entry lock, so concurrent callers wait for a single load"""
+        with entry.lock:
+            if entry.model is not None:
+                self.stats['hits'] += 1
+                return entry.model
+            print(f"🧠 Loading {kind} model: {name}")
+            start = time.time()
+            try:
+                entry.model = self.loaders[kind](name)
+            except Exception as e:
+                entry.error = e
+                self.stats['load_errors'] += 1
+                raise
+            entry.error = None
+            entry.last_used = time.time()
+            entry.load_seconds = entry.last_used - start
+            entry.loads += 1
+            self.stats['loads'] += 1
+            print(f"✅ {kind} model {name} loaded in {entry.load_seconds:.1f}s")
+            self._start_janitor()
+            return entry.model
+    
+    def acquire(self, kind: str, name: str) -> Any:
+        """Model for (kind, name), loading it if needed; call release() when done"""
+        entry = self._entry(kind, name)
+        with self._lock:
+            entry.refs += 1
+            entry.last_used = time.time()
+        try:
+            return self._load(kind, name, entry)
+        except Exception:
+            self.release(kind, name)
+            raise
+    
+    def release(self, kind: str, name: str):
+        """Drop one reference; the model becomes evictable once nobody holds it"""
+        entry = self._entry(kind, name)
+        with self._lock:
+            entry.refs = max(0, entry.refs - 1)
+            entry.last_used = time.time()
+    
+    @contextmanager
+    def using(self, kind: str, name: str) -> Iterator[Any]:
+        """Hold a model for the duration of a with-block"""
+        model = self.acquire(kind, name)
+        try:
+            yield model
+        finally:
+            self.release(kind, name)
+    
+    def warm_up(self, kind: str, name: str) -> threading.Thread:
+        """Load a model in the background so the first real use does not wait"""
+        def load():
+            try:
+                self._load(kind, name, self._entry(kind, name))
+            except Exception as e:
+                print(f"⚠️ {kind} model warm-up failed ({name}): {e}")
+        
+        thread = threading.Thread(target=load, name=f"warm-{kind}", daemon=True)
+        thread.start()
+        return thread
+    
+    def is_loaded(self, kind: str, name: str) -> bool:
+        entry = self._entries.get((kind, name))
+        return entry is not None and entry.model is not None
+    
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Unload models nobody holds that have been idle past the timeout"""
+        now = now or time.time()
+        evicted = 0
+        with self._lock:
+            idle = [(key, entry) for key, entry in self._entries.items()
+                    if entry.model is not None and entry.refs == 0
+                    and now - entry.last_used >= self.idle_timeout]
+        for (kind, name), entry in idle:
+            with entry.lock:
+                # Re-check: someone may have acquired it meanwhile
+                if entry.refs == 0 and entry.model is not None and now - entry.last_used >= self.idle_timeout:
+                    entry.model = None
+                    evicted += 1
+                    self.stats['evictions'] += 1
+                    print(f"🧹 Unloaded idle {kind} model: {name}")
+        if evicted:
+            gc.collect()
+        return evicted
+    
+    def _start_janitor(self):
+        with self._lock:
+            if self._janitor is not None or self.idle_timeout <= 0:
+                return
+            self._janitor = threading.Thread(target=self._janitor_loop, name="model-janitor", daemon=True)
+            self._janitor.start()
+    
+    def _janitor_loop(self):
+        while True:
+            time.sleep(min(self.check_interval, self.idle_timeout))
+            try:
+                self.evict_idle()
+            except Exception as e:
+                print(f"Model eviction error: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Loaded models, reference counts and load/eviction counters"""
+        with self._lock:
+            models = {
+                f"{kind}:{name}": {
+                    'loaded': entry.model is not None,
+                    'refs': entry.refs,
+                    'idle_seconds': round(time.time() - entry.last_used, 1),
+                    'load_seconds': round(entry.load_seconds, 2),
+                    'loads': entry.loads
+                }
+                for (kind, name), entry in self._entries.items()
+            }
+        return {**self.stats, 'idle_timeout': self.idle_timeout, 'models': models}
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide model registry (created on first use)"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = ModelRegistry()
+        return _shared_registry
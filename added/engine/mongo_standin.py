@@ -0,0 +1,237 @@
+import os
+import time
+import bisect
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+from bson import ObjectId
+
+class MemoryMongoClient:
+    """In-process stand-in for pymongo.MongoClient
+    
+    Implements the subset of the pymongo API the assistant uses (client[db][collection],
+    insert_one/insert_many, find with sort/limit/skip, find_one, count_documents,
+    delete_many) so the MongoDB code path can be tested and benchmarked without a
+    server. Documents live in memory in _id order, so newest-first reads and
+    {'_id': {'$lt': ...}} cursors cost the same as on an indexed collection.
+    latency_ms adds a simulated network round trip per operation.
+    """
+    
+    def __init__(self, url: Optional[str] = None, latency_ms: Optional[float] = None, **kwargs):
+        self.url = url or 'memory://'
+        self.latency = (latency_ms if latency_ms is not None else
+                        float(os.getenv('MONGO_STANDIN_LATENCY_MS', '0'))) / 1000.0
+        self._databases: Dict[str, "MemoryDatabase"] = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, name: str) -> "MemoryDatabase":
+        with self._lock:
+            if name not in self._databases:
+                self._databases[name] = MemoryDatabase(self, name)
+            return self._databases[name]
+    
+    def get_database(self, name: str) -> "MemoryDatabase":
+        return self[name]
+    
+    def list_database_names(self) -> List[str]:
+        return list(self._databases)
+    
+    def server_info(self) -> Dict[str, Any]:
+        self._round_trip()
+        return {'version': 'memory', 'ok': 1.0}
+    
+    def _round_trip(self):
+        """Simulated network latency"""
+        if self.latency:
+            time.sleep(self.latency)
+    
+    def close(self):
+        pass
+
+class MemoryDatabase:
+    """A named group of in-memory collections"""
+    
+    def __init__(self, client: MemoryMongoClient, name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, "MemoryCollection"] = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, name: str) -> "MemoryCollection":
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(self.client, name)
+            return self._collections[name]
+    
+    def __getattr__(self, name: str) -> "MemoryCollection":
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+    
+    def list_collection_names(self) -> List[str]:
+        return list(self._collections)
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Equality and $lt/$lte/$gt/$gte/$ne/$in on top-level fields"""
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict) and any(key.startswith('$') for key in condition):
+            for operator, operand in condition.items():
+                try:
+                    if operator == '$lt' and not (value is not None and value < operand):
+                        return False
+                    if operator == '$lte' and not (value is not None and value <= operand):
+                        return False
+                    if operator == '$gt' and not (value is not None and value > operand):
+                        return False
+                    if operator == '$gte' and not (value is not None and value >= operand):
+                        return False
+                except TypeError:
+                    return False
+                if operator == '$ne' and value == operand:
+                    return False
+                if operator == '$in' and value not in operand:
+                    return False
+                if operator not in ('$lt', '$lte', '$gt', '$gte', '$ne', '$in'):
+                    raise NotImplementedError(f"Unsupported query operator: {operator}")
+        elif value != condition:
+            return False
+    return True
+
+class MemoryCollection:
+    """Documents kept in ascending _id order"""
+    
+    def __init__(self, client: MemoryMongoClient, name: str):
+        self.client = client
+        self.name = name
+        self._documents: List[Dict[str, Any]] = []
+        self._ids: List[ObjectId] = []
+        self._lock = threading.Lock()
+    
+    def _store(self, document: Dict[str, Any]) -> ObjectId:
+        """Assign an _id (in place, like pymongo) and keep the _id order (lock held)"""
+        if '_id' not in document:
+            document['_id'] = ObjectId()
+        stored = dict(document)
+        position = bisect.bisect_right(self._ids, stored['_id'])
+        self._ids.insert(position, stored['_id'])
+        self._documents.insert(position, stored)
+        return stored['_id']
+    
+    def insert_one(self, document: Dict[str, Any]) -> SimpleNamespace:
+        self.client._round_trip()
+        with self._lock:
+            return SimpleNamespace(inserted_id=self._store(document), acknowledged=True)
+    
+    def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True) -> SimpleNamespace:
+        self.client._round_trip()
+        with self._lock:
+            return SimpleNamespace(inserted_ids=[self._store(document) for document in documents],
+                                   acknowledged=True)
+    
+    def find(self, query: Optional[Dict[str, Any]] = None,
+             projection: Optional[Dict[str, Any]] = None) -> "MemoryCursor":
+        return MemoryCursor(self, query or {}, projection)
+    
+    def find_one(self, query: Optional[Dict[str, Any]] = None,
+                 projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return next(iter(self.find(query, projection).limit(1)), None)
+    
+    def count_documents(self, query: Dict[str, Any]) -> int:
+        self.client._round_trip()
+        with self._lock:
+            if not query:
+                return len(self._documents)
+            return sum(1 for document in self._documents if _matches(document, query))
+    
+    def delete_many(self, query: Dict[str, Any]) -> SimpleNamespace:
+        self.client._round_trip()
+        with self._lock:
+            kept = [document for document in self._documents if not _matches(document, query)]
+            deleted = len(self._documents) - len(kept)
+            self._documents = kept
+            self._ids = [document['_id'] for document in kept]
+        return SimpleNamespace(deleted_count=deleted, acknowledged=True)
+    
+    def create_index(self, keys: Any, **kwargs) -> str:
+        # Reads by _id are already ordered; other indexes are not needed in memory
+        return kwargs.get('name') or str(keys)
+
+class MemoryCursor:
+    """Lazily evaluated find() with sort/skip/limit"""
+    
+    def __init__(self, collection: MemoryCollection, query: Dict[str, Any],
+                 projection: Optional[Dict[str, Any]]):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+    
+    def sort(self, key: Any, direction: int = 1) -> "MemoryCursor":
+        if isinstance(key, list):
+            key, direction = key[0]
+        self._sort = (key, direction)
+        return self
+    
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+    
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+    
+    def _project(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.projection:
+            return dict(document)
+        included = {field for field, flag in self.projection.items() if flag}
+        if included:
+            result = {field: document[field] for field in included if field in document}
+            if self.projection.get('_id', 1) and '_id' in document:
+                result['_id'] = document['_id']
+            return result
+        return {field: value for field, value in document.items() if self.projection.get(field, 1)}
+    
+    def _candidates(self) -> Iterator[Dict[str, Any]]:
+        """Documents in the requested order, narrowed by _id range where possible (lock held)"""
+        documents = self.collection._documents
+        ids = self.collection._ids
+        low, high = 0, len(documents)
+        
+        id_condition = self.query.get('_id')
+        if isinstance(id_condition, dict):
+            if '$lt' in id_condition:
+                high = bisect.bisect_left(ids, id_condition['$lt'])
+            if '$lte' in id_condition:
+                high = bisect.bisect_right(ids, id_condition['$lte'])
+            if '$gt' in id_condition:
+                low = bisect.bisect_right(ids, id_condition['$gt'])
+            if '$gte' in id_condition:
+                low = bisect.bisect_left(ids, id_condition['$gte'])
+        
+        if self._sort is None or self._sort[0] == '_id':
+            positions = range(high - 1, low - 1, -1) if self._sort and self._sort[1] < 0 else range(low, high)
+            return (documents[i] for i in positions)
+        
+        key, direction = self._sort
+        selected = documents[low:high]
+        return iter(sorted(selected, key=lambda document: (document.get(key) is None, document.get(key)),
+                           reverse=direction < 0))
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.collection.client._round_trip()
+        results = []
+        skipped = 0
+        with self.collection._lock:
+            for document in self._candidates():
+                if self.query and not _matches(document, self.query):
+                    continue
+                if skipped < self._skip:
+                    skipped += 1
+                    continue
+                results.append(self._project(document))
+                if self._limit and len(results) >= self._limit:
+                    break
+        return iter(results)
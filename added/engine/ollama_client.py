@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Dict, List, Optional, Any, AsyncIterator
+from dotenv import load_dotenv
+from .ai_transport import BackendPool
+
+load_dotenv()
+
+class OllamaClient:
+    """Async client for the local Ollama server over a pooled keep-alive session"""
+    
+    def __init__(self, pool: BackendPool, base_url: Optional[str] = None,
+                 model: Optional[str] = None):
+        self.pool = pool
+        self.base_url = (base_url or os.getenv('OLLAMA_URL', 'http://localhost:11434')).rstrip('/')
+        self.model = model or os.getenv('OLLAMA_MODEL', 'llama2:7b-chat')
+        
+        # Keep the model resident between calls so prefix state is not thrown away
+        self.keep_alive = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+        
+        # Evaluated static prompt prefixes: (model, prefix hash) -> context tokens + cost
+        self._prefixes: Dict[tuple, Dict[str, Any]] = {}
+        self._prefix_lock = threading.Lock()
+        self.prefix_stats = {'primes': 0, 'reuses': 0, 'prompt_eval_saved_ms': 0.0}
+    
+    async def generate(self, prompt: str, model: Optional[str] = None,
+                       options: Optional[Dict[str, Any]] = None,
+                       timeout: float = 30, **extra) -> Optional[Dict[str, Any]]:
+        """Run a non-streaming /api/generate call and return the decoded JSON"""
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": False
+        }
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        
+        response = await self.pool.post_json(
+            f"{self.base_url}/api/generate",
+            payload,
+            timeout=timeout
+        )
+        
+        if response.status_code == 200:
+            return response.json()
+        
+        print(f"Ollama API error: {response.status_code}")
+        return None
+    
+    async def generate_with_prefix(self, prefix: str, prompt: str, model: Optional[str] = None,
+                                   options: Optional[Dict[str, Any]] = None,
+                                   timeout: float = 30) -> Optional[Dict[str, Any]]:
+        """Generate with a static prefix evaluated once and reused through its context
+        
+        The first call for a prefix sends it on its own and keeps the returned
+        context (its evaluated tokens). Later calls send only the new prompt plus
+        that context, so the model skips re-processing the prefix. The returned
+        dict carries prompt_eval_saved_ms, measured per call (see _prompt_eval_saved_ms).
+        """
+        model = model or self.model
+        key = (model, hashlib.sha1(prefix.encode('utf-8')).hexdigest())
+        
+        with self._prefix_lock:
+            entry = self._prefixes.get(key)
+        
+        if entry is None:
+            entry = await self._prime_prefix(key, prefix, model, timeout)
+            if entry is None:
+                # Priming failed - fall back to sending the whole prompt
+                return await self.generate(f"{prefix}\n\n{prompt}", model=model,
+                                           options=options, timeout=timeout,
+                                           keep_alive=self.keep_alive)
+        
+        result = await self.generate(prompt, model=model, options=options, timeout=timeout,
+                                     context=entry['context'], keep_alive=self.keep_alive)
+        if result is None:
+            return None
+        
+        saved_ms = self._prompt_eval_saved_ms(entry, result)
+        with self._prefix_lock:
+            entry['uses'] += 1
+            self.prefix_stats['reuses'] += 1
+            self.prefix_stats['prompt_eval_saved_ms'] += saved_ms
+        
+        result['prefix_reused'] = True
+        result['prompt_eval_ms'] = result.get('prompt_eval_duration', 0) / 1e6
+        result['prompt_eval_saved_ms'] = saved_ms
+        return result
+    
+    @staticmethod
+    def _prompt_eval_saved_ms(entry: Dict[str, Any], result: Dict[str, Any]) -> float:
+        """Prompt-eval time this call saved over sending prefix + prompt in one go
+        
+        The new prompt's length is read off the returned context (its tokens
+        beyond the primed context, minus the generated ones). Sending prefix and
+        prompt together would cost the prefix's measured per-token rate over both;
+        what this call actually spent evaluating is subtracted from that, so a
+        call where Ollama re-evaluated the prefix anyway saves nothing.
+        """
+        context = result.get('context')
+        evaluated_ms = result.get('prompt_eval_duration', 0) / 1e6
+        if not context or not entry['prefix_tokens'] or 'eval_count' not in result:
+            return 0.0
+        prompt_tokens = max(0, len(context) - len(entry['context']) - result['eval_count'])
+        ms_per_token = entry['prefix_eval_ms'] / entry['prefix_tokens']
+        full_prompt_ms = ms_per_token * (entry['prefix_tokens'] + prompt_tokens)
+        return max(0.0, full_prompt_ms - evaluated_ms)
+    
+    async def _prime_prefix(self, key: tuple, prefix: str, model: str,
+                            timeout: float) -> Optional[Dict[str, Any]]:
+        """Evaluate a prefix once and remember its context and cost"""
+        try:
+            start_time = time.time()
+            result = await self.generate(
+                prefix,
+                model=model,
+                options={"num_predict": 1},
+                timeout=timeout,
+                keep_alive=self.keep_alive
+            )
+            if not result or not result.get('context'):
+                return None
+            
+            entry = {
+                'context': result['context'],
+                'prefix_tokens': result.get('prompt_eval_count', 0),
+                'prefix_eval_ms': result.get('prompt_eval_duration', 0) / 1e6,
+                'primed_in': time.time() - start_time,
+                'uses': 0
+            }
+            with self._prefix_lock:
+                self._prefixes[key] = entry
+                self.prefix_stats['primes'] += 1
+            
+            print(f"🧩 Ollama prefix cached: {entry['prefix_tokens']} tokens, "
+                  f"{entry['prefix_eval_ms']:.0f} ms to evaluate")
+            return entry
+            
+        except Exception as e:
+            print(f"Ollama prefix priming error: {e}")
+            return None
+    
+    def forget_prefixes(self):
+        """Drop cached prefix contexts (e.g. after switching models)"""
+        with self._prefix_lock:
+            self._prefixes.clear()
+    
+    def get_prefix_stats(self) -> Dict[str, Any]:
+        """Prefix reuse counters and total prompt-eval time saved"""
+        with self._prefix_lock:
+            stats = dict(self.prefix_stats)
+            stats['cached_prefixes'] = len(self._prefixes)
+        return stats
+    
+    async def stream_generate(self, prompt: str, model: Optional[str] = None,
+                              options: Optional[Dict[str, Any]] = None,
+                              timeout: float = 30, **extra) -> AsyncIterator[Dict[str, Any]]:
+        """Run a streaming /api/generate call and yield each JSON chunk as it arrives"""
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": True
+        }
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:
+                # Event loop already closed - consumer is gone
+                stop.set()
+        
+        def produce():
+            # Runs on a backend worker thread and feeds the event loop line by line
+            try:
+                with self.pool.session.post(f"{self.base_url}/api/generate", json=payload,
+                                            stream=True, timeout=timeout) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"Ollama API error: {response.status_code}")
+                    for line in response.iter_lines():
+                        if stop.is_set():
+                            break
+                        if line:
+                            put(json.loads(line))
+            except Exception as e:
+                put(e)
+            finally:
+                put(finished)
+        
+        producer = asyncio.ensure_future(self.pool.run(produce))
+        try:
+            while True:
+                item = await chunks.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+                if item.get('done'):
+                    break
+        finally:
+            # Closing the generator early stops the worker at the next line
+            stop.set()
+            if producer.done():
+                producer.result()
+    
+    async def list_models(self, timeout: float = 5) -> List[str]:
+        """List locally installed models via /api/tags"""
+        response = await self.pool.get(f"{self.base_url}/api/tags", timeout=timeout)
+        if response.status_code != 200:
+            return []
+        return [model.get('name', '') for model in response.json().get('models', [])]
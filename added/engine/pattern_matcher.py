@@ -0,0 +1,94 @@
+import re
+from typing import Dict, List, Optional, Tuple, FrozenSet
+
+try:
+    import re._parser as sre_parse
+    from re._constants import LITERAL, BRANCH, SUBPATTERN
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import LITERAL, BRANCH, SUBPATTERN
+
+class PatternMatcher:
+    """Keyword-prefiltered dispatch table over prioritized intent regexes
+    
+    Every pattern is compiled once. From each pattern we also derive the literal
+    words any match must start with (e.g. open/launch/start for
+    (?:open|launch|start)\\s+(.+)). A command is checked for those keywords
+    once, and only patterns whose keywords occur are searched, in the original
+    priority order - so the result is identical to calling re.search on every
+    pattern in turn, at a fraction of the cost.
+    """
+    
+    def __init__(self, patterns: Dict[str, List[str]], flags: int = re.IGNORECASE):
+        self.patterns = patterns
+        self.flags = flags
+        self._table: List[Tuple[str, "re.Pattern", Optional[FrozenSet[str]]]] = []
+        self._keywords: Tuple[str, ...] = ()
+        self.compile()
+    
+    def compile(self):
+        """(Re)build the dispatch table; call again after changing the patterns"""
+        self._table = []
+        keywords = set()
+        
+        for intent, intent_patterns in self.patterns.items():
+            for pattern in intent_patterns:
+                compiled = re.compile(pattern, self.flags)
+                prefixes = self._leading_literals(pattern)
+                self._table.append((intent, compiled, prefixes))
+                if prefixes:
+                    keywords.update(prefixes)
+        
+        self._keywords = tuple(sorted(keywords))
+    
+    def _leading_literals(self, pattern: str) -> Optional[FrozenSet[str]]:
+        """Literal strings one of which every match must start with (None if unknown)"""
+        try:
+            prefixes = self._prefixes_of(list(sre_parse.parse(pattern, self.flags)))
+        except Exception:
+            return None
+        if not prefixes or not all(prefix and prefix.isascii() for prefix in prefixes):
+            return None
+        return frozenset(prefix.lower() for prefix in prefixes)
+    
+    def _prefixes_of(self, items: list) -> Optional[set]:
+        """Leading literal prefixes of a parsed regex sequence"""
+        if not items:
+            return None
+        
+        op, value = items[0]
+        if op == LITERAL:
+            literal = ''
+            for item_op, item_value in items:
+                if item_op != LITERAL:
+                    break
+                literal += chr(item_value)
+            return {literal}
+        
+        if op == BRANCH:
+            prefixes = set()
+            for branch in value[1]:
+                branch_prefixes = self._prefixes_of(list(branch))
+                if not branch_prefixes:
+                    return None
+                prefixes.update(branch_prefixes)
+            return prefixes
+        
+        if op == SUBPATTERN:
+            return self._prefixes_of(list(value[-1]))
+        
+        return None
+    
+    def match(self, command: str) -> Optional[Tuple[str, str, tuple]]:
+        """Return (intent, matched text, pattern groups) for the first matching pattern"""
+        lowered = command.lower()
+        present = {keyword for keyword in self._keywords if keyword in lowered}
+        
+        for intent, compiled, prefixes in self._table:
+            if prefixes is not None and prefixes.isdisjoint(present):
+                continue
+            match = compiled.search(command)
+            if match:
+                return intent, match.group(0), match.groups()
+        
+        return None
@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Seconds a response stays valid per query type (0 = never cached).
+# Override with AI_CACHE_TTL_<TYPE>, e.g. AI_CACHE_TTL_GENERAL=600
+DEFAULT_TTLS = {
+    'general': 6 * 3600,
+    'content': 24 * 3600,
+    'code': 24 * 3600,
+    'classification': 7 * 24 * 3600,
+    'realtime': 0
+}
+
+class ResponseCache:
+    """Two-tier (in-memory LRU + SQLite) cache for AI responses with per-type TTLs
+    
+    The LRU tier is served on the caller's thread. All SQLite work runs on one
+    dedicated disk thread, so the event loop never waits on the file: aget()
+    awaits disk lookups there, and put() hands the disk write over without
+    waiting (write-behind). Being a single FIFO thread, a lookup always sees
+    the writes queued before it.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None):
+        self.db_path = db_path or os.getenv('AI_CACHE_PATH', 'ai_cache.db')
+        self.max_entries = max_entries or int(os.getenv('AI_CACHE_SIZE', '512'))
+        
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        for query_type in list(self.ttls):
+            env_value = os.getenv(f"AI_CACHE_TTL_{query_type.upper()}")
+            if env_value and env_value.isdigit():
+                self.ttls[query_type] = int(env_value)
+        
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'expired': 0}
+        
+        self.conn = None
+        self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-cache-disk')
+        self._disk.submit(self._initialize_disk_tier)
+    
+    def _initialize_disk_tier(self):
+        """Open the SQLite tier and drop expired rows"""
+        try:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    query_type TEXT,
+                    value TEXT,
+                    created_at REAL,
+                    expires_at REAL
+                )
+            ''')
+            self.conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+            self.conn.commit()
+        except Exception as e:
+            print(f"⚠️ Response cache disk tier unavailable: {e}")
+            self.conn = None
+    
+    def ttl_for(self, query_type: str) -> int:
+        """TTL in seconds for a query type (unknown types use the general TTL)"""
+        return self.ttls.get(query_type, self.ttls.get('general', 0))
+    
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Collapse whitespace and case so trivially different prompts share an entry"""
+        return re.sub(r'\s+', ' ', prompt).strip().casefold()
+    
+    @classmethod
+    def make_key(cls, prompt: str, query_type: str, model: str,
+                 options: Optional[Dict[str, Any]] = None) -> str:
+        """Build a stable key from the normalized (prompt, query_type, model, options) tuple"""
+        raw = json.dumps(
+            [cls.normalize_prompt(prompt), query_type, model, options or {}],
+            sort_keys=True
+        )
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response without blocking the event loop on the disk tier"""
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._disk, self._get_disk, key)
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response, checking memory before disk (blocks on the disk tier)"""
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        return self._disk.submit(self._get_disk, key).result()
+    
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        """LRU tier lookup"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return dict(value)
+                del self._memory[key]
+                self.stats['expired'] += 1
+        return None
+    
+    def _get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """SQLite tier lookup (disk thread only)"""
+        if self.conn is not None:
+            try:
+                row = self.conn.execute(
+                    "SELECT value, expires_at FROM response_cache WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row and row[1] > time.time():
+                    value = json.loads(row[0])
+                    with self._lock:
+                        self._remember(key, row[1], value)
+                        self.stats['disk_hits'] += 1
+                    return dict(value)
+                if row:
+                    self.conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                    self.conn.commit()
+                    with self._lock:
+                        self.stats['expired'] += 1
+            except Exception as e:
+                print(f"Response cache read error: {e}")
+        
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+    
+    def put(self, key: str, query_type: str, value: Dict[str, Any]) -> bool:
+        """Store a response in memory now and on disk in the background (no-op for uncached types)"""
+        ttl = self.ttl_for(query_type)
+        if ttl <= 0:
+            return False
+        
+        now = time.time()
+        expires_at = now + ttl
+        
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self.stats['stores'] += 1
+        self._disk.submit(self._put_disk, key, query_type, json.dumps(value), now, expires_at)
+        return True
+    
+    def _put_disk(self, key: str, query_type: str, value: str, created_at: float, expires_at: float):
+        """SQLite tier write (disk thread only)"""
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, query_type, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, query_type, value, created_at, expires_at)
+            )
+            self.conn.commit()
+        except Exception as e:
+            print(f"Response cache write error: {e}")
+    
+    def _remember(self, key: str, expires_at: float, value: Dict[str, Any]):
+        """Insert into the LRU tier, evicting the least recently used entry (lock held)"""
+        self._memory[key] = (expires_at, dict(value))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._memory.clear()
+        self._disk.submit(self._clear_disk).result()
+    
+    def _clear_disk(self):
+        if self.conn is not None:
+            self.conn.execute("DELETE FROM response_cache")
+            self.conn.commit()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_ratio'] = hits / lookups if lookups else 0.0
+        return stats
+    
+    def close(self):
+        """Finish queued disk writes and close the SQLite tier"""
+        self._disk.submit(self._close_disk)
+        self._disk.shutdown(wait=True)
+    
+    def _close_disk(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
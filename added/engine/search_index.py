@@ -0,0 +1,326 @@
+import os
+import re
+import glob
+import json
+import fnmatch
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .sqlite_pool import SQLitePool
+
+# Artifact files written by the assistant, by kind
+ARTIFACT_PATTERNS = [
+    ('transcript', '*_transcript.txt'),
+    ('summary', '*_summary.txt'),
+    ('email_digest', 'jarvis_email_digest_*.txt'),
+    ('email_draft', 'email_draft_*.txt')
+]
+
+# Words per indexed passage (long transcripts are split so snippets stay local)
+CHUNK_WORDS = 80
+
+SEARCH_STOPWORDS = {
+    'jarvis', 'what', 'did', 'we', 'i', 'you', 'they', 'he', 'she', 'about', 'the', 'a', 'an', 'of',
+    'to', 'in', 'on', 'for', 'and', 'or', 'is', 'was', 'were', 'are', 'be', 'do', 'does', 'that',
+    'this', 'it', 'me', 'my', 'our', 'us', 'say', 'said', 'tell', 'find', 'search', 'remember',
+    'when', 'where', 'who', 'how', 'any', 'there', 'anything', 'something', 'with', 'from', 'at',
+    'week', 'month', 'today', 'yesterday', 'last', 'past', 'ago', 'days', 'day', 'this', 'can',
+    'could', 'please', 'history', 'conversation', 'conversations', 'talk', 'talked', 'mention',
+    'mentioned', 'meeting', 'meetings', 'email', 'emails', 'chat', 'chats'
+}
+
+def parse_time_window(text: str, now: Optional[datetime] = None) -> Tuple[Optional[float], Optional[float]]:
+    """(since, until) epoch seconds for relative phrases like "last week" or "3 days ago" """
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    lowered = text.lower()
+    
+    match = re.search(r'\b(\d+|a|one|two|three|four|five|six|seven)\s+(day|week)s?\s+ago\b', lowered)
+    if match:
+        numbers = {'a': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7}
+        count = int(numbers.get(match.group(1), match.group(1) if match.group(1).isdigit() else 1))
+        days = count * (7 if match.group(2) == 'week' else 1)
+        center = today - timedelta(days=days)
+        slack = timedelta(days=1 if match.group(2) == 'day' else 4)
+        return (center - slack).timestamp(), (center + slack + timedelta(days=1)).timestamp()
+    
+    match = re.search(r'\b(?:past|last)\s+(\d+)\s+days\b', lowered)
+    if match:
+        return (today - timedelta(days=int(match.group(1)))).timestamp(), None
+    
+    if 'yesterday' in lowered:
+        return (today - timedelta(days=1)).timestamp(), today.timestamp()
+    if 'today' in lowered or 'this morning' in lowered:
+        return today.timestamp(), None
+    if re.search(r'\bthis week\b', lowered):
+        return (today - timedelta(days=today.weekday())).timestamp(), None
+    if re.search(r'\b(?:last|past|previous)\s+week\b', lowered):
+        # From the start of last week until now, so "last week" also covers the last few days
+        return (today - timedelta(days=today.weekday() + 7)).timestamp(), None
+    if re.search(r'\bthis month\b', lowered):
+        return today.replace(day=1).timestamp(), None
+    if re.search(r'\b(?:last|past|previous)\s+month\b', lowered):
+        first_of_month = today.replace(day=1)
+        return (first_of_month - timedelta(days=1)).replace(day=1).timestamp(), None
+    
+    return None, None
+
+def _timestamp(value: Any, assume_utc: bool = False) -> float:
+    """Epoch seconds from a datetime, ISO string or number (now if unknown)"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return time.time()
+    if isinstance(value, datetime):
+        # Chat records are stamped with naive datetime.utcnow()
+        if assume_utc and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return time.time()
+
+class SearchIndex:
+    """Local SQLite FTS5 index over chat turns and assistant artifacts
+    
+    Chat turns are added as they are persisted; transcripts, summaries,
+    email digests and drafts are indexed when written (or picked up by
+    scan_directory, which only re-reads files whose size or mtime changed).
+    Transcripts with Vosk word timings are split into passages that keep
+    their start/end offsets. search() takes a spoken question, turns
+    phrases like "last week" into a date filter and returns bm25-ranked
+    snippets.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('SEARCH_INDEX_PATH', 'jarvis_search.db')
+        self.pool = SQLitePool(self.path)
+        self.stats = {'documents': 0, 'passages': 0, 'files_skipped': 0, 'searches': 0}
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Create the FTS5 table and the file bookkeeping table"""
+        conn = self.pool.connection()
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                body, title,
+                kind UNINDEXED, source UNINDEXED, created_at UNINDEXED,
+                start_time UNINDEXED, end_time UNINDEXED,
+                tokenize = 'porter unicode61'
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_sources (
+                source TEXT PRIMARY KEY,
+                kind TEXT,
+                mtime_ns INTEGER,
+                size INTEGER,
+                indexed_at REAL
+            )
+        ''')
+        conn.commit()
+    
+    # Ingestion
+    def add_document(self, kind: str, source: str, text: str, title: Optional[str] = None,
+                     created_at: Any = None, words: Optional[List[Dict[str, Any]]] = None,
+                     replace: bool = True) -> int:
+        """Index one document (replacing earlier passages from the same source); returns passages"""
+        created = _timestamp(created_at)
+        title = title or os.path.basename(source)
+        passages = list(self._passages(text, words))
+        
+        conn = self.pool.connection()
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM search_fts WHERE source = ?", (source,))
+            conn.executemany(
+                "INSERT INTO search_fts (body, title, kind, source, created_at, start_time, end_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(body, title, kind, source, created, start, end) for body, start, end in passages]
+            )
+        
+        self.stats['documents'] += 1
+        self.stats['passages'] += len(passages)
+        return len(passages)
+    
+    @staticmethod
+    def _passages(text: str, words: Optional[List[Dict[str, Any]]] = None) -> Iterable[Tuple[str, Optional[float], Optional[float]]]:
+        """Split a document into (body, start_seconds, end_seconds) passages"""
+        if words:
+            for i in range(0, len(words), CHUNK_WORDS):
+                chunk = words[i:i + CHUNK_WORDS]
+                yield (' '.join(word.get('word', '') for word in chunk),
+                       chunk[0].get('start'), chunk[-1].get('end'))
+            return
+        
+        tokens = (text or '').split()
+        if len(tokens) <= CHUNK_WORDS:
+            if tokens:
+                yield text.strip(), None, None
+            return
+        for i in range(0, len(tokens), CHUNK_WORDS):
+            yield ' '.join(tokens[i:i + CHUNK_WORDS]), None, None
+    
+    def add_chat_turns(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Index chat records ({'user_input', 'response', 'timestamp'}) as one passage each"""
+        rows = []
+        for record in records:
+            user_input = record.get('user_input') or ''
+            response = record.get('response') or ''
+            if not user_input and not response:
+                continue
+            created = _timestamp(record.get('timestamp'), assume_utc=True)
+            rows.append((f"{user_input}\n{response}", user_input[:80], 'chat', 'chat', created, None, None))
+        
+        if rows:
+            conn = self.pool.connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO search_fts (body, title, kind, source, created_at, start_time, end_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+            self.stats['passages'] += len(rows)
+        return len(rows)
+    
+    @staticmethod
+    def kind_for(path: str) -> Optional[str]:
+        """Artifact kind of a file name (None if it is not an indexed artifact)"""
+        name = os.path.basename(path)
+        for kind, pattern in ARTIFACT_PATTERNS:
+            if fnmatch.fnmatch(name, pattern):
+                return kind
+        return None
+    
+    def index_file(self, path: str, kind: Optional[str] = None) -> bool:
+        """(Re)index an artifact file if it changed since it was last indexed"""
+        kind = kind or self.kind_for(path)
+        if not kind:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        
+        source = os.path.abspath(path)
+        conn = self.pool.connection()
+        row = conn.execute(
+            "SELECT mtime_ns, size FROM search_sources WHERE source = ?", (source,)
+        ).fetchone()
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            self.stats['files_skipped'] += 1
+            return False
+        
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        
+        # Word timings saved next to a transcript by the Vosk transcriber
+        words = None
+        if kind == 'transcript':
+            words_path = path[:-len('_transcript.txt')] + '_words.json'
+            try:
+                with open(words_path, 'r', encoding='utf-8') as f:
+                    words = json.load(f)
+            except (OSError, ValueError):
+                words = None
+        
+        self.add_document(kind, source, text, created_at=stat.st_mtime, words=words)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_sources (source, kind, mtime_ns, size, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source, kind, stat.st_mtime_ns, stat.st_size, time.time())
+            )
+        return True
+    
+    def scan_directory(self, directory: str = '.') -> int:
+        """Index new or changed artifact files in a directory; returns files indexed"""
+        indexed = 0
+        for kind, pattern in ARTIFACT_PATTERNS:
+            for path in glob.glob(os.path.join(directory, pattern)):
+                try:
+                    if self.index_file(path, kind):
+                        indexed += 1
+                except Exception as e:
+                    print(f"⚠️ Could not index {path}: {e}")
+        return indexed
+    
+    # Searching
+    @staticmethod
+    def build_match(query: str) -> Optional[str]:
+        """FTS5 MATCH expression (OR of prefix terms) for a natural-language question"""
+        terms = []
+        for word in re.findall(r'\w+', query.lower()):
+            if word in SEARCH_STOPWORDS or len(word) < 2 or word.isdigit():
+                continue
+            if word not in terms:
+                terms.append(word)
+        if not terms:
+            return None
+        return ' OR '.join(f'"{term}"*' for term in terms)
+    
+    def search(self, query: str, limit: int = 5, kinds: Optional[Iterable[str]] = None,
+               since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Ranked snippets for a spoken question ("what did we decide about the deadline last week")"""
+        self.stats['searches'] += 1
+        match = self.build_match(query)
+        if not match:
+            return []
+        
+        if since is None and until is None:
+            since, until = parse_time_window(query)
+        
+        sql = ("SELECT kind, source, title, created_at, start_time, end_time, "
+               "snippet(search_fts, 0, '[', ']', '…', 16), bm25(search_fts, 1.0, 0.5) AS score "
+               "FROM search_fts WHERE search_fts MATCH ?")
+        params: List[Any] = [match]
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND created_at < ?"
+            params.append(until)
+        kinds = list(kinds or [])
+        if kinds:
+            sql += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        
+        results = []
+        for kind, source, title, created_at, start, end, snippet, score in \
+                self.pool.connection().execute(sql, params):
+            results.append({
+                'kind': kind,
+                'source': source,
+                'title': title,
+                'snippet': snippet,
+                'score': round(-score, 3),
+                'created_at': datetime.fromtimestamp(created_at).isoformat(timespec='seconds'),
+                'start_time': start,
+                'end_time': end
+            })
+        return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Ingestion and search counters"""
+        stats = dict(self.stats)
+        try:
+            stats['indexed_passages'] = self.pool.connection().execute(
+                "SELECT COUNT(*) FROM search_fts"
+            ).fetchone()[0]
+        except Exception:
+            pass
+        return stats
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+def get_search_index() -> SearchIndex:
+    """Process-wide search index (created on first use)"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = SearchIndex()
+        return _shared_index
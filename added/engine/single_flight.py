@@ -0,0 +1,67 @@
+import copy
+import asyncio
+import threading
+import concurrent.futures
+from typing import Dict, Any, Callable, Awaitable
+
+class SingleFlight:
+    """Collapses concurrent identical requests into one shared in-flight call
+    
+    Uses thread-safe futures so callers on different event loops (Eel threads,
+    the Socket.IO server, the voice loop) can share the same backend call.
+    The call runs as its own task, so cancelling any one caller (the one that
+    started it included) leaves it running for the others. Callers that
+    joined get a shallow copy of the result and may modify it.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self.stats = {'calls': 0, 'executed': 0, 'collapsed': 0}
+    
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> tuple:
+        """Run call() once per key at a time; returns (result, shared)"""
+        with self._lock:
+            self.stats['calls'] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._in_flight[key] = future
+                self.stats['executed'] += 1
+            else:
+                self.stats['collapsed'] += 1
+        
+        if not leader:
+            # Shielded: a cancelled follower must not cancel the shared future
+            result = await asyncio.shield(asyncio.wrap_future(future))
+            return copy.copy(result), True
+        
+        try:
+            task = asyncio.ensure_future(call())
+        except BaseException as e:
+            self._settle(key, future, e)
+            raise
+        task.add_done_callback(lambda done: self._settle(key, future, done))
+        return await asyncio.shield(task), False
+    
+    def _settle(self, key: str, future: concurrent.futures.Future, outcome: Any):
+        """Hand the finished call's result (or error) to every follower"""
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if isinstance(outcome, BaseException):
+            future.set_exception(outcome)
+        elif outcome.cancelled():
+            future.cancel()
+        elif outcome.exception() is not None:
+            future.set_exception(outcome.exception())
+        else:
+            future.set_result(outcome.result())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """How many calls ran and how many were collapsed onto an in-flight one"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._in_flight)
+        stats['collapse_ratio'] = stats['collapsed'] / stats['calls'] if stats['calls'] else 0.0
+        return stats
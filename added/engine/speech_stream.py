@@ -0,0 +1,126 @@
+import re
+import time
+import queue
+import threading
+from typing import List, Optional, Callable
+
+# Abbreviations that end with a period but do not end a sentence
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc',
+    'e.g', 'i.e', 'approx', 'fig', 'inc', 'ltd'
+}
+
+# Abbreviations only when a number follows ("No. 5"); otherwise ordinary words ("The answer is no.")
+NUMBER_ABBREVIATIONS = {'no'}
+
+# Sentence end: terminal punctuation (optionally followed by quotes/brackets) then whitespace
+SENTENCE_END = re.compile(r'([.!?]+["\')\]]*)\s+|\n+')
+
+class SentenceSplitter:
+    """Incrementally cuts a token stream into complete sentences"""
+    
+    def __init__(self, min_chars: int = 2):
+        self.min_chars = min_chars
+        self.buffer = ""
+    
+    def feed(self, token: str) -> List[str]:
+        """Add a token and return any sentences it completed"""
+        self.buffer += token
+        sentences = []
+        
+        search_from = 0
+        while True:
+            match = SENTENCE_END.search(self.buffer, search_from)
+            if not match:
+                break
+            
+            candidate = self.buffer[:match.end()].strip()
+            
+            # Don't cut after abbreviations like "Dr." or single initials
+            if match.group(1) and match.group(1).startswith('.'):
+                last_word = candidate.rstrip('.!?"\')]').split()[-1:] or ['']
+                word = last_word[0].lower()
+                if word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                    search_from = match.end()
+                    continue
+                if word in NUMBER_ABBREVIATIONS:
+                    following = self.buffer[match.end():]
+                    if not following:
+                        # Wait for the next token to see whether a number follows
+                        break
+                    if following[0].isdigit():
+                        search_from = match.end()
+                        continue
+            
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+            self.buffer = self.buffer[match.end():]
+            search_from = 0
+        
+        return sentences
+    
+    def flush(self) -> Optional[str]:
+        """Return whatever is left in the buffer as the final sentence"""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return remainder if remainder else None
+
+def split_sentences(text: str) -> List[str]:
+    """Split a complete text into sentences using the streaming rules"""
+    splitter = SentenceSplitter()
+    sentences = splitter.feed(text)
+    remainder = splitter.flush()
+    if remainder:
+        sentences.append(remainder)
+    return sentences
+
+class SentenceSpeaker:
+    """Speaks queued sentences in order on a background thread"""
+    
+    def __init__(self, speak_func: Optional[Callable[[str], None]] = None):
+        if speak_func is None:
+            from .command import speak
+            speak_func = speak
+        self.speak_func = speak_func
+        self.sentences = queue.Queue()
+        self.thread = None
+        self.started_at = time.time()
+        self.first_audio_at = None
+        self.spoken_chars = 0
+    
+    def say(self, sentence: str):
+        """Queue a sentence; returns immediately"""
+        if not sentence or not sentence.strip():
+            return
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._speak_loop, daemon=True)
+            self.thread.start()
+        self.spoken_chars += len(sentence)
+        self.sentences.put(sentence)
+    
+    def _speak_loop(self):
+        """Drain the queue one sentence at a time"""
+        while True:
+            sentence = self.sentences.get()
+            if sentence is None:
+                break
+            if self.first_audio_at is None:
+                self.first_audio_at = time.time()
+            try:
+                self.speak_func(sentence)
+            except Exception as e:
+                print(f"❌ Sentence TTS error: {e}")
+    
+    def finish(self, timeout: Optional[float] = None):
+        """Wait until every queued sentence has been spoken"""
+        if self.thread is None:
+            return
+        self.sentences.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+    
+    def time_to_first_audio(self) -> Optional[float]:
+        """Seconds from creation until the first sentence started playing"""
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.started_at
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import weakref
+import threading
+from typing import Dict, Optional, Any
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Applied to every new connection. WAL lets readers run alongside a writer;
+# synchronous=NORMAL is durable across application crashes in WAL mode and
+# skips the fsync on every commit.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+    'cache_size': -8000  # KiB
+}
+
+class _ConnectionSlot:
+    """Thread-local holder; when its thread (or greenlet) ends, the connection is closed"""
+    __slots__ = ('conn', '__weakref__')
+
+class SQLitePool:
+    """Per-thread SQLite connections with a tuned pragma profile
+    
+    sqlite3 connections must not be used by two threads at once, so every
+    thread (Eel workers, the voice loop, background writers) gets its own
+    connection on first use and keeps it. Each connection keeps an LRU of
+    prepared statements (cached_statements), so repeated lookups skip SQL
+    parsing. A connection is closed as soon as its thread-local slot goes
+    away, i.e. when the owning thread or greenlet finishes.
+    """
+    
+    def __init__(self, path: Optional[str] = None, pragmas: Optional[Dict[str, Any]] = None,
+                 cached_statements: Optional[int] = None):
+        self.path = path or os.getenv('SQLITE_DB_PATH', 'jarvis.db')
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self.cached_statements = cached_statements or int(os.getenv('SQLITE_CACHED_STATEMENTS', '256'))
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self.stats = {'opened': 0, 'reaped': 0}
+    
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection (opened on first use)"""
+        slot = getattr(self._local, 'slot', None)
+        if slot is None:
+            slot = _ConnectionSlot()
+            slot.conn = self._open()
+            weakref.finalize(slot, self._discard, slot.conn)
+            self._local.slot = slot
+        return slot.conn
+    
+    def _open(self) -> sqlite3.Connection:
+        """Open and tune a new connection for the current thread"""
+        # check_same_thread=False only so close_all() can close it from another thread;
+        # the connection itself is never shared
+        conn = sqlite3.connect(self.path, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for pragma, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {pragma} = {value}")
+            except sqlite3.DatabaseError as e:
+                print(f"⚠️ SQLite PRAGMA {pragma} not applied: {e}")
+        
+        with self._lock:
+            self._connections[id(conn)] = conn
+            self.stats['opened'] += 1
+        return conn
+    
+    def _discard(self, conn: sqlite3.Connection):
+        """Close the connection of a thread that has finished"""
+        with self._lock:
+            if self._connections.pop(id(conn), None) is None:
+                return
+            self.stats['reaped'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def backup(self, target_path: str):
+        """Consistent online copy of the database (includes pages still in the WAL)"""
+        target = sqlite3.connect(target_path)
+        try:
+            self.connection().backup(target)
+        finally:
+            target.close()
+    
+    def close_all(self):
+        """Close every connection in the pool"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections = {}
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Open connections and pragma profile"""
+        with self._lock:
+            open_connections = len(self._connections)
+        return {
+            **self.stats,
+            'open': open_connections,
+            'path': self.path,
+            'journal_mode': self.pragmas.get('journal_mode'),
+            'synchronous': self.pragmas.get('synchronous'),
+            'cached_statements': self.cached_statements
+        }
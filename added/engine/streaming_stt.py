@@ -0,0 +1,193 @@
+import os
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional
+import numpy as np
+from . import stt_profiles
+try:
+    from vosk import KaldiRecognizer
+except ImportError:
+    KaldiRecognizer = None
+
+def _join(*parts: str) -> str:
+    return ' '.join(part.strip() for part in parts if part and part.strip())
+
+def _drop_overlap(committed: str, text: str, max_words: int = 4) -> str:
+    """Remove words at the start of text that repeat the end of committed (overlapping windows)"""
+    tail = committed.lower().split()[-max_words:]
+    words = text.split()
+    for size in range(min(len(tail), len(words)), 0, -1):
+        if [word.lower().strip('.,!?') for word in words[:size]] == [word.strip('.,!?') for word in tail[-size:]]:
+            return ' '.join(words[size:])
+    return text
+
+class StreamingTranscriber(ABC):
+    """Incremental STT for one phrase
+    
+    Feed PCM frames with accept() while the user is speaking; partial
+    hypotheses go to on_partial(text) as they change. Call mark_pause() when
+    the VAD sees the first silent frame so decoding of the finished speech can
+    start before the endpoint is confirmed, then finish() for the final text.
+    """
+    
+    def __init__(self, on_partial: Optional[Callable[[str], None]] = None, sample_rate: int = 16000):
+        self.on_partial = on_partial
+        self.sample_rate = sample_rate
+        self.partial = ''
+    
+    @abstractmethod
+    def accept(self, pcm: bytes):
+        """Feed one PCM frame (16-bit mono)"""
+    
+    def mark_pause(self):
+        pass
+    
+    @abstractmethod
+    def finish(self) -> str:
+        """Final text of the phrase"""
+    
+    def _emit(self, text: str):
+        text = text.strip()
+        if text and text != self.partial:
+            self.partial = text
+            if self.on_partial:
+                try:
+                    self.on_partial(text)
+                except Exception as e:
+                    print(f"Partial transcript callback error: {e}")
+
+class VoskStreamingTranscriber(StreamingTranscriber):
+    """Frame-synchronous decoding with Kaldi's PartialResult (finishes almost instantly)"""
+    
+    def __init__(self, model: Any, on_partial: Optional[Callable[[str], None]] = None,
+                 sample_rate: int = 16000):
+        super().__init__(on_partial, sample_rate)
+        if KaldiRecognizer is None:
+            raise RuntimeError("vosk is not installed")
+        self.recognizer = KaldiRecognizer(model, sample_rate)
+        self.committed = ''
+    
+    def accept(self, pcm: bytes):
+        if self.recognizer.AcceptWaveform(pcm):
+            # Kaldi closed a segment on its own - its text is final
+            self.committed = _join(self.committed, json.loads(self.recognizer.Result()).get('text', ''))
+            self._emit(self.committed)
+        else:
+            self._emit(_join(self.committed, json.loads(self.recognizer.PartialResult()).get('partial', '')))
+    
+    def finish(self) -> str:
+        return _join(self.committed, json.loads(self.recognizer.FinalResult()).get('text', ''))
+
+class WhisperStreamingTranscriber(StreamingTranscriber):
+    """Sliding-window Whisper decoding on a background thread
+    
+    Every step_s of new audio the current window (the phrase so far, at most
+    window_s long) is re-decoded and the result emitted as a partial. When the
+    window fills up its last hypothesis is committed and the next window starts
+    overlap_s before that point; words repeated across the seam are dropped.
+    Decodes never queue up: if one is running, only the newest audio is
+    decoded next. Because mark_pause() starts a decode as soon as speech
+    stops, finish() usually returns the already-decoded text right after the
+    endpoint instead of transcribing the whole clip then.
+    """
+    
+    def __init__(self, model: Any, on_partial: Optional[Callable[[str], None]] = None,
+                 sample_rate: int = 16000, step_s: Optional[float] = None,
+                 window_s: Optional[float] = None, overlap_s: float = 1.0,
+                 profile: str = 'command'):
+        super().__init__(on_partial, sample_rate)
+        self.model = model
+        self.step = int(sample_rate * (step_s or float(os.getenv('STT_PARTIAL_INTERVAL', '0.5'))))
+        self.window = int(sample_rate * (window_s or float(os.getenv('STT_WINDOW_SECONDS', '15'))))
+        self.overlap = int(sample_rate * overlap_s)
+        self.profile = profile
+        
+        self._chunks: List[np.ndarray] = []
+        self._samples = 0
+        self._window_start = 0
+        self._requested_at = 0
+        self.committed = ''
+        self._decoded = (0, 0, '')  # (window_start, window_end, text)
+        self._pending: Optional[tuple] = None
+        self._busy = False
+        self._cond = threading.Condition()
+        self.stats = {'decodes': 0, 'final_decodes': 0}
+    
+    def accept(self, pcm: bytes):
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        with self._cond:
+            self._chunks.append(samples)
+            self._samples += len(samples)
+        if self._samples - self._requested_at >= self.step:
+            self._request()
+    
+    def mark_pause(self):
+        if self._samples > self._requested_at:
+            self._request()
+    
+    def _audio(self, start: int, end: int) -> np.ndarray:
+        audio = np.concatenate(self._chunks) if len(self._chunks) > 1 else self._chunks[0]
+        self._chunks = [audio]
+        return audio[start:end]
+    
+    def _request(self):
+        """Schedule a decode of the current window (coalesced with any queued one)"""
+        with self._cond:
+            if not self._chunks:
+                return
+            end = self._samples
+            if end - self._window_start > self.window and self._decoded[0] == self._window_start:
+                # Window full: commit what it said and slide forward with some overlap
+                self.committed = _join(self.committed, _drop_overlap(self.committed, self._decoded[2]))
+                self._window_start = max(self._window_start, self._decoded[1] - self.overlap)
+            self._requested_at = end
+            self._pending = (self._window_start, end, self._audio(self._window_start, end))
+            if not self._busy:
+                self._busy = True
+                threading.Thread(target=self._decode_loop, daemon=True).start()
+    
+    def _decode_loop(self):
+        while True:
+            with self._cond:
+                if self._pending is None:
+                    self._busy = False
+                    self._cond.notify_all()
+                    return
+                start, end, audio = self._pending
+                self._pending = None
+            
+            text = self._transcribe(audio)
+            with self._cond:
+                self.stats['decodes'] += 1
+                self._decoded = (start, end, text)
+                committed = self.committed
+            self._emit(_join(committed, _drop_overlap(committed, text)))
+    
+    def _transcribe(self, audio: np.ndarray) -> str:
+        try:
+            return stt_profiles.transcribe(self.model, audio, self.profile).get('text', '').strip()
+        except Exception as e:
+            print(f"❌ Streaming STT decode error: {e}")
+            return ''
+    
+    def finish(self) -> str:
+        """Final text: the last decode if it covered all audio, otherwise one more decode of the tail"""
+        self.mark_pause()
+        with self._cond:
+            self._cond.wait_for(lambda: not self._busy)
+            start, end, text = self._decoded
+            if self._samples and (start, end) != (self._window_start, self._samples):
+                self.stats['final_decodes'] += 1
+                text = self._transcribe(self._audio(self._window_start, self._samples))
+            return _join(self.committed, _drop_overlap(self.committed, text))
+
+def create_streaming_transcriber(engine: str, model: Any,
+                                 on_partial: Optional[Callable[[str], None]] = None,
+                                 sample_rate: int = 16000, profile: str = 'command') -> StreamingTranscriber:
+    """Streaming transcriber for STT_STREAMING=whisper or vosk (profile applies to Whisper)"""
+    if engine == 'vosk':
+        return VoskStreamingTranscriber(model, on_partial, sample_rate)
+    if engine == 'whisper':
+        return WhisperStreamingTranscriber(model, on_partial, sample_rate, profile=profile)
+    raise ValueError(f"Unknown streaming STT engine '{engine}'")
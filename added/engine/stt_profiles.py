@@ -0,0 +1,128 @@
+import os
+import math
+import dataclasses
+from typing import Any, Dict, Optional
+import numpy as np
+try:
+    import torch
+    import torch.nn.functional as F
+    import whisper
+except ImportError:
+    whisper = None
+
+# Named Whisper decoding profiles
+#   command      - short spoken commands: one greedy pass, no temperature fallback,
+#                  no conditioning on previous text, no timestamps, language fixed
+#   command_fast - command with the encoder context trimmed to the clip (whisper.cpp's
+#                  audio_ctx); much cheaper encoder, slightly less robust decoding
+#   accurate     - Whisper's transcribe() defaults (beam/temperature fallback,
+#                  previous-text conditioning), for meetings and long recordings
+WHISPER_PROFILES: Dict[str, Dict[str, Any]] = {
+    'command': {
+        'language': 'en',
+        'task': 'transcribe',
+        'temperature': 0.0,
+        'condition_on_previous_text': False,
+        'without_timestamps': True,
+        'fp16': False,
+        # Single 30 s window decoded directly instead of transcribe()'s seek loop
+        'single_pass': True
+    },
+    'command_fast': {
+        'language': 'en',
+        'task': 'transcribe',
+        'temperature': 0.0,
+        'condition_on_previous_text': False,
+        'without_timestamps': True,
+        'fp16': False,
+        'single_pass': True,
+        # Encode only the clip plus this much trailing context instead of 30 s
+        'trim_context_s': 1.0
+    },
+    'accurate': {
+        'language': 'en',
+        'task': 'transcribe',
+        'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'condition_on_previous_text': True,
+        'fp16': False
+    }
+}
+
+# transcribe()'s "this was silence" test, applied to the single-pass decode too
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+# Encoder positions per second of audio (10 ms mel hop, conv2 stride 2)
+ENCODER_POSITIONS_PER_SECOND = 50
+
+class _TrimmedContext:
+    """Model view whose dims report the trimmed encoder context
+    
+    whisper.decode() treats features as pre-encoded only when their length
+    equals dims.n_audio_ctx; everything else is the real model.
+    """
+    
+    def __init__(self, model: Any, n_audio_ctx: int):
+        self._model = model
+        self.dims = dataclasses.replace(model.dims, n_audio_ctx=n_audio_ctx)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+def _encode_trimmed(model: Any, audio: np.ndarray, trim_context_s: float) -> Any:
+    """Run the encoder on the clip only, with the positional embedding sliced to match
+    
+    The stock encoder insists on the full 1500-position (30 s) window; this is the
+    same forward pass over the first n positions, as whisper.cpp does with audio_ctx.
+    """
+    encoder = model.encoder
+    seconds = len(audio) / whisper.audio.SAMPLE_RATE + trim_context_s
+    n_ctx = min(model.dims.n_audio_ctx, math.ceil(seconds * ENCODER_POSITIONS_PER_SECOND))
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio.astype(np.float32)), model.dims.n_mels)
+    mel = mel[:, :n_ctx * 2].unsqueeze(0).to(model.device)
+    with torch.no_grad():
+        x = F.gelu(encoder.conv1(mel))
+        x = F.gelu(encoder.conv2(x)).permute(0, 2, 1)
+        x = (x + encoder.positional_embedding[:n_ctx]).to(x.dtype)
+        for block in encoder.blocks:
+            x = block(x)
+        return encoder.ln_post(x)
+
+def transcribe(model: Any, audio: np.ndarray, profile: Optional[str] = None, **overrides) -> Dict[str, Any]:
+    """Transcribe float32 16 kHz audio with a named profile (default WHISPER_PROFILE or 'command')
+    
+    Returns a transcribe()-style dict with at least 'text'. Clips longer than
+    Whisper's 30 s window always go through transcribe().
+    """
+    profile = profile or os.getenv('WHISPER_PROFILE', 'command')
+    if profile not in WHISPER_PROFILES:
+        raise ValueError(f"Unknown Whisper profile '{profile}' (expected {', '.join(WHISPER_PROFILES)})")
+    options = {**WHISPER_PROFILES[profile], **overrides}
+    single_pass = options.pop('single_pass', False)
+    trim_context_s = options.pop('trim_context_s', None)
+    
+    if single_pass and whisper is not None and len(audio) <= whisper.audio.N_SAMPLES:
+        if trim_context_s is not None:
+            # One clip: (n_ctx, n_audio_state), so decode() returns a single result
+            features = _encode_trimmed(model, audio, trim_context_s)[0]
+            decoder_model = _TrimmedContext(model, features.shape[0])
+        else:
+            # Full 30 s window: the clip is padded, but encoded and decoded once
+            features = whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audio.astype(np.float32)), model.dims.n_mels
+            ).to(model.device)
+            decoder_model = model
+        result = whisper.decode(decoder_model, features, whisper.DecodingOptions(
+            task=options['task'],
+            language=options['language'],
+            temperature=options['temperature'],
+            without_timestamps=options['without_timestamps'],
+            fp16=options['fp16']
+        ))
+        text = result.text.strip()
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+            text = ''
+        return {'text': text, 'language': result.language, 'no_speech_prob': result.no_speech_prob,
+                'avg_logprob': result.avg_logprob}
+    
+    return model.transcribe(audio, **options)
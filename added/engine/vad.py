@@ -0,0 +1,163 @@
+import os
+from collections import deque
+from typing import Deque, List, Optional
+import numpy as np
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+# Endpointer results
+SPEECH_END = 'end'          # trailing silence after speech - phrase complete
+NO_SPEECH = 'no_speech'     # nothing said before the start timeout
+MAX_LENGTH = 'max_length'   # phrase hit the length cap
+
+class VoiceActivityDetector:
+    """Frame-by-frame speech / non-speech decisions on 16-bit mono PCM
+    
+    The default detector combines short-time energy against an adaptive noise
+    floor with the zero-crossing rate (steady hiss and fan noise cross zero far
+    more often than voiced speech). If the optional webrtcvad package is
+    installed and VAD_MODE is 'webrtc' or 'auto', its GMM model is used instead.
+    Frames must be 10, 20 or 30 ms long.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, mode: Optional[str] = None,
+                 aggressiveness: Optional[int] = None, min_energy: float = 0.005,
+                 energy_ratio: float = 3.0, max_zcr: float = 0.35):
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("frame_ms must be 10, 20 or 30")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.min_energy = min_energy
+        self.energy_ratio = energy_ratio
+        self.max_zcr = max_zcr
+        self.noise_floor = None
+        
+        mode = (mode or os.getenv('VAD_MODE', 'auto')).lower()
+        aggressiveness = aggressiveness if aggressiveness is not None else int(os.getenv('VAD_AGGRESSIVENESS', '2'))
+        self.webrtc = None
+        if mode in ('webrtc', 'auto') and webrtcvad is not None:
+            self.webrtc = webrtcvad.Vad(aggressiveness)
+        elif mode == 'webrtc':
+            print("⚠️ webrtcvad not installed - using energy-based voice activity detection")
+        self.mode = 'webrtc' if self.webrtc else 'energy'
+    
+    def is_speech(self, frame: bytes) -> bool:
+        """True if the frame contains speech"""
+        if self.webrtc is not None:
+            return self.webrtc.is_speech(frame, self.sample_rate)
+        
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32768.0
+        if samples.size == 0:
+            return False
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        zcr = float(np.mean(np.signbit(samples[1:]) != np.signbit(samples[:-1]))) if samples.size > 1 else 0.0
+        
+        if self.noise_floor is None:
+            # Assume the capture starts quietly, but do not let a loud first frame set a deaf threshold
+            self.noise_floor = min(rms, self.min_energy * 2)
+        threshold = max(self.min_energy, self.noise_floor * self.energy_ratio)
+        
+        # Loud frames count regardless of ZCR (fricatives like "s" have a high rate)
+        speech = rms > threshold * 2 or (rms > threshold and zcr < self.max_zcr)
+        if not speech:
+            # Track the background level slowly so the threshold follows the room
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+    
+    def reset(self):
+        """Forget the learned noise floor"""
+        self.noise_floor = None
+
+class Endpointer:
+    """Streaming phrase segmentation on top of a VoiceActivityDetector
+    
+    Feed fixed-size frames to process(). Leading silence is dropped (apart from
+    a short pre-roll so the first syllable is not clipped), and the phrase ends
+    once trailing_silence_ms of non-speech follows it, so STT can start right
+    after the user stops talking instead of after a fixed recording window.
+    """
+    
+    def __init__(self, vad: Optional[VoiceActivityDetector] = None,
+                 trailing_silence_ms: Optional[int] = None, pre_roll_ms: int = 150,
+                 min_speech_ms: int = 90, max_phrase_s: float = 10.0,
+                 no_speech_timeout_s: Optional[float] = 5.0):
+        self.vad = vad or VoiceActivityDetector()
+        frame_ms = self.vad.frame_ms
+        trailing_silence_ms = trailing_silence_ms or int(os.getenv('VAD_TRAILING_SILENCE_MS', '300'))
+        
+        self.trailing_frames = max(1, trailing_silence_ms // frame_ms)
+        self.start_frames = max(1, min_speech_ms // frame_ms)
+        self.max_frames = int(max_phrase_s * 1000 / frame_ms)
+        self.timeout_frames = int(no_speech_timeout_s * 1000 / frame_ms) if no_speech_timeout_s else None
+        self.pre_roll: Deque[bytes] = deque(maxlen=max(1, pre_roll_ms // frame_ms) + self.start_frames)
+        self.reset()
+    
+    def reset(self):
+        """Start a new phrase (the VAD keeps its noise floor)"""
+        self.pre_roll.clear()
+        self.frames: List[bytes] = []
+        self.silence: List[bytes] = []
+        self.triggered = False
+        self.speech_run = 0
+        self.waited = 0
+    
+    def process(self, frame: bytes) -> Optional[str]:
+        """Consume one frame; returns SPEECH_END/NO_SPEECH/MAX_LENGTH when done, else None"""
+        speech = self.vad.is_speech(frame)
+        
+        if not self.triggered:
+            self.pre_roll.append(frame)
+            self.speech_run = self.speech_run + 1 if speech else 0
+            if self.speech_run >= self.start_frames:
+                # Speech onset: keep the pre-roll, drop the silence before it
+                self.triggered = True
+                self.frames = list(self.pre_roll)
+                self.pre_roll.clear()
+                return None
+            self.waited += 1
+            if self.timeout_frames and self.waited >= self.timeout_frames:
+                return NO_SPEECH
+            return None
+        
+        if speech:
+            # Pause inside the phrase - keep it
+            self.frames.extend(self.silence)
+            self.silence = []
+            self.frames.append(frame)
+        else:
+            self.silence.append(frame)
+            if len(self.silence) >= self.trailing_frames:
+                return SPEECH_END
+        
+        if len(self.frames) + len(self.silence) >= self.max_frames:
+            return MAX_LENGTH
+        return None
+    
+    def audio(self) -> bytes:
+        """PCM of the detected phrase, without leading or trailing silence"""
+        return b''.join(self.frames)
+    
+    @property
+    def has_speech(self) -> bool:
+        return self.triggered and bool(self.frames)
+
+def trim_silence(audio: np.ndarray, sample_rate: int = 16000,
+                 vad: Optional[VoiceActivityDetector] = None, pad_ms: int = 150) -> np.ndarray:
+    """Cut leading and trailing non-speech from float32 audio before STT"""
+    vad = vad or VoiceActivityDetector(sample_rate)
+    frame_length = vad.frame_length
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    
+    flags = [vad.is_speech(pcm[i:i + frame_length].tobytes())
+             for i in range(0, len(pcm) - frame_length + 1, frame_length)]
+    speech_frames = [i for i, flag in enumerate(flags) if flag]
+    if not speech_frames:
+        return audio[:0]
+    
+    pad = pad_ms // vad.frame_ms
+    start = max(0, speech_frames[0] - pad) * frame_length
+    end = min(len(flags), speech_frames[-1] + 1 + pad) * frame_length
+    return audio[start:end]
@@ -5,11 +5,15 @@ import queue
 import numpy as np
 import pyaudio
 import pyttsx3
-import whisper
 import pvporcupine
 import struct
 from typing import Optional, Callable, Dict, Any, List
 from dotenv import load_dotenv
+from .vad import VoiceActivityDetector, Endpointer
+from .audio_capture import get_capture_service
+from .streaming_stt import StreamingTranscriber, create_streaming_transcriber
+from . import stt_profiles
+from .model_registry import get_model_registry
 
 load_dotenv()
 
@@ -19,8 +23,13 @@ class VoiceEngine:
     def __init__(self):
         # Configuration
         self.whisper_model_name = os.getenv('WHISPER_MODEL', 'base')
+        # Decoding profile for spoken commands ('command' = single greedy pass, 'accurate' = full transcribe)
+        self.whisper_profile = os.getenv('WHISPER_PROFILE', 'command')
         self.tts_rate = int(os.getenv('TTS_RATE', '174'))
         self.tts_voice = int(os.getenv('TTS_VOICE', '0'))
+        # Streaming STT while the user speaks: whisper, vosk or off (transcribe after recording)
+        self.streaming_stt = os.getenv('STT_STREAMING', 'whisper').lower()
+        self.vosk_model_path = os.getenv('VOSK_MODEL_PATH', 'vosk-model-en-us-0.22-lgraph')
         
         # Audio settings
         self.sample_rate = 16000
@@ -28,6 +37,10 @@ class VoiceEngine:
         self.audio_format = pyaudio.paInt16
         self.channels = 1
         
+        # Voice activity detection: recording stops this long after the user stops talking
+        self.vad = VoiceActivityDetector(self.sample_rate)
+        self.trailing_silence_ms = int(os.getenv('VAD_TRAILING_SILENCE_MS', '300'))
+        
         # State management
         self.is_listening = False
         self.is_speaking = False
@@ -36,14 +49,17 @@ class VoiceEngine:
         
         # Components
         self.whisper_model = None
+        self.vosk_model = None
         self.tts_engine = None
         self.porcupine = None
+        self.capture = None
         self.pyaudio_instance = None
         self.audio_stream = None
         
         # Callbacks
         self.on_wake_word_detected = None
         self.on_speech_recognized = None
+        self.on_partial_transcript = None
         self.on_listening_started = None
         self.on_listening_stopped = None
         
@@ -53,10 +69,9 @@ class VoiceEngine:
     def _initialize_components(self):
         """Initialize all voice components"""
         try:
-            # Initialize Whisper
-            print(f"🎤 Loading Whisper model: {self.whisper_model_name}")
-            self.whisper_model = whisper.load_model(self.whisper_model_name)
-            print("✅ Whisper model loaded successfully")
+            # Whisper loads in the background (shared with any other module using the
+            # same model) so TTS, audio and wake word are ready without waiting for it
+            get_model_registry().warm_up('whisper', self.whisper_model_name)
             
             # Initialize TTS
             self.tts_engine = pyttsx3.init('sapi5')  # Windows SAPI
@@ -66,9 +81,10 @@ class VoiceEngine:
             self.tts_engine.setProperty('rate', self.tts_rate)
             print("✅ TTS engine initialized")
             
-            # Initialize PyAudio
-            self.pyaudio_instance = pyaudio.PyAudio()
-            print("✅ PyAudio initialized")
+            # One shared microphone stream for wake word, command capture and meters
+            self.capture = get_capture_service().acquire()
+            self.pyaudio_instance = self.capture.pyaudio_instance
+            print("✅ Audio capture initialized")
             
             # Initialize Porcupine for wake word detection
             try:
@@ -85,10 +101,16 @@ class VoiceEngine:
                      on_wake_word_detected: Optional[Callable] = None,
                      on_speech_recognized: Optional[Callable] = None,
                      on_listening_started: Optional[Callable] = None,
-                     on_listening_stopped: Optional[Callable] = None):
-        """Set callback functions for voice events"""
+                     on_listening_stopped: Optional[Callable] = None,
+                     on_partial_transcript: Optional[Callable] = None):
+        """Set callback functions for voice events
+        
+        on_partial_transcript(text) receives interim hypotheses while the user
+        is still speaking (streaming STT); on_speech_recognized gets the final text.
+        """
         self.on_wake_word_detected = on_wake_word_detected
         self.on_speech_recognized = on_speech_recognized
+        self.on_partial_transcript = on_partial_transcript
         self.on_listening_started = on_listening_started
         self.on_listening_stopped = on_listening_stopped
     
@@ -112,17 +134,14 @@ class VoiceEngine:
     def _wake_word_loop(self):
         """Continuous wake word detection loop"""
         try:
-            audio_stream = self.pyaudio_instance.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
+            # Porcupine expects 16 kHz, the capture service's rate
+            consumer = self.capture.consumer(pre_roll_ms=0)
             
             while self.wake_word_active:
                 try:
-                    pcm = audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
+                    pcm = consumer.read_bytes(self.porcupine.frame_length)
+                    if pcm is None:
+                        continue
                     pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
                     
                     keyword_index = self.porcupine.process(pcm)
@@ -132,21 +151,24 @@ class VoiceEngine:
                         if self.on_wake_word_detected:
                             self.on_wake_word_detected()
                         
-                        # Start listening for command
-                        self.start_listening()
+                        # Start listening for command right where the wake word ended,
+                        # so words spoken straight after "Jarvis" are not lost
+                        self.start_listening(start_at=consumer.position)
                         
                 except Exception as e:
                     if self.wake_word_active:  # Only log if we're still supposed to be active
                         print(f"Wake word detection error: {e}")
                     break
             
-            audio_stream.close()
-            
         except Exception as e:
             print(f"❌ Wake word loop error: {e}")
     
-    def start_listening(self, duration: int = 5):
-        """Start listening for speech input"""
+    def start_listening(self, duration: int = 5, start_at: Optional[int] = None):
+        """Start listening for speech input (duration caps the phrase length)
+        
+        start_at is a capture position to start from; by default the capture
+        starts AUDIO_PRE_ROLL_MS before the call.
+        """
         if self.is_listening or self.is_speaking:
             return False
         
@@ -157,7 +179,7 @@ class VoiceEngine:
         # Start listening in a separate thread
         listen_thread = threading.Thread(
             target=self._listen_for_speech, 
-            args=(duration,), 
+            args=(duration, start_at), 
             daemon=True
         )
         listen_thread.start()
@@ -169,17 +191,18 @@ class VoiceEngine:
         if self.on_listening_stopped:
             self.on_listening_stopped()
     
-    def _listen_for_speech(self, duration: int):
+    def _listen_for_speech(self, duration: int, start_at: Optional[int] = None):
         """Listen for speech and convert to text"""
         try:
-            print(f"🎤 Listening for {duration} seconds...")
+            print(f"🎤 Listening (up to {duration} seconds)...")
             
-            # Record audio
-            audio_data = self._record_audio(duration)
+            # Record audio (decoding it on the fly when streaming STT is on)
+            transcriber = self._create_transcriber()
+            audio_data = self._record_audio(duration, start_at=start_at, transcriber=transcriber)
             
             if audio_data is not None and len(audio_data) > 0:
-                # Convert to text using Whisper
-                text = self._speech_to_text(audio_data)
+                # Convert to text using Whisper (or finish the streaming decode)
+                text = transcriber.finish() if transcriber else self._speech_to_text(audio_data)
                 
                 if text and text.strip():
                     print(f"🗣️ Recognized: {text}")
@@ -197,31 +220,95 @@ class VoiceEngine:
             if self.on_listening_stopped:
                 self.on_listening_stopped()
     
-    def _record_audio(self, duration: int) -> Optional[np.ndarray]:
-        """Record audio for specified duration"""
+    def _get_whisper_model(self):
+        """Shared Whisper model, held for the engine's lifetime (waits for the warm-up load)"""
+        if self.whisper_model is None:
+            try:
+                self.whisper_model = get_model_registry().acquire('whisper', self.whisper_model_name)
+            except Exception as e:
+                print(f"❌ Whisper model unavailable: {e}")
+        return self.whisper_model
+    
+    def _create_transcriber(self) -> Optional[StreamingTranscriber]:
+        """Streaming transcriber for one phrase, or None to transcribe after recording"""
+        if self.streaming_stt == 'off':
+            return None
         try:
-            audio_stream = self.pyaudio_instance.open(
-                format=self.audio_format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
+            if self.streaming_stt == 'vosk':
+                if self.vosk_model is None:
+                    self.vosk_model = get_model_registry().acquire('vosk', self.vosk_model_path)
+                model = self.vosk_model
+            else:
+                model = self._get_whisper_model()
+            if model is None:
+                return None
+            return create_streaming_transcriber(self.streaming_stt, model, self._handle_partial,
+                                                self.sample_rate, self.whisper_profile)
+        except Exception as e:
+            print(f"⚠️ Streaming STT unavailable ({e}) - transcribing after recording")
+            self.streaming_stt = 'off'
+            return None
+    
+    def _handle_partial(self, text: str):
+        """Forward an interim hypothesis"""
+        print(f"💬 ... {text}")
+        if self.on_partial_transcript:
+            self.on_partial_transcript(text)
+    
+    def _record_audio(self, duration: int, endpointing: bool = True, start_at: Optional[int] = None,
+                      transcriber: Optional[StreamingTranscriber] = None) -> Optional[np.ndarray]:
+        """Record one phrase (at most duration seconds) from the shared capture stream
+        
+        With endpointing, leading silence is dropped and recording stops once
+        the trailing-silence window passes after speech; returns None if
+        nobody speaks. Without it, exactly duration seconds are recorded.
+        A transcriber is fed the phrase audio frame by frame as it arrives.
+        """
+        try:
+            frame_length = self.vad.frame_length
+            consumer = self.capture.consumer(
+                pre_roll_ms=None if endpointing else 0, start_at=start_at
             )
             
             frames = []
-            frames_to_record = int(self.sample_rate / self.chunk_size * duration)
+            frames_to_record = int(self.sample_rate / frame_length * duration)
+            endpointer = Endpointer(
+                self.vad,
+                trailing_silence_ms=self.trailing_silence_ms,
+                max_phrase_s=duration,
+                no_speech_timeout_s=duration
+            ) if endpointing else None
+            fed = 0
             
             for _ in range(frames_to_record):
-                if not self.is_listening:
+                # stop_listening() cancels a phrase capture (fixed-length tests run without it)
+                if not self.is_listening and endpointing:
                     break
-                try:
-                    data = audio_stream.read(self.chunk_size, exception_on_overflow=False)
+                data = consumer.read_bytes(frame_length)
+                if data is None:
+                    print("Audio recording error: capture stream stalled")
+                    break
+                
+                if endpointer is None:
                     frames.append(data)
-                except Exception as e:
-                    print(f"Audio recording error: {e}")
+                    continue
+                
+                status = endpointer.process(data)
+                if transcriber is not None and endpointer.triggered:
+                    # Same audio the phrase ends up with: pauses only once speech resumes
+                    for frame in endpointer.frames[fed:]:
+                        transcriber.accept(frame)
+                    fed = len(endpointer.frames)
+                    if len(endpointer.silence) == 1:
+                        # Speech may have ended - start decoding before the endpoint is confirmed
+                        transcriber.mark_pause()
+                if status:
                     break
             
-            audio_stream.close()
+            if endpointer is not None:
+                if not endpointer.has_speech:
+                    return None
+                frames = [endpointer.audio()]
             
             if frames:
                 # Convert to numpy array
@@ -235,20 +322,16 @@ class VoiceEngine:
             print(f"❌ Audio recording error: {e}")
             return None
     
-    def _speech_to_text(self, audio_data: np.ndarray) -> Optional[str]:
-        """Convert audio data to text using Whisper"""
+    def _speech_to_text(self, audio_data: np.ndarray, profile: Optional[str] = None) -> Optional[str]:
+        """Convert audio data to text using Whisper (voice commands use the 'command' profile)"""
         try:
-            if self.whisper_model is None:
+            model = self._get_whisper_model()
+            if model is None:
                 print("❌ Whisper model not loaded")
                 return None
             
-            # Use Whisper to transcribe
-            result = self.whisper_model.transcribe(
-                audio_data,
-                language='en',
-                task='transcribe',
-                fp16=False  # Use fp32 for better compatibility
-            )
+            # Use Whisper to transcribe (fp32 for better compatibility)
+            result = stt_profiles.transcribe(model, audio_data, profile or self.whisper_profile)
             
             text = result.get('text', '').strip()
             return text if text else None
@@ -350,8 +433,8 @@ class VoiceEngine:
         try:
             print("🎤 Testing microphone...")
             
-            # Record 2 seconds of audio
-            audio_data = self._record_audio(2)
+            # Record 2 seconds of audio (no endpointing - silence is what we are checking for)
+            audio_data = self._record_audio(2, endpointing=False)
             
             if audio_data is not None and len(audio_data) > 0:
                 # Check if there's actual audio (not just silence)
@@ -385,12 +468,17 @@ class VoiceEngine:
         """Get current voice engine status"""
         return {
             'whisper_model': self.whisper_model_name,
-            'whisper_loaded': self.whisper_model is not None,
+            'whisper_loaded': get_model_registry().is_loaded('whisper', self.whisper_model_name),
+            'whisper_profile': self.whisper_profile,
             'tts_initialized': self.tts_engine is not None,
             'porcupine_available': self.porcupine is not None,
             'is_listening': self.is_listening,
             'is_speaking': self.is_speaking,
             'wake_word_active': self.wake_word_active,
+            'vad_mode': self.vad.mode,
+            'trailing_silence_ms': self.trailing_silence_ms,
+            'streaming_stt': self.streaming_stt,
+            'audio_capture': self.capture.get_stats() if self.capture else None,
             'tts_rate': self.tts_rate,
             'tts_voice': self.tts_voice
         }
@@ -408,8 +496,18 @@ class VoiceEngine:
             if self.porcupine:
                 self.porcupine.delete()
             
-            if self.pyaudio_instance:
-                self.pyaudio_instance.terminate()
+            # Let the shared registry unload models nobody else holds once they go idle
+            if self.whisper_model is not None:
+                get_model_registry().release('whisper', self.whisper_model_name)
+                self.whisper_model = None
+            if self.vosk_model is not None:
+                get_model_registry().release('vosk', self.vosk_model_path)
+                self.vosk_model = None
+            
+            if self.capture:
+                # Closes the shared stream once no other component uses it
+                self.capture.release()
+                self.capture = None
             
             print("🧹 Voice engine cleaned up")
             
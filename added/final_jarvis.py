@@ -16,11 +16,17 @@ import webbrowser
 import pyautogui
 import time
 import re
+import threading
 import certifi
 from engine.database_manager import DatabaseManager
+from engine.async_database_manager import AsyncDatabaseManager
+from engine.search_index import get_search_index
+from engine.model_registry import get_model_registry
 from engine.android_controller import AndroidController
 from engine.ai_router import AIRouter
 from engine.command import speak
+from engine.speech_stream import SentenceSpeaker
+from engine.intent_classifier import TaskClassifier
 from engine.pdf_reader import PDFReader
 from engine.screen_analyzer import ScreenAnalyzer
 # New imports for code analysis feature
@@ -48,7 +54,7 @@ import json
 import requests
 import numpy as np
 from datetime import datetime
-from vosk import Model, KaldiRecognizer
+from vosk import KaldiRecognizer
 from simple_meeting_recorder import SimpleMeetingRecorder
 
 class VoiceMeetingAssistant:
@@ -57,7 +63,7 @@ class VoiceMeetingAssistant:
     def __init__(self):
         self.is_recording = False
         self.meeting_recorder = None
-        self.vosk_model = None
+        self.vosk_model_path = None
         
         # Initialize components
         try:
@@ -67,14 +73,14 @@ class VoiceMeetingAssistant:
             print(f"⚠️ Voice Meeting Assistant init warning: {e}")
     
     def setup_vosk_model(self):
-        """Setup Vosk model"""
-        model_path = "vosk-model-en-us-0.22-lgraph"
+        """Locate the Vosk model (loaded through the model registry when a meeting starts)"""
+        model_path = os.getenv('VOSK_MODEL_PATH', "vosk-model-en-us-0.22-lgraph")
         
         if os.path.exists(model_path):
-            self.vosk_model = Model(model_path)
+            self.vosk_model_path = model_path
         else:
             print("⚠️ Vosk model not found")
-            self.vosk_model = None
+            self.vosk_model_path = None
     
     def speak_fixed(self, text):
         """Fixed TTS using Windows SAPI directly"""
@@ -123,6 +129,9 @@ class VoiceMeetingAssistant:
             
             if "✅" in result:
                 self.is_recording = True
+                # Load the large Vosk model while the meeting runs, not at JARVIS startup
+                if self.vosk_model_path:
+                    get_model_registry().warm_up('vosk', self.vosk_model_path)
                 return "Meeting recording started! I'm listening to Google Meet audio."
             else:
                 return f"Failed to start recording: {result}"
@@ -194,6 +203,9 @@ class VoiceMeetingAssistant:
             with open(summary_file, 'w', encoding='utf-8') as f:
                 f.write(summary)
             
+            # Make the meeting searchable ("what did we decide about the deadline")
+            self._index_meeting_files(audio_file, transcript_file, summary_file)
+            
             # Don't speak summary immediately - wait for user request
             self.speak_fixed("Meeting processed successfully.")
             
@@ -202,9 +214,23 @@ class VoiceMeetingAssistant:
         except Exception as e:
             return f"Processing error: {e}"
     
+    def _index_meeting_files(self, audio_file, transcript_file, summary_file):
+        """Save word timings next to the transcript and add both files to the search index"""
+        try:
+            words = getattr(self, 'last_transcript_words', None)
+            if words:
+                with open(audio_file.replace('.wav', '_words.json'), 'w', encoding='utf-8') as f:
+                    json.dump(words, f)
+            
+            search_index = get_search_index()
+            search_index.index_file(transcript_file)
+            search_index.index_file(summary_file)
+        except Exception as e:
+            print(f"⚠️ Could not index meeting: {e}")
+    
     def _transcribe_with_vosk(self, audio_file):
         """Transcribe using Vosk"""
-        if not self.vosk_model:
+        if not self.vosk_model_path:
             return "Vosk model not available"
         
         try:
@@ -214,24 +240,30 @@ class VoiceMeetingAssistant:
                 converted_file = audio_file
             
             wf = wave.open(converted_file, "rb")
-            rec = KaldiRecognizer(self.vosk_model, wf.getframerate())
-            rec.SetWords(True)
-            
             transcript_parts = []
+            # Word-level timings (start/end seconds) for the search index
+            self.last_transcript_words = []
             
-            while True:
-                data = wf.readframes(4000)
-                if len(data) == 0:
-                    break
+            # Held for the whole transcription so idle eviction cannot unload it mid-meeting
+            with get_model_registry().using('vosk', self.vosk_model_path) as vosk_model:
+                rec = KaldiRecognizer(vosk_model, wf.getframerate())
+                rec.SetWords(True)
                 
-                if rec.AcceptWaveform(data):
-                    result = json.loads(rec.Result())
-                    if result.get('text'):
-                        transcript_parts.append(result['text'])
-            
-            final_result = json.loads(rec.FinalResult())
-            if final_result.get('text'):
-                transcript_parts.append(final_result['text'])
+                while True:
+                    data = wf.readframes(4000)
+                    if len(data) == 0:
+                        break
+                    
+                    if rec.AcceptWaveform(data):
+                        result = json.loads(rec.Result())
+                        if result.get('text'):
+                            transcript_parts.append(result['text'])
+                            self.last_transcript_words.extend(result.get('result', []))
+                
+                final_result = json.loads(rec.FinalResult())
+                if final_result.get('text'):
+                    transcript_parts.append(final_result['text'])
+                    self.last_transcript_words.extend(final_result.get('result', []))
             
             wf.close()
             
@@ -339,14 +371,21 @@ class FinalJarvis:
         
         # Initialize components
         self.db_manager = DatabaseManager()
+        # Awaitable view of the same manager for coroutines (storage runs off the event loop)
+        self.async_db = AsyncDatabaseManager(self.db_manager)
         self.android_controller = AndroidController(self.db_manager)
         self.ai_router = AIRouter()
+        self.task_classifier = TaskClassifier()
         self.pdf_reader = PDFReader()
         self.screen_analyzer = ScreenAnalyzer()
         
         # Speech recognition
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
+        self.recognizer.dynamic_energy_threshold = True
+        # Commands end after a short trailing silence (library default: 0.8 s);
+        # dictation prompts keep the longer pause so sentences are not cut off
+        self.command_pause_threshold = int(os.getenv('VAD_TRAILING_SILENCE_MS', '300')) / 1000
         
         # Recipe state tracking
         self.current_recipe = None
@@ -364,6 +403,9 @@ class FinalJarvis:
         # Initialize Email Assistant
         self.setup_email_assistant()
         
+        # Pick up transcripts, summaries and emails written while JARVIS was not running
+        threading.Thread(target=self._index_existing_artifacts, daemon=True).start()
+        
         # Calibrate microphone
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source, duration=1)
@@ -431,10 +473,16 @@ class FinalJarvis:
     
     def listen_for_command(self):
         """Listen for any voice command"""
+        dictation_pause = (self.recognizer.pause_threshold, self.recognizer.non_speaking_duration)
         try:
             with self.microphone as source:
                 print("👂 Listening...")
-                audio = self.recognizer.listen(source, timeout=2, phrase_time_limit=8)
+                self.recognizer.pause_threshold = self.command_pause_threshold
+                self.recognizer.non_speaking_duration = min(dictation_pause[1], self.command_pause_threshold)
+                try:
+                    audio = self.recognizer.listen(source, timeout=2, phrase_time_limit=8)
+                finally:
+                    self.recognizer.pause_threshold, self.recognizer.non_speaking_duration = dictation_pause
             
             command = self.recognizer.recognize_google(audio)
             print(f"🎤 You said: {command}")
@@ -504,9 +552,17 @@ class FinalJarvis:
                     speak("Meeting is processed. Say 'Jarvis please summarise the meeting for me' to hear the summary.")
                 return
             
-            # Normal mode - use AI to classify the command
-            analysis_prompt = f"""
-            Analyze this command and determine the task: "{command}"
+            # Local classifier first - the LLM is only asked when it is unsure
+            local_result = self.task_classifier.analyze(command)
+            if local_result['confident']:
+                print(f"⚡ Local intent: {local_result['task']} ({local_result['confidence']:.2f})")
+                await self.execute_task(local_result['analysis'], command)
+                return
+            
+            # Normal mode - use AI to classify the command.
+            # The task list is a static prefix so Ollama evaluates it once and reuses it.
+            analysis_prompt = """
+            Analyze the user's command and determine the task.
             
             Available tasks:
             1. OPEN_YOUTUBE - open YouTube
@@ -550,6 +606,7 @@ class FinalJarvis:
             39. HELP_WITH_CODE - analyze code on screen like "jarvis help me with my code" or "check my code"
             40. CODE_SUCCESS - confirmation that code is working like "thank you jarvis my code is running successfully now"
             41. CONVERSATION - general conversation, questions, mood support
+            42. SEARCH_HISTORY - recall past conversations, meetings or emails like "what did we decide about the deadline last week"
             
             Respond with:
             TASK: [task_name]
@@ -557,7 +614,11 @@ class FinalJarvis:
             MESSAGE: [message content if applicable]
             """
             
-            ai_result = await self.ai_router.process_query(analysis_prompt, "general")
+            ai_result = await self.ai_router.process_query(
+                f'Analyze this command and determine the task: "{command}"',
+                "general",
+                prefix=analysis_prompt
+            )
             
             if ai_result['success']:
                 analysis = ai_result['response']
@@ -777,6 +838,9 @@ class FinalJarvis:
                 speak("I'll check your emails for you sir")
                 await self.handle_email_reading()
             
+            elif task == "SEARCH_HISTORY":
+                await self.handle_history_search(original_command)
+            
             elif task == "ATTEND_MEETING":
                 if self.voice_meeting_assistant:
                     result = self.voice_meeting_assistant.start_meeting_recording()
@@ -1021,7 +1085,7 @@ Created on: {time.strftime('%Y-%m-%d %H:%M:%S')}"""
     async def call_tom(self):
         """Call Tom using phone"""
         try:
-            tom_contact = self.db_manager.get_contact("Tom")
+            tom_contact = await self.async_db.get_contact("Tom")
             if tom_contact:
                 speak(f"Calling Tom at {tom_contact['mobile_no']}")
                 result = self.android_controller.make_call(tom_contact['mobile_no'], tom_contact['name'])
@@ -1037,7 +1101,7 @@ Created on: {time.strftime('%Y-%m-%d %H:%M:%S')}"""
     async def sms_tom(self, message):
         """Send SMS to Tom"""
         try:
-            tom_contact = self.db_manager.get_contact("Tom")
+            tom_contact = await self.async_db.get_contact("Tom")
             if tom_contact:
                 if not message:
                     message = "Hello from JARVIS"
@@ -1056,7 +1120,7 @@ Created on: {time.strftime('%Y-%m-%d %H:%M:%S')}"""
     async def whatsapp_tom(self, message, original_command):
         """Send WhatsApp to Tom - with proper conversation like original folders"""
         try:
-            tom_contact = self.db_manager.get_contact("Tom")
+            tom_contact = await self.async_db.get_contact("Tom")
             if tom_contact:
                 # Always ask for message, even if one was provided
                 speak("Sure! What message would you like me to send to Tom on WhatsApp?")
@@ -1791,38 +1855,40 @@ Created on: {time.strftime('%Y-%m-%d %H:%M:%S')}"""
                 else:
                     speak("I'm having trouble getting weather information right now")
             
-            # General AI conversation using Ollama locally
+            # General AI conversation - streamed so speech starts on the first sentence
             else:
-                speak("Let me think about that")
-                
-                # Try Ollama first for local AI response
-                ollama_response = await self.get_ollama_response(command)
-                
-                if ollama_response:
-                    # Make response more conversational
-                    if len(ollama_response) > 200:
-                        # For long responses, summarize and offer to continue
-                        short_response = ollama_response[:150] + "... Would you like me to continue with more details?"
-                        speak(short_response)
-                    else:
-                        speak(ollama_response)
-                else:
-                    # Fallback to online AI if Ollama is not available
-                    ai_result = await self.ai_router.process_query(command, "general")
-                    
-                    if ai_result['success']:
-                        response = ai_result['response']
-                        if len(response) > 200:
-                            short_response = response[:150] + "... Would you like me to continue with more details?"
-                            speak(short_response)
-                        else:
-                            speak(response)
-                    else:
-                        speak("I'm not sure about that, but I'm always learning! Is there something else I can help you with?")
+                await self.speak_streaming_answer(command)
                     
         except Exception as e:
             speak("I'm having a bit of trouble processing that, but I'm here to help with whatever you need!")
     
+    async def speak_streaming_answer(self, command, max_chars=200):
+        """Speak an AI answer sentence by sentence while it is still being generated"""
+        speaker = SentenceSpeaker(speak)
+        speaker.say("Let me think about that")
+        intro_chars = speaker.spoken_chars
+        
+        def on_sentence(sentence):
+            # Keep spoken answers short, then offer to continue
+            if speaker.spoken_chars - intro_chars >= max_chars:
+                return False
+            speaker.say(sentence)
+        
+        ai_result = await self.ai_router.process_query(command, "general", on_sentence=on_sentence)
+        
+        if not ai_result['success']:
+            speaker.say("I'm not sure about that, but I'm always learning! Is there something else I can help you with?")
+        elif ai_result.get('truncated'):
+            speaker.say("Would you like me to continue with more details?")
+        
+        # Speech runs on its own thread; wait for it like speak() does
+        await asyncio.get_running_loop().run_in_executor(None, speaker.finish)
+        
+        if ai_result.get('first_sentence_time') is not None:
+            print(f"⏱️ First sentence after {ai_result['first_sentence_time']:.2f}s "
+                  f"(full answer {ai_result.get('processing_time', 0):.2f}s)")
+        return ai_result
+    
     async def get_ollama_response(self, query):
         """Get response from Ollama local AI (5GB model or smaller)"""
         try:
@@ -2161,10 +2227,48 @@ Here are my {len(emails)} unread emails:
                     f.write("-" * 40 + "\n")
             
             print(f"💾 Email digest saved to: {filename}")
+            get_search_index().index_file(filename)
             
         except Exception as e:
             print(f"❌ Error saving digest: {e}")
     
+    def _index_existing_artifacts(self):
+        """Index new or changed artifact files in the working directory (background)"""
+        try:
+            indexed = get_search_index().scan_directory('.')
+            if indexed:
+                print(f"🔎 Indexed {indexed} new files for history search")
+        except Exception as e:
+            print(f"⚠️ Artifact indexing error: {e}")
+    
+    async def handle_history_search(self, command):
+        """Answer "what did we decide about X last week" from the local search index"""
+        try:
+            results = await self.async_db.search_history(command, 3)
+            if not results:
+                speak("I couldn't find anything about that in your conversations, meetings or emails")
+                return
+            
+            labels = {
+                'chat': 'In a conversation',
+                'transcript': 'In a meeting',
+                'summary': 'In a meeting summary',
+                'email_digest': 'In your email digest',
+                'email_draft': 'In an email draft'
+            }
+            for result in results:
+                when = result['created_at'].replace('T', ' ')[:16]
+                offset = f" at {int(result['start_time'] // 60)}:{int(result['start_time'] % 60):02d}" \
+                    if result.get('start_time') is not None else ""
+                print(f"🔎 [{result['kind']}] {when}{offset} {result['source']}\n   {result['snippet']}")
+            
+            best = results[0]
+            snippet = best['snippet'].replace('[', '').replace(']', '').replace('…', '')
+            speak(f"{labels.get(best['kind'], 'I found')} on {best['created_at'][:10]}: {snippet}")
+        except Exception as e:
+            print(f"❌ History search error: {e}")
+            speak("I had trouble searching your history")
+    
     async def handle_screen_description(self):
         """Handle screen description requests"""
         try:
@@ -2187,7 +2291,7 @@ Here are my {len(emails)} unread emails:
         print("Say 'JARVIS stop' to exit")
         
         # Show Tom's contact
-        tom_contact = self.db_manager.get_contact("Tom")
+        tom_contact = await self.async_db.get_contact("Tom")
         if tom_contact:
             print(f"📞 Tom's contact: {tom_contact['mobile_no']}")
         
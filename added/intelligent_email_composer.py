@@ -18,6 +18,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from engine.command import speak
 from engine.ai_router import AIRouter
+from engine.search_index import get_search_index
 from typing import Dict, List, Optional
 
 class IntelligentEmailComposer:
@@ -400,6 +401,10 @@ Details:
             
             speak(f"Email draft saved as {filename}")
             print(f"💾 Email draft saved as: {filename}")
+            try:
+                get_search_index().index_file(filename)
+            except Exception as e:
+                print(f"⚠️ Could not index draft: {e}")
             return filename
             
         except Exception as e:
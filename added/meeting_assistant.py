@@ -13,7 +13,7 @@ import os
 import time
 import threading
 import wave
-import whisper
+from engine.model_registry import get_model_registry
 import requests
 import json
 from datetime import datetime
@@ -24,20 +24,16 @@ from windows_desktop_audio import WindowsDesktopAudio
 class EnhancedMeetingAssistant:
     def __init__(self):
         self.is_recording = False
-        self.whisper_model = None
+        self.whisper_model_name = "base"
         self.meeting_active = False
         self.audio_capture = None
         self.voice_listening = False
         self.voice_thread = None
         
-        # Load Whisper model
+        # Load Whisper model in the background; held only while transcribing and
+        # shared with the SimpleMeetingRecorder below instead of loading "base" twice
         print("🤖 Loading Whisper model for meeting transcription...")
-        try:
-            self.whisper_model = whisper.load_model("base")
-            print("✅ Whisper model loaded successfully!")
-        except Exception as e:
-            print(f"❌ Error loading Whisper: {e}")
-            self.whisper_model = None
+        get_model_registry().warm_up('whisper', self.whisper_model_name)
         
         # Initialize audio capture
         try:
@@ -113,7 +109,8 @@ class EnhancedMeetingAssistant:
             print("🔄 Transcribing meeting audio with Whisper...")
             
             # Transcribe with Whisper
-            result = self.whisper_model.transcribe(audio_file)
+            with get_model_registry().using('whisper', self.whisper_model_name) as whisper_model:
+                result = whisper_model.transcribe(audio_file)
             transcript = result["text"]
             
             print("✅ Transcription completed!")
@@ -6,13 +6,13 @@ Captures desktop audio from Google Meet using Stereo Mix
 
 import pyaudio
 import wave
-import whisper
 import requests
 import json
 import time
 import threading
 from datetime import datetime
 import numpy as np
+from engine.model_registry import get_model_registry
 
 class SimpleMeetingRecorder:
     def __init__(self):
@@ -20,7 +20,7 @@ class SimpleMeetingRecorder:
         self.audio_frames = []
         self.audio = None
         self.stream = None
-        self.whisper_model = None
+        self.whisper_model_name = "base"
         
         # Audio settings
         self.format = pyaudio.paInt16
@@ -29,9 +29,8 @@ class SimpleMeetingRecorder:
         self.chunk = 1024
         self.stereo_mix_index = 2  # Stereo Mix (3- Realtek(R) Audio - WORKING!
         
-        # Initialize
+        # Initialize (Whisper is loaded on first use, shared through the model registry)
         self.setup_audio()
-        self.load_whisper()
     
     def setup_audio(self):
         """Setup PyAudio"""
@@ -56,13 +55,8 @@ class SimpleMeetingRecorder:
             print(f"❌ PyAudio setup error: {e}")
     
     def load_whisper(self):
-        """Load Whisper model"""
-        try:
-            print("Loading Whisper model...")
-            self.whisper_model = whisper.load_model("base")
-            print("✅ Whisper model loaded")
-        except Exception as e:
-            print(f"❌ Whisper loading error: {e}")
+        """Start loading the Whisper model in the background (it is also loaded on first use)"""
+        get_model_registry().warm_up('whisper', self.whisper_model_name)
     
     def start_recording(self):
         """Start recording from Stereo Mix"""
@@ -186,11 +180,12 @@ class SimpleMeetingRecorder:
                 return f"❌ Audio file not found: {abs_audio_file}"
             
             # Use the original filename if absolute path fails
-            try:
-                result = self.whisper_model.transcribe(abs_audio_file)
-            except:
-                print("⚠️ Trying with relative path...")
-                result = self.whisper_model.transcribe(audio_file)
+            with get_model_registry().using('whisper', self.whisper_model_name) as whisper_model:
+                try:
+                    result = whisper_model.transcribe(abs_audio_file)
+                except:
+                    print("⚠️ Trying with relative path...")
+                    result = whisper_model.transcribe(audio_file)
             transcript = result["text"].strip()
             
             if not transcript:
@@ -286,6 +281,7 @@ def test_simple_recorder():
     print("=" * 40)
     
     recorder = SimpleMeetingRecorder()
+    recorder.load_whisper()
     
     print("\nCommands:")
     print("'start' - Start recording")
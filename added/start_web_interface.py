@@ -165,34 +165,27 @@ def setup_eel_functions():
             return {"text": "", "success": False, "message": str(e)}
     
     @eel.expose
-    def get_chat_history():
-        """Get recent chat history"""
+    def get_chat_history(before=None, limit=20):
+        """Get recent chat history (messages older than the before cursor, if given)"""
         try:
             if db_manager:
-                history = db_manager.get_chat_history(20)
-                formatted_history = []
-                
-                for msg in history:
-                    if isinstance(msg, dict) and 'user_input' in msg:
-                        # Add user message
-                        formatted_history.append({
-                            'sender': 'user',
-                            'message': msg.get('user_input', ''),
-                            'timestamp': str(msg.get('timestamp', ''))
-                        })
-                        # Add assistant response
-                        formatted_history.append({
-                            'sender': 'assistant',
-                            'message': msg.get('response', ''),
-                            'timestamp': str(msg.get('timestamp', ''))
-                        })
-                
-                return formatted_history
+                return db_manager.get_chat_page(limit, before)['messages']
             return []
         except Exception as e:
             print(f"❌ Chat history error: {e}")
             return []
     
+    @eel.expose
+    def get_chat_page(before=None, limit=20):
+        """Get one page of chat history with the cursor for the next (older) page"""
+        try:
+            if db_manager:
+                return db_manager.get_chat_page(limit, before)
+            return {'messages': [], 'next_before': None, 'has_more': False}
+        except Exception as e:
+            print(f"❌ Chat history error: {e}")
+            return {'messages': [], 'next_before': None, 'has_more': False}
+    
     @eel.expose
     def update_settings(settings):
         """Update user settings"""
@@ -70,24 +70,22 @@ def main():
         print("\nInstructions:")
         print("1. On your Android phone, open Contacts app")
         print("2. Go to Settings/Menu > Import/Export > Export")
-        print("3. Export contacts to a CSV file")
-        print("4. Transfer the CSV file to this computer")
+        print("3. Export contacts to a CSV or vCard (.vcf) file")
+        print("4. Transfer the file to this computer")
         print("5. Place it in the unified-jarvis folder")
         
-        csv_path = input("\nEnter CSV file path (or press Enter for 'contacts.csv'): ").strip()
+        csv_path = input("\nEnter CSV/vCard file path (or press Enter for 'contacts.csv'): ").strip()
         if not csv_path:
             csv_path = 'contacts.csv'
         
         if os.path.exists(csv_path):
-            contacts = extractor._parse_csv_file(csv_path)
-            if contacts:
-                success = extractor.import_contacts_to_database(contacts)
-                if success:
-                    print("✅ CSV import completed successfully!")
-                else:
-                    print("❌ CSV import failed")
+            result = extractor.import_file(csv_path)
+            if 'error' in result:
+                print("❌ Import failed")
+            elif result['inserted'] + result['updated'] + result['skipped'] == 0:
+                print("❌ No contacts found in file")
             else:
-                print("❌ No contacts found in CSV file")
+                print("✅ Import completed successfully!")
         else:
             print(f"❌ File not found: {csv_path}")
     
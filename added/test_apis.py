@@ -17,7 +17,7 @@ async def test_apis():
     ai_router = AIRouter()
     
     # Get service status
-    status = ai_router.get_service_status()
+    status = ai_router.get_service_status(refresh=True)
     print(f"📊 Service Status:")
     print(f"   Ollama: {'✅' if status['ollama'] else '❌'}")
     print(f"   Groq: {'✅' if status['groq'] else '❌'}")
@@ -26,7 +26,7 @@ async def test_complete_system():
         
         # Test AI Router
         print("🤖 Testing AI Router...")
-        ai_status = ai_router.get_service_status()
+        ai_status = ai_router.get_service_status(refresh=True)
         print(f"   Ollama: {'✅' if ai_status['ollama'] else '❌'}")
         print(f"   Groq: {'✅' if ai_status['groq'] else '❌'}")
         print(f"   Cohere: {'✅' if ai_status['cohere'] else '❌'}")
@@ -46,7 +46,7 @@ async def test_full_integration():
     
     # Test AI Services
     print("\n🤖 Testing AI Services...")
-    status = ai_router.get_service_status()
+    status = ai_router.get_service_status(refresh=True)
     print(f"   Ollama: {'✅' if status['ollama'] else '❌'}")
     print(f"   Groq: {'✅' if status['groq'] else '❌'}")
     print(f"   Cohere: {'✅' if status['cohere'] else '❌'}")
@@ -44,7 +44,7 @@ async def test_jarvis_functionality():
     print("🤖 Testing AI Router:")
     
     # Test service status
-    status = ai_router.get_service_status()
+    status = ai_router.get_service_status(refresh=True)
     print(f"   Service Status: {status}")
     
     # Test queries
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: keyword-prefiltered PatternMatcher vs the old per-pattern re.search loop
+"""
+import re
+import time
+from engine.command_processor import CommandProcessor
+
+COMMANDS = [
+    "open chrome",
+    "close notepad",
+    "play despacito on youtube",
+    "call john",
+    "send a message to mom",
+    "whatsapp tom",
+    "volume up",
+    "search for pizza near me on google",
+    "empty recycle bin",
+    "write a letter about my vacation",
+    "what's the weather",
+    "what time is it",
+    "hello jarvis",
+    "tell me something interesting about space",
+    "how do black holes form",
+    "i would like to hear a joke"
+]
+
+def legacy_classify(patterns, command):
+    """The original loop: re.search on every pattern in priority order"""
+    for intent, intent_patterns in patterns.items():
+        for pattern in intent_patterns:
+            match = re.search(pattern, command, re.IGNORECASE)
+            if match:
+                return intent, match.group(0), match.groups()
+    return None
+
+def benchmark(func, rounds):
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for command in COMMANDS:
+            func(command)
+    return (time.perf_counter() - start_time) / (rounds * len(COMMANDS)) * 1e6
+
+def main():
+    print("🧪 PATTERN MATCHER BENCHMARK")
+    print("=" * 60)
+    
+    processor = CommandProcessor(None, None)
+    matcher = processor.pattern_matcher
+    
+    # Same answers as the old implementation
+    mismatches = 0
+    for command in COMMANDS:
+        expected = legacy_classify(processor.patterns, command)
+        actual = matcher.match(command)
+        status = "✅" if expected == actual else "❌"
+        if expected != actual:
+            mismatches += 1
+        print(f"{status} {command!r:50} -> {actual[0] if actual else 'unknown'}")
+    
+    rounds = 2000
+    legacy_us = benchmark(lambda command: legacy_classify(processor.patterns, command), rounds)
+    compiled_us = benchmark(matcher.match, rounds)
+    full_us = benchmark(processor._classify_with_patterns, rounds)
+    
+    print("\n📊 Results (average per command):")
+    print(f"   Legacy re.search loop:   {legacy_us:.2f} µs")
+    print(f"   Prefiltered dispatch:    {compiled_us:.2f} µs ({legacy_us / compiled_us:.1f}x faster)")
+    print(f"   _classify_with_patterns: {full_us:.2f} µs (with slot extraction)")
+    print(f"   Mismatches: {mismatches}")
+    
+    return mismatches == 0
+
+if __name__ == "__main__":
+    main()
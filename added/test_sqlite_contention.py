@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark: shared default SQLite connection vs the tuned per-thread pool
+
+Readers look up web commands and contacts while writers save preferences,
+all at once - the way the Eel threads, the voice loop and background
+persisters hit jarvis.db.
+"""
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from engine.sqlite_pool import SQLitePool
+
+READERS = 8
+WRITERS = 2
+DURATION = 3.0
+CONTACTS = 5000
+WEB_COMMANDS = 200
+
+SCHEMA = [
+    "CREATE TABLE contacts (id INTEGER PRIMARY KEY, name VARCHAR(200), mobile_no VARCHAR(255), email VARCHAR(255))",
+    "CREATE TABLE web_command (id INTEGER PRIMARY KEY, name VARCHAR(100), url VARCHAR(1000))",
+    "CREATE TABLE user_preferences (id INTEGER PRIMARY KEY, key VARCHAR(100) UNIQUE, value TEXT)"
+]
+
+INDEXES = [
+    "CREATE INDEX idx_contacts_name_lower ON contacts (LOWER(name))",
+    "CREATE INDEX idx_web_command_name ON web_command (name)"
+]
+
+def create_database(path, indexed):
+    conn = sqlite3.connect(path)
+    for statement in SCHEMA + (INDEXES if indexed else []):
+        conn.execute(statement)
+    conn.executemany(
+        "INSERT INTO contacts (name, mobile_no, email) VALUES (?, ?, ?)",
+        [(f"Person {i}", f"+9198{i:08d}", "") for i in range(CONTACTS)]
+    )
+    conn.executemany(
+        "INSERT INTO web_command (name, url) VALUES (?, ?)",
+        [(f"site{i}", f"https://site{i}.example") for i in range(WEB_COMMANDS)]
+    )
+    conn.commit()
+    conn.close()
+
+def run(get_conn):
+    """Run readers and writers concurrently; return latency lists and error count"""
+    stop = threading.Event()
+    read_latencies, write_latencies = [], []
+    errors = [0]
+    
+    def reader(n):
+        i = n
+        while not stop.is_set():
+            i += 7
+            start = time.perf_counter()
+            try:
+                conn = get_conn()
+                conn.execute("SELECT url FROM web_command WHERE name = ?", (f"site{i % WEB_COMMANDS}",)).fetchone()
+                conn.execute("SELECT id, name, mobile_no FROM contacts WHERE LOWER(name) = ?",
+                             (f"person {i % CONTACTS}",)).fetchone()
+            except sqlite3.Error:
+                errors[0] += 1
+                continue
+            read_latencies.append(time.perf_counter() - start)
+    
+    def writer(n):
+        i = 0
+        while not stop.is_set():
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn = get_conn()
+                conn.execute("INSERT OR REPLACE INTO user_preferences (key, value) VALUES (?, ?)",
+                             (f"pref{n}-{i % 50}", json.dumps({'value': i})))
+                conn.commit()
+            except sqlite3.Error:
+                errors[0] += 1
+                continue
+            write_latencies.append(time.perf_counter() - start)
+    
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(READERS)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    return read_latencies, write_latencies, errors[0]
+
+def summarize(label, read_latencies, write_latencies, errors):
+    def p95(values):
+        return sorted(values)[int(len(values) * 0.95)] * 1000 if values else 0.0
+    print(f"\n{label}")
+    print(f"   Reads:  {len(read_latencies) / DURATION:8.0f} ops/s   p95 {p95(read_latencies):7.2f} ms")
+    print(f"   Writes: {len(write_latencies) / DURATION:8.0f} ops/s   p95 {p95(write_latencies):7.2f} ms")
+    print(f"   Errors: {errors}")
+    return len(read_latencies) / DURATION
+
+def main():
+    print("🧪 SQLITE CONTENTION BENCHMARK")
+    print("=" * 60)
+    print(f"{READERS} readers, {WRITERS} writers, {DURATION:.0f} s each")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Before: one connection shared by every thread, default journal, no indexes
+        legacy_path = os.path.join(directory, "legacy.db")
+        create_database(legacy_path, indexed=False)
+        shared = sqlite3.connect(legacy_path, check_same_thread=False)
+        legacy_reads = summarize("📊 Shared connection (rollback journal, no indexes):",
+                                 *run(lambda: shared))
+        shared.close()
+        
+        # After: per-thread WAL connections with cached statements and lookup indexes
+        tuned_path = os.path.join(directory, "tuned.db")
+        create_database(tuned_path, indexed=True)
+        pool = SQLitePool(tuned_path)
+        tuned_reads = summarize("📊 Per-thread pool (WAL, synchronous=NORMAL, indexes):",
+                                *run(pool.connection))
+        pool.close_all()
+    
+    print(f"\n⚡ Read throughput: {tuned_reads / max(legacy_reads, 1):.1f}x")
+
+if __name__ == "__main__":
+    main()
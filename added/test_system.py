@@ -50,7 +50,7 @@ def test_ai_router():
         ai_router = AIRouter()
         
         # Test service status
-        status = ai_router.get_service_status()
+        status = ai_router.get_service_status(refresh=True)
         print(f"✅ AI Services status: {status}")
         
         # Test simple query
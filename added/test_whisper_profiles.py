@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Whisper decoding profiles benchmark: "accurate" vs "command" vs "command_fast" on short spoken commands
+
+Each fixture is a 16-bit WAV with a same-named .txt reference transcript in
+FIXTURE_DIR. command_fixtures/ ships the built-in command list synthesized
+with espeak-ng; record your own, or run with --generate to synthesize it with
+the local TTS voice. Reports word error rate and per-clip latency for every
+profile side by side (last measured results: command_fixtures/results.txt).
+
+    python test_whisper_profiles.py --generate
+    python test_whisper_profiles.py [fixture_dir] [--model base] [--runs 3]
+"""
+import os
+import re
+import sys
+import time
+import wave
+import argparse
+import numpy as np
+from engine import stt_profiles
+
+FIXTURE_DIR = "command_fixtures"
+SAMPLE_RATE = 16000
+
+COMMANDS = [
+    "open chrome",
+    "volume up",
+    "what time is it",
+    "play despacito on youtube",
+    "call mom",
+    "send a whatsapp message to rahul",
+    "take a screenshot",
+    "turn on the flashlight",
+    "set an alarm for seven thirty am",
+    "read my emails",
+    "search google for weather in delhi",
+    "open notepad and write a leave application"
+]
+
+def generate_fixtures(directory):
+    """Synthesize one WAV + reference per command with pyttsx3"""
+    import pyttsx3
+    os.makedirs(directory, exist_ok=True)
+    engine = pyttsx3.init('sapi5') if sys.platform == 'win32' else pyttsx3.init()
+    for i, command in enumerate(COMMANDS):
+        name = os.path.join(directory, f"command_{i:02d}")
+        engine.save_to_file(command, name + ".wav")
+        with open(name + ".txt", "w", encoding="utf-8") as f:
+            f.write(command + "\n")
+    engine.runAndWait()
+    print(f"✅ Generated {len(COMMANDS)} fixtures in {directory}/")
+
+def load_wav(path):
+    """16 kHz mono float32 samples"""
+    with wave.open(path, "rb") as wf:
+        rate, channels, width = wf.getframerate(), wf.getnchannels(), wf.getsampwidth()
+        frames = wf.readframes(wf.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: expected 16-bit PCM")
+    audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+def load_fixtures(directory):
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".wav"):
+            continue
+        path = os.path.join(directory, filename)
+        reference_path = path[:-4] + ".txt"
+        if not os.path.exists(reference_path):
+            print(f"⚠️ Skipping {filename}: no reference transcript")
+            continue
+        with open(reference_path, encoding="utf-8") as f:
+            fixtures.append((filename, load_wav(path), f.read().strip()))
+    return fixtures
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+def word_errors(reference, hypothesis):
+    """Levenshtein distance over words"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+def benchmark(model, fixtures, profile, runs):
+    """(WER, median latency ms, p95 latency ms, transcripts) for one profile"""
+    # Warm-up: first call pays for kernel setup and caches
+    stt_profiles.transcribe(model, fixtures[0][1], profile)
+    
+    errors = words = 0
+    latencies = []
+    transcripts = {}
+    for name, audio, reference in fixtures:
+        for run in range(runs):
+            start = time.perf_counter()
+            text = stt_profiles.transcribe(model, audio, profile).get("text", "")
+            latencies.append((time.perf_counter() - start) * 1000)
+        edits, count = word_errors(reference, text)
+        errors += edits
+        words += count
+        transcripts[name] = text.strip()
+    
+    latencies.sort()
+    return (errors / max(1, words), latencies[len(latencies) // 2],
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], transcripts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Whisper decoding profiles")
+    parser.add_argument("fixtures", nargs="?", default=FIXTURE_DIR)
+    parser.add_argument("--model", default=os.getenv("WHISPER_MODEL", "base"))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--generate", action="store_true", help="synthesize fixtures with pyttsx3")
+    args = parser.parse_args()
+    
+    if args.generate:
+        generate_fixtures(args.fixtures)
+    
+    if not os.path.isdir(args.fixtures):
+        print(f"❌ No fixtures in {args.fixtures}/ - record WAVs with .txt transcripts or use --generate")
+        return
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print("❌ No usable fixtures found")
+        return
+    
+    import whisper
+    print(f"🎤 Loading Whisper model: {args.model}")
+    model = whisper.load_model(args.model)
+    seconds = sum(len(audio) for _, audio, _ in fixtures) / SAMPLE_RATE
+    print(f"📁 {len(fixtures)} clips, {seconds:.1f} s of audio, {args.runs} runs each\n")
+    
+    profiles = ("accurate", "command", "command_fast")
+    results = {profile: benchmark(model, fixtures, profile, args.runs) for profile in profiles}
+    
+    print(f"{'profile':<13} {'WER':>7} {'median ms':>10} {'p95 ms':>8}")
+    for profile, (wer, median, p95, _) in results.items():
+        print(f"{profile:<13} {wer:>7.1%} {median:>10.0f} {p95:>8.0f}")
+    for profile in profiles[1:]:
+        speedup = results["accurate"][1] / max(1e-9, results[profile][1])
+        print(f"⚡ {profile} profile: {speedup:.1f}x faster than accurate (median)")
+    
+    print("\nTranscripts that differ between profiles:")
+    for name, _, reference in fixtures:
+        texts = {profile: results[profile][3][name] for profile in profiles}
+        if len({tuple(normalize(text)) for text in texts.values()}) > 1:
+            print(f"  {name}: ref='{reference}' " + " ".join(f"{p}='{t}'" for p, t in texts.items()))
+
+if __name__ == "__main__":
+    main()
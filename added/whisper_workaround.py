@@ -3,9 +3,9 @@
 Whisper Workaround - Read audio manually and pass to Whisper
 """
 
-import whisper
 import wave
 import numpy as np
+from engine.model_registry import get_model_registry
 
 def transcribe_wav_file(filename):
     """Transcribe WAV file by reading audio data manually"""
@@ -48,11 +48,10 @@ def transcribe_wav_file(filename):
             
             print(f"📊 Audio: {len(audio_float)} samples, {len(audio_float)/16000:.2f} seconds")
             
-            # Load Whisper model
-            model = whisper.load_model("tiny")
-            
-            # Transcribe
-            result = model.transcribe(audio_float)
+            # Whisper model is loaded once per process and reused across calls
+            with get_model_registry().using('whisper', "tiny") as model:
+                # Transcribe
+                result = model.transcribe(audio_float)
             return result["text"].strip()
             
     except Exception as e: